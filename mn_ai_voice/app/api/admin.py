@@ -0,0 +1,140 @@
+"""Administrative API routes."""
+
+import asyncio
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mn_ai_voice.app.api.dependencies import get_db
+from mn_ai_voice.app.core.constants import CallState
+from mn_ai_voice.app.db.models import FunnelStat, QualificationStat, TurnStat
+from mn_ai_voice.app.db.snapshot_cache import snapshot_cache
+from mn_ai_voice.app.engine.kb_manager import kb_manager
+
+router = APIRouter()
+
+
+@router.post("/leads/{lead_id}/snapshot/invalidate")
+def invalidate_snapshot(lead_id: str) -> dict:
+    """
+    Drop a lead's cached snapshot in this process.
+
+    Call after editing lead_snapshot outside the API (back-office
+    tools, data fixes); the next turn reloads it from the database.
+    """
+    snapshot_cache.invalidate(lead_id)
+    return {"lead_id": lead_id, "invalidated": True}
+
+
+# ---------- Knowledge base ----------
+
+@router.get("/knowledge_base")
+def knowledge_base_version() -> dict:
+    """Return the knowledge base version currently serving turns."""
+    return kb_manager.current.describe()
+
+
+@router.put("/knowledge_base")
+async def upload_knowledge_base(
+    text: str = Body(..., media_type="application/x-yaml"),
+) -> dict:
+    """
+    Replace the knowledge base with an uploaded YAML document.
+
+    The new version is compiled in a worker thread and swapped in
+    atomically; turns in flight finish on the previous version. The
+    YAML file is rewritten so replicas watching it follow.
+    """
+    try:
+        version = await asyncio.to_thread(kb_manager.load_text, text)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return version.describe()
+
+
+@router.post("/knowledge_base/reload")
+async def reload_knowledge_base() -> dict:
+    """Reload the knowledge base from its YAML file now."""
+    try:
+        version = await asyncio.to_thread(kb_manager.load_file)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if version is None:
+        raise HTTPException(status_code=404, detail="Knowledge base file not found")
+    return version.describe()
+
+
+# ---------- Analytics ----------
+# Read from the aggregate tables maintained per turn (db/analytics.py);
+# none of these scan calls or lead_snapshot.
+
+@router.get("/analytics/funnel")
+async def funnel(db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Calls per state and drop-off per state, in flow order.
+
+    drop_off_rate is the share of entries into a state that ended the
+    call there (for CLOSE, that is completion).
+    """
+    rows = {str(row.state): row for row in await db.scalars(select(FunnelStat))}
+    order = [state.value for state in CallState]
+    states = order + sorted(set(rows) - set(order))
+
+    result = []
+    for state in states:
+        row = rows.get(state)
+        entered = row.entered if row else 0
+        ended = row.ended if row else 0
+        result.append(
+            {
+                "state": state,
+                "entered": entered,
+                "in_progress": row.in_progress if row else 0,
+                "ended": ended,
+                "drop_off_rate": round(ended / entered, 4) if entered else 0.0,
+            }
+        )
+    return {"states": result}
+
+
+@router.get("/analytics/qualification")
+async def qualification(db: AsyncSession = Depends(get_db)) -> dict:
+    """Lead counts by qualification status, region and budget band."""
+    rows = await db.scalars(
+        select(QualificationStat)
+        .where(QualificationStat.leads > 0)
+        .order_by(
+            QualificationStat.qualification_status,
+            QualificationStat.region_value,
+            QualificationStat.budget_band,
+        )
+    )
+    return {
+        "buckets": [
+            {
+                "qualification_status": row.qualification_status,
+                "region": row.region_value,
+                "budget_band": row.budget_band,
+                "leads": row.leads,
+            }
+            for row in rows
+        ]
+    }
+
+
+@router.get("/analytics/turns")
+async def turns_per_call(db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Turns-per-call histogram of summarized calls.
+
+    The last bucket (TURNS_CAP) also holds longer calls, so mean_turns
+    is a lower bound when it is populated.
+    """
+    rows = list(await db.scalars(select(TurnStat).order_by(TurnStat.turns)))
+    calls = sum(row.calls for row in rows)
+    return {
+        "calls": calls,
+        "mean_turns": round(sum(row.turns * row.calls for row in rows) / calls, 2) if calls else 0.0,
+        "histogram": [{"turns": row.turns, "calls": row.calls} for row in rows],
+    }
@@ -0,0 +1,29 @@
+"""Prompt audio API routes."""
+
+from fastapi import APIRouter, HTTPException, Response
+
+from mn_ai_voice.app.engine.prompt_audio import prompt_audio
+
+router = APIRouter()
+
+
+@router.get("/{key}")
+def prompt_audio_file(key: str) -> Response:
+    """
+    Serve pre-synthesized prompt audio by the audio_key a turn returned.
+
+    The body is a memoryview over the cache's mapping of the file, so
+    it reaches the server without being read or copied in Python.
+    Files are immutable (content-addressed), so clients may cache them
+    indefinitely.
+    """
+
+    audio = prompt_audio.view(key)
+    if audio is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    return Response(
+        content=audio,
+        media_type="audio/wav",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
@@ -0,0 +1,416 @@
+"""
+Call stream WebSocket connection.
+
+One connection carries every turn of a call. The Call and its
+LeadSnapshot are loaded once and kept in memory for the life of the
+connection; each message runs the orchestrator against them and the
+reply is sent straight away. Events, TurnRecords, the new call state
+and snapshot values are queued and committed by a background writer,
+which coalesces whatever turns are waiting into one transaction.
+
+Protocol (JSON messages):
+
+    server -> {"type": "ready", "state": "...", "last_turn_id": "t3"}
+    client -> {"type": "partial", "turn_id": "t4", "text": "..."}  (optional, repeated)
+    server -> {"type": "preview", "turn_id": "t4", "assistant": {...}}
+    client -> {"type": "turn", "turn_id": "t4", "text": "..."}
+    server -> {"type": "reply", "turn_id": "t4", "assistant": {...}, "state": "..."}
+    server -> {"type": "ack", "turn_id": "t4"}
+    server -> {"type": "error", "detail": "..."}  (then closes)
+
+Acks are cumulative: an ack for a turn means it and every turn before
+it are committed. After a reconnect the call resumes from the last
+acknowledged turn; the client resends the turns it sent after that.
+Resending a committed turn_id is safe, it returns the original reply.
+
+Partial messages carry speech recognition hypotheses for a turn still
+being spoken. They are routed and extracted incrementally (see
+orchestrator/call_orchestrator.py::PartialTurn) and answered with a
+preview of the reply whenever it changes; nothing is committed until
+the turn message with the final text arrives.
+
+A turn committed for the same lead elsewhere (an HTTP turn, an admin
+edit) bumps the lead's cache generation. Before a turn, the stream
+reloads if it sees that; if it happens while turns are still queued,
+the writer refuses to overwrite it and the connection closes, so the
+client reconnects and resends from its last ack.
+"""
+
+import asyncio
+import copy
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mn_ai_voice.app.core.logging import log_context
+from mn_ai_voice.app.core.metrics import TURN_STAGE_DURATION
+from mn_ai_voice.app.core.timing import TurnTimer
+from mn_ai_voice.app.db.analytics import AnalyticsDeltas, qualification_key
+from mn_ai_voice.app.db.models import Call, Event, LeadSnapshot, TurnRecord
+from mn_ai_voice.app.db.snapshot_cache import SNAPSHOT_COLUMNS, SnapshotCache
+from mn_ai_voice.app.engine.prompt_audio import prompt_audio
+from mn_ai_voice.app.orchestrator.call_orchestrator import CallOrchestrator, PartialTurn
+from mn_ai_voice.app.api.schemas import StreamMessage, StreamPartial, StreamTurn
+
+logger = logging.getLogger(__name__)
+
+# WebSocket close codes (4000-4999 are application defined)
+CLOSE_NOT_FOUND = 4404
+CLOSE_CONFLICT = 4409
+CLOSE_INVALID = 4422
+
+
+class StreamClosed(Exception):
+    """The stream cannot continue; the client should reconnect or stop."""
+
+    def __init__(self, code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.code = code
+        self.detail = detail
+
+
+class TurnBuffer:
+    """Collects the events a turn adds, in order, instead of a session."""
+
+    def __init__(self) -> None:
+        self.events: list[Event] = []
+
+    def add(self, instance: object) -> None:
+        """Keep events; the call and snapshot are written from their values."""
+        if isinstance(instance, Event):
+            self.events.append(instance)
+
+
+@dataclass
+class PendingTurn:
+    """A handled turn waiting to be committed."""
+
+    turn_id: str
+    reply: str
+    state: str
+    snapshot: dict
+    events: list[Event]
+    deltas: AnalyticsDeltas = field(default_factory=AnalyticsDeltas)
+
+
+class CallStream:
+    """One WebSocket connection for a call, with call state held in memory."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        db: AsyncSession,
+        call_id: str,
+        orchestrator: CallOrchestrator,
+        cache: SnapshotCache,
+    ) -> None:
+        self.websocket = websocket
+        self.db = db
+        self.call_id = call_id
+        self.orchestrator = orchestrator
+        self.cache = cache
+
+        self.call: Optional[Call] = None
+        self.lead_id = ""
+        self.snapshot: Optional[LeadSnapshot] = None
+        self.generation: Optional[int] = None
+        # Replies by turn_id: committed ones and those still queued
+        self.replies: dict[str, tuple[str, str]] = {}
+        self.queue: asyncio.Queue[PendingTurn] = asyncio.Queue()
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+        # The turn being spoken: (turn_id, its partial state, last preview sent)
+        self.partial: Optional[tuple[str, PartialTurn, Optional[str]]] = None
+
+    async def run(self) -> None:
+        """Serve the connection until the client disconnects or it fails."""
+        await self.websocket.accept()
+        try:
+            last_turn_id = await self._load()
+        except StreamClosed as exc:
+            await self._close(exc)
+            return
+
+        assert self.call is not None
+        await self.websocket.send_json(
+            {"type": "ready", "state": self.call.current_state, "last_turn_id": last_turn_id}
+        )
+
+        writer = self.writer = asyncio.create_task(self._write())
+        try:
+            await self._serve(writer)
+        except StreamClosed as exc:
+            await self._close(exc)
+        finally:
+            # Commit what was replied to, even if the client is gone.
+            draining = asyncio.create_task(self.queue.join())
+            await asyncio.wait({writer, draining}, return_when=asyncio.FIRST_COMPLETED)
+            draining.cancel()
+            writer.cancel()
+            await asyncio.gather(writer, draining, return_exceptions=True)
+
+    async def _serve(self, writer: asyncio.Task) -> None:
+        """Receive turns, stopping early if the writer fails."""
+        while True:
+            receiving = asyncio.create_task(self.websocket.receive())
+            await asyncio.wait({receiving, writer}, return_when=asyncio.FIRST_COMPLETED)
+            if writer.done():
+                receiving.cancel()
+                writer.result()  # raises the writer's StreamClosed
+            message = receiving.result()
+            if message["type"] == "websocket.disconnect":
+                self.closed = True
+                return
+
+            try:
+                received = StreamMessage.validate_json(
+                    message.get("text") or message.get("bytes") or b""
+                )
+            except ValidationError as exc:
+                raise StreamClosed(CLOSE_INVALID, "Invalid turn message") from exc
+
+            if isinstance(received, StreamPartial):
+                await self._handle_partial(received)
+            else:
+                await self._handle(received)
+
+    # ---------- Loading ----------
+
+    async def _load(self) -> Optional[str]:
+        """
+        Load the call, snapshot and committed replies; return the last turn_id.
+
+        The call and snapshot are detached from the session: turns
+        change them in memory and the writer persists their values.
+        """
+        call = await self.db.get(Call, self.call_id, populate_existing=True)
+        if call is None:
+            raise StreamClosed(CLOSE_NOT_FOUND, "Call not found")
+        if call.ended_at is not None:
+            raise StreamClosed(CLOSE_CONFLICT, "Call has ended")
+
+        lead_id = str(call.lead_id)
+        self.cache.remember_call(self.call_id, lead_id)
+        self.generation = self.cache.track(lead_id)
+        snapshot = await self.cache.load(self.db, lead_id)
+        if snapshot is None:
+            raise StreamClosed(CLOSE_CONFLICT, "Lead snapshot missing")
+
+        records = (
+            await self.db.scalars(
+                select(TurnRecord)
+                .where(TurnRecord.call_id == self.call_id)
+                .order_by(TurnRecord.created_at)
+            )
+        ).all()
+        self.replies = {r.turn_id: (r.reply_text, r.state) for r in records}
+        last_turn_id = records[-1].turn_id if records else None
+
+        self.db.expunge(call)
+        self.db.expunge(snapshot)
+        await self.db.rollback()  # release the connection between turns
+        self.call, self.snapshot, self.lead_id = call, snapshot, lead_id
+        return last_turn_id
+
+    async def _reload_if_stale(self) -> None:
+        """Reload the call and snapshot if the lead changed outside this stream."""
+        if self.cache.generation(self.lead_id) == self.generation:
+            return
+
+        # Our own queued turns may be what is missing; commit them first.
+        await self._drain()
+        if self.cache.generation(self.lead_id) != self.generation:
+            await self._load()
+
+    # ---------- Turns ----------
+
+    async def _handle(self, turn: StreamTurn) -> None:
+        """Run one turn in memory, reply, and queue its writes."""
+        with log_context(call_id=self.call_id, turn_id=turn.turn_id):
+            if turn.turn_id in self.replies:
+                reply, state = self.replies[turn.turn_id]
+                await self._send_reply(turn.turn_id, reply, state)
+                return
+
+            await self._reload_if_stale()
+            call, snapshot = self.call, self.snapshot
+            assert call is not None and snapshot is not None
+
+            partial = None
+            if self.partial is not None and self.partial[0] == turn.turn_id:
+                partial = self.partial[1]
+            self.partial = None
+
+            timer = TurnTimer()
+            state_before, bucket_before = str(call.current_state), qualification_key(snapshot)
+            buffer = TurnBuffer()
+            reply = self.orchestrator.handle_turn(
+                buffer, call, snapshot, turn.text, timer, partial
+            )
+            state = str(call.current_state)
+
+            pending = PendingTurn(
+                turn_id=turn.turn_id,
+                reply=reply,
+                state=state,
+                snapshot={key: copy.deepcopy(getattr(snapshot, key)) for key in SNAPSHOT_COLUMNS},
+                events=buffer.events,
+            )
+            pending.deltas.transition(state_before, state)
+            pending.deltas.requalify(bucket_before, qualification_key(snapshot))
+
+            self.replies[turn.turn_id] = (reply, state)
+            self.queue.put_nowait(pending)
+            await self._send_reply(turn.turn_id, reply, state)
+
+            for stage, seconds in timer.stages.items():
+                TURN_STAGE_DURATION.labels(stage).observe(seconds)
+            logger.info(
+                "turn handled",
+                extra={
+                    "state": state,
+                    "stages_ms": timer.as_ms(),
+                    "total_ms": round(timer.elapsed() * 1000, 3),
+                },
+            )
+
+    async def _handle_partial(self, message: StreamPartial) -> None:
+        """Scan a partial hypothesis; send a preview if the reply changed."""
+        if message.turn_id in self.replies:
+            return
+        if self.partial is None or self.partial[0] != message.turn_id:
+            self.partial = (message.turn_id, self.orchestrator.begin_partial(), None)
+
+        await self._reload_if_stale()
+        assert self.call is not None and self.snapshot is not None
+        turn_id, partial, previous = self.partial
+        partial.update(message.text)
+        preview = self.orchestrator.preview(self.call, self.snapshot, partial)
+        if preview != previous:
+            self.partial = (turn_id, partial, preview)
+            await self.websocket.send_json(
+                {
+                    "type": "preview",
+                    "turn_id": turn_id,
+                    "assistant": prompt_audio.describe(preview, self._language()),
+                }
+            )
+
+    async def _send_reply(self, turn_id: str, reply: str, state: str) -> None:
+        await self.websocket.send_json(
+            {
+                "type": "reply",
+                "turn_id": turn_id,
+                "assistant": prompt_audio.describe(reply, self._language()),
+                "state": state,
+            }
+        )
+
+    def _language(self) -> Optional[str]:
+        """The caller's language, for the audio of replies."""
+        return str(self.snapshot.language) if self.snapshot is not None else None
+
+    # ---------- Persistence ----------
+
+    async def _drain(self) -> None:
+        """Wait until every queued turn is committed, or raise why the writer stopped."""
+        assert self.writer is not None
+        draining = asyncio.create_task(self.queue.join())
+        await asyncio.wait({draining, self.writer}, return_when=asyncio.FIRST_COMPLETED)
+        if draining.done():
+            return
+        draining.cancel()
+        self.writer.result()  # raises the writer's StreamClosed
+        raise StreamClosed(CLOSE_CONFLICT, "Turns were not committed")
+
+    async def _write(self) -> None:
+        """Commit queued turns, batching those that queued up meanwhile."""
+        while True:
+            batch = [await self.queue.get()]
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self._commit(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            await self._ack(batch[-1].turn_id)
+
+    async def _ack(self, turn_id: str) -> None:
+        """Acknowledge committed turns; a client that is gone just misses it."""
+        if self.closed:
+            return
+        try:
+            await self.websocket.send_json({"type": "ack", "turn_id": turn_id})
+        except (RuntimeError, OSError, WebSocketDisconnect):
+            # Keep committing the turns that were already replied to.
+            self.closed = True
+            logger.info("call stream ack not delivered", extra={"turn_id": turn_id})
+
+    async def _commit(self, batch: list[PendingTurn]) -> None:
+        """Write a batch of turns in one transaction under the lead lock."""
+        lead_id = self.lead_id
+        last = batch[-1]
+        # Every column is written back, so onupdate would not fire.
+        values = {**last.snapshot, "updated_at": datetime.now(timezone.utc)}
+
+        async with self.cache.locked(lead_id):
+            if self.cache.generation(lead_id) != self.generation:
+                raise StreamClosed(CLOSE_CONFLICT, "Lead changed by another turn")
+
+            deltas = AnalyticsDeltas()
+            for pending in batch:
+                self.db.add_all(pending.events)
+                self.db.add(
+                    TurnRecord(
+                        call_id=self.call_id,
+                        turn_id=pending.turn_id,
+                        reply_text=pending.reply,
+                        state=pending.state,
+                    )
+                )
+                deltas.merge(pending.deltas)
+
+            try:
+                updated = await self.db.scalar(
+                    update(Call)
+                    .where(Call.call_id == self.call_id, Call.ended_at.is_(None))
+                    .values(current_state=last.state)
+                    .returning(Call.call_id)
+                )
+                if updated is None:
+                    raise StreamClosed(CLOSE_CONFLICT, "Call has ended")
+                await self.db.execute(
+                    update(LeadSnapshot)
+                    .where(LeadSnapshot.lead_id == lead_id)
+                    .values(**values)
+                )
+                await deltas.apply_async(self.db)
+                await self.db.commit()
+            except IntegrityError as exc:
+                # A turn_id of the batch was committed elsewhere (POST /turn).
+                await self.db.rollback()
+                self.cache.invalidate(lead_id)
+                raise StreamClosed(CLOSE_CONFLICT, "Turn already committed") from exc
+            except Exception:
+                await self.db.rollback()
+                self.cache.invalidate(lead_id)
+                raise
+
+            # --- Write-through ---
+            self.cache.committed(LeadSnapshot(**values))
+            self.generation = self.cache.generation(lead_id)
+
+    async def _close(self, exc: StreamClosed) -> None:
+        """Tell the client why, then close."""
+        logger.info("call stream closed", extra={"detail": exc.detail})
+        self.closed = True
+        await self.websocket.send_json({"type": "error", "detail": exc.detail})
+        await self.websocket.close(code=exc.code)
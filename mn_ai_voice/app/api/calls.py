@@ -1,128 +1,338 @@
 """Call lifecycle API routes."""
 
+import json
+import logging
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
 
-from mn_ai_voice.app.db.models import Call, Lead, LeadSnapshot, Event
+from fastapi import APIRouter, Depends, HTTPException, WebSocket
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.logging import set_log_context
+from mn_ai_voice.app.core.metrics import TURN_STAGE_DURATION
+from mn_ai_voice.app.core.timing import TurnTimer
+from mn_ai_voice.app.db.analytics import AnalyticsDeltas, qualification_key
+from mn_ai_voice.app.db.leads import resolve_lead
+from mn_ai_voice.app.db.ledger import EventLedger
+from mn_ai_voice.app.db.models import Call, LeadSnapshot, Event, TurnRecord
+from mn_ai_voice.app.db.snapshot_cache import snapshot_cache
+from mn_ai_voice.app.db.turn_loader import load_turn
+from mn_ai_voice.app.engine.phone import normalize_phone
+from mn_ai_voice.app.engine.prompt_audio import prompt_audio
 from mn_ai_voice.app.orchestrator.call_orchestrator import CallOrchestrator
-from mn_ai_voice.app.core.constants import CallState, CallStatus, EventType
+from mn_ai_voice.app.workers.summary_trigger import summary_trigger
+from mn_ai_voice.app.core.constants import CallStatus, EventType
+from mn_ai_voice.app.api.call_stream import CallStream
 from mn_ai_voice.app.api.dependencies import get_db
 from mn_ai_voice.app.api.schemas import UserTurnRequest
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 orchestrator = CallOrchestrator()
+ledger = EventLedger(settings.LEDGER_ARCHIVE_DIR)
+
+# Transcript roles by event type; other events are not part of it
+TRANSCRIPT_ROLES = {
+    EventType.USER_TURN.value: "user",
+    EventType.ASSISTANT_TURN.value: "assistant",
+}
+TRANSCRIPT_CHUNK_LINES = 100
 
 
 @router.post("/start")
-def start_call(
+async def start_call(
     from_phone: str,
-    db: Session = Depends(get_db),
+    flow: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """
     Start a new call session.
 
-    - Reuses Lead identity by phone
-    - Reuses LeadSnapshot per lead
-    - Creates a new Call per session
+    - Normalizes the caller's number to E.164 (see engine/phone.py)
+    - Reuses Lead identity by phone, creating it and its LeadSnapshot
+      in one upsert (see db/leads.py)
+    - Creates a new Call per session, on the named conversation flow
+      (see engine/flows.py; the default flow if omitted)
     - Emits CALL_STARTED event
+    - Counts the call (and a new lead) in the analytics aggregates
     """
 
-    # --- Find or create Lead ---
-    lead = (
-        db.query(Lead)
-        .filter(Lead.primary_phone == from_phone)
-        .one_or_none()
-    )
+    try:
+        phone = normalize_phone(from_phone)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
 
-    if lead is None:
-        lead = Lead(
-            lead_id=f"l_{uuid.uuid4().hex[:8]}",
-            primary_phone=from_phone,
-        )
-        db.add(lead)
-        db.flush()
+    try:
+        start_state = orchestrator.state_machine.start_state(flow)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-        # Create snapshot ONCE per lead
-        snapshot = LeadSnapshot(lead_id=lead.lead_id)
-        db.add(snapshot)
+    deltas = AnalyticsDeltas()
+
+    # --- Find or create Lead (and its snapshot, ONCE per lead) ---
+    lead_id, created = await resolve_lead(db, f"l_{uuid.uuid4().hex[:8]}", phone)
+    if created:
+        deltas.requalify(None, qualification_key(LeadSnapshot(lead_id=lead_id)))
 
     # --- Create Call ---
     call = Call(
         call_id=f"c_{uuid.uuid4().hex[:8]}",
-        lead_id=lead.lead_id,
-        from_phone=from_phone,
+        lead_id=lead_id,
+        from_phone=phone,
         direction="inbound",
         status=CallStatus.IN_PROGRESS.value,
-        current_state=CallState.ASK_LANGUAGE.value,
+        current_state=start_state.value,
+        flow=flow,
     )
     db.add(call)
-    db.flush()
 
     # --- Emit CALL_STARTED event ---
     db.add(
         Event(
             call_id=call.call_id,
             type=EventType.CALL_STARTED.value,
-            payload_json={"from_phone": from_phone},
+            payload_json={"from_phone": phone},
         )
     )
 
-    db.commit()
+    deltas.enter(start_state.value)
+    await deltas.apply_async(db)
+    await db.commit()
+
+    # The first turn then finds the lead and its generation without a refresh.
+    snapshot_cache.remember_call(str(call.call_id), lead_id)
+    snapshot_cache.track(lead_id)
 
     return {
         "call_id": call.call_id,
-        "next_prompt": {
-            "text": "Would you like to speak in English, Hindi, or Hinglish?"
-        },
+        "next_prompt": prompt_audio.describe(orchestrator.prompts.render(start_state)),
     }
 
 
 @router.post("/{call_id}/user_turn")
-def user_turn(
+async def user_turn(
     call_id: str,
     payload: UserTurnRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> dict:
     """
     Handle a single user turn.
 
-    Idempotent via turn_id.
+    Idempotent via turn_id: a replayed turn returns the original
+    assistant reply and state from the TurnRecord store.
+
+    The call, snapshot and TurnRecord are fetched in one statement
+    (see db/turn_loader.py) before the per-lead lock is taken; the
+    lead's cache generation tells whether they went stale meanwhile.
+
+    Logs one "turn handled" record per processed turn with the time
+    spent in each stage (see core/timing.py).
     """
 
-    call = db.get(Call, call_id)
+    set_log_context(call_id=call_id, turn_id=payload.turn_id)
+    timer = TurnTimer()
+
+    # --- Load call, snapshot and idempotency record (one statement) ---
+    with timer.stage("db_load"):
+        ctx = await load_turn(db, call_id, payload.turn_id, snapshot_cache)
+    if ctx.record is not None:
+        return _replay(ctx.record, ctx.snapshot)
+
+    call, snapshot = ctx.call, ctx.snapshot
     if call is None:
         raise HTTPException(status_code=404, detail="Call not found")
-
-    snapshot = (
-        db.query(LeadSnapshot)
-        .filter(LeadSnapshot.lead_id == call.lead_id)
-        .one_or_none()
-    )
+    if call.ended_at is not None:
+        raise HTTPException(status_code=409, detail="Call has ended")
     if snapshot is None:
         raise HTTPException(status_code=500, detail="Lead snapshot missing")
 
-    # --- Idempotency check ---
-    existing = (
-        db.query(Event)
-        .filter(
-            Event.call_id == call_id,
-            Event.type == EventType.USER_TURN.value,
-            Event.payload_json["turn_id"].as_string() == payload.turn_id,
+    # --- Serialize turns per lead (apply -> commit) ---
+    waiting = timer.elapsed()
+    async with snapshot_cache.locked(call.lead_id):
+        timer.add("lock_wait", timer.elapsed() - waiting)
+        if ctx.generation is None or snapshot_cache.generation(call.lead_id) != ctx.generation:
+            # Another turn for this lead may have committed since the
+            # load (whether or not we had to wait for the lock).
+            with timer.stage("db_load"):
+                await db.refresh(call)
+                await db.refresh(snapshot)
+
+        state_before, bucket_before = call.current_state, qualification_key(snapshot)
+        reply = orchestrator.handle_turn(db, call, snapshot, payload.text, timer)
+
+        deltas = AnalyticsDeltas()
+        deltas.transition(state_before, call.current_state)
+        deltas.requalify(bucket_before, qualification_key(snapshot))
+
+        db.add(
+            TurnRecord(
+                call_id=call_id,
+                turn_id=payload.turn_id,
+                reply_text=reply,
+                state=call.current_state,
+            )
         )
-        .one_or_none()
-    )
 
-    if existing:
-        return {
-            "assistant": {"text": "Already processed"},
+        try:
+            with timer.stage("commit"):
+                await deltas.apply_async(db)
+                await db.commit()
+        except IntegrityError:
+            # A concurrent retry of the same turn committed first.
+            await db.rollback()
+            snapshot_cache.invalidate(call.lead_id)
+            record = await db.get(TurnRecord, (call_id, payload.turn_id))
+            if record is None:
+                raise
+            return _replay(record, snapshot)
+        except Exception:
+            snapshot_cache.invalidate(call.lead_id)
+            raise
+
+        # --- Write-through ---
+        snapshot_cache.committed(snapshot)
+
+    for stage, seconds in timer.stages.items():
+        TURN_STAGE_DURATION.labels(stage).observe(seconds)
+    logger.info(
+        "turn handled",
+        extra={
             "state": call.current_state,
+            "stages_ms": timer.as_ms(),
+            "total_ms": round(timer.elapsed() * 1000, 3),
+        },
+    )
+
+    return {
+        "assistant": prompt_audio.describe(reply, str(snapshot.language)),
+        "state": call.current_state,
+    }
+
+
+@router.websocket("/{call_id}/stream")
+async def stream(
+    websocket: WebSocket,
+    call_id: str,
+    db: AsyncSession = Depends(get_db),
+) -> None:
+    """
+    Carry a call's turns over one WebSocket (see api/call_stream.py).
+
+    The call and snapshot are loaded once per connection; replies are
+    sent before the turn is committed, and an ack follows the commit.
+    On reconnect the call resumes from the last acknowledged turn.
+    """
+
+    await CallStream(websocket, db, call_id, orchestrator, snapshot_cache).run()
+
+
+@router.post("/{call_id}/end")
+async def end_call(
+    call_id: str,
+    reason: str = "hangup",
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """
+    End a call.
+
+    - Sets ended_at and status ENDED
+    - Emits CALL_ENDED event
+    - Wakes the summarizer (see workers/summary_trigger.py)
+
+    Idempotent: ending an ended call returns it unchanged, without a
+    second event.
+    """
+
+    call = await db.get(Call, call_id, with_for_update=True)
+    if call is None:
+        raise HTTPException(status_code=404, detail="Call not found")
+
+    if call.ended_at is None:
+        # Naive UTC, as the column returns it
+        call.ended_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        call.status = CallStatus.ENDED.value
+        db.add(
+            Event(
+                call_id=call_id,
+                type=EventType.CALL_ENDED.value,
+                payload_json={"reason": reason},
+            )
+        )
+        deltas = AnalyticsDeltas()
+        deltas.end(call.current_state)
+        await deltas.apply_async(db)
+        await summary_trigger.call_ended(db, call_id)
+        await db.commit()
+        summary_trigger.committed(call_id)
+
+    return {
+        "call_id": call_id,
+        "status": call.status,
+        "ended_at": call.ended_at.isoformat(),
+    }
+
+
+@router.get("/{call_id}/transcript")
+async def transcript(
+    call_id: str,
+    since_event_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream a call's conversation as NDJSON, oldest turn first.
+
+    One line per user or assistant turn, read from the event ledger
+    (archived segments and the hot table):
+
+        {"event_id": 12, "role": "user", "text": "...", "created_at": "..."}
+
+    To resume, pass the last event_id received as since_event_id.
+    """
+
+    if await db.get(Call, call_id) is None:
+        raise HTTPException(status_code=404, detail="Call not found")
+
+    return StreamingResponse(
+        _transcript_lines(db, call_id, since_event_id),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _transcript_lines(
+    db: AsyncSession, call_id: str, since_event_id: Optional[int]
+) -> AsyncIterator[str]:
+    """NDJSON transcript lines, sent in chunks of TRANSCRIPT_CHUNK_LINES."""
+    chunk: list[str] = []
+    async for event in ledger.aiter_call_events(db, call_id, since_event_id):
+        role = TRANSCRIPT_ROLES.get(event.type)
+        if role is None:
+            continue
+
+        payload = event.payload_json or {}
+        line = {
+            "event_id": event.event_id,
+            "role": role,
+            "text": payload.get("text"),
+            "created_at": event.created_at.isoformat() if event.created_at else None,
         }
+        chunk.append(json.dumps(line) + "\n")
+        if len(chunk) >= TRANSCRIPT_CHUNK_LINES:
+            yield "".join(chunk)
+            chunk.clear()
 
-    reply = orchestrator.handle_turn(db, call, snapshot, payload.text)
-    db.commit()
+    if chunk:
+        yield "".join(chunk)
 
+
+def _replay(record: TurnRecord, snapshot: Optional[LeadSnapshot]) -> dict:
+    """Build the response for an already-processed turn."""
+    language = str(snapshot.language) if snapshot is not None else None
     return {
-        "assistant": {"text": reply},
-        "state": call.current_state,
+        "assistant": prompt_audio.describe(str(record.reply_text), language),
+        "state": record.state,
     }
@@ -1,20 +1,34 @@
 """API dependencies for FastAPI routes."""
 
-from typing import Generator
+import hmac
+from typing import AsyncGenerator, Optional
 
-from sqlalchemy.orm import Session
+from fastapi import Header, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from mn_ai_voice.app.db.session import SessionLocal
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.db.session import AsyncSessionLocal
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Database dependency for FastAPI routes.
 
     Yields:
-        Database session for the request.
+        Async database session for the request.
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+def require_admin(x_admin_key: Optional[str] = Header(default=None)) -> None:
+    """Admin dependency: require the X-Admin-Key shared secret.
+
+    Raises:
+        HTTPException: 403 if the key is missing or wrong, or if no
+            ADMIN_API_KEY is configured (the admin API is then off).
+    """
+    expected = settings.ADMIN_API_KEY
+    if not expected or not x_admin_key or not hmac.compare_digest(
+        x_admin_key.encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Admin key required")
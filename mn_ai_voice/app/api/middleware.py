@@ -0,0 +1,37 @@
+"""ASGI middleware."""
+
+from time import perf_counter
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from mn_ai_voice.app.core.metrics import HTTP_REQUEST_DURATION
+
+
+class RouteLatencyMiddleware:
+    """
+    Records request latency per route template.
+
+    Labels use the matched route's path ("/calls/{call_id}/user_turn"),
+    not the raw URL, so label cardinality stays bounded; requests that
+    match no route are not recorded. Plain ASGI rather than
+    BaseHTTPMiddleware, so streamed responses are not buffered.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # The router stores the matched route in the scope.
+            route = scope.get("route")
+            if route is not None:
+                HTTP_REQUEST_DURATION.labels(
+                    getattr(route, "path", "unknown"), scope["method"]
+                ).observe(perf_counter() - start)
@@ -1,9 +1,33 @@
 """API request/response schemas for the application."""
 
-from pydantic import BaseModel
+from typing import Annotated, Literal
+
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class UserTurnRequest(BaseModel):
     """Request schema for user turn API endpoint."""
 
-    text: str
\ No newline at end of file
+    turn_id: str
+    text: str
+
+
+class StreamTurn(BaseModel):
+    """A user turn sent over the call stream WebSocket."""
+
+    type: Literal["turn"] = "turn"
+    turn_id: str
+    text: str
+
+
+class StreamPartial(BaseModel):
+    """A partial speech recognition hypothesis for a turn still being spoken."""
+
+    type: Literal["partial"]
+    turn_id: str
+    text: str
+
+
+StreamMessage: TypeAdapter[StreamTurn | StreamPartial] = TypeAdapter(
+    Annotated[StreamTurn | StreamPartial, Field(discriminator="type")]
+)
@@ -0,0 +1,186 @@
+"""
+Structured logging.
+
+Log records are JSON objects, one per line, carrying the call_id and
+turn_id of the request that emitted them (from context variables set
+by the API handlers).
+
+Nothing slow runs on the caller's thread: the root logger gets a
+QueueHandler that only stamps the context, applies sampling and puts
+the record on a bounded queue; a QueueListener thread does the JSON
+encoding and the write. If the queue is full the record is dropped
+(and counted) rather than blocking a turn.
+
+Sampling (LOG_SAMPLE_RATE) applies to records below WARNING and is
+decided per turn, so a sampled turn keeps all of its records.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Iterator, Optional
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.metrics import LOG_RECORDS_DROPPED
+
+call_id_var: ContextVar[Optional[str]] = ContextVar("call_id", default=None)
+turn_id_var: ContextVar[Optional[str]] = ContextVar("turn_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra`.
+_RECORD_ATTRS = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime"}
+
+
+def set_log_context(call_id: Optional[str] = None, turn_id: Optional[str] = None) -> None:
+    """Tag records from the current task (e.g. one request) with call and turn ids."""
+    call_id_var.set(call_id)
+    turn_id_var.set(turn_id)
+
+
+@contextmanager
+def log_context(call_id: Optional[str] = None, turn_id: Optional[str] = None) -> Iterator[None]:
+    """Tag records emitted inside the block, restoring the previous ids after."""
+    call_token = call_id_var.set(call_id)
+    turn_token = turn_id_var.set(turn_id)
+    try:
+        yield
+    finally:
+        turn_id_var.reset(turn_token)
+        call_id_var.reset(call_token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies call_id / turn_id from the context onto the record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.call_id = call_id_var.get()
+        record.turn_id = turn_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of records below WARNING.
+
+    Records of one turn (or call, outside turns) share a hash bucket,
+    so a turn is either logged completely or not at all.
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        if self.rate <= 0:
+            return False
+
+        key = f"{getattr(record, 'call_id', None)}:{getattr(record, 'turn_id', None)}"
+        if key == "None:None":
+            key = record.getMessage()
+        return zlib.crc32(key.encode("utf-8")) / 2**32 < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as one JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "call_id": getattr(record, "call_id", None),
+            "turn_id": getattr(record, "turn_id", None),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in data:
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only what must happen on the calling thread: merge the args
+        # (they may change later) and render any traceback. JSON
+        # encoding happens on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+_installed: Optional[tuple[QueueHandler, QueueListener]] = None
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    stream=None,
+) -> None:
+    """
+    Route the root logger through the queue to a JSON stream handler.
+
+    Safe to call again (e.g. per app startup); the previous setup is
+    replaced. Other root handlers are left in place.
+    """
+    global _installed  # pylint: disable=global-statement
+    shutdown_logging()
+
+    records: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(
+        SamplingFilter(settings.LOG_SAMPLE_RATE if sample_rate is None else sample_rate)
+    )
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter())
+    listener = QueueListener(records, output, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.setLevel(level or settings.LOG_LEVEL)
+    root.addHandler(handler)
+    listener.start()
+    _installed = (handler, listener)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and remove the handler installed by configure_logging."""
+    global _installed  # pylint: disable=global-statement
+    if _installed is None:
+        return
+    handler, listener = _installed
+    logging.getLogger().removeHandler(handler)
+    listener.stop()
+    _installed = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,216 @@
+"""
+Application metrics.
+
+All Prometheus metric objects are defined here so names, labels and
+multiprocess aggregation modes live in one place.
+
+Under several worker processes (e.g. uvicorn --workers N), set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers
+before they start: each process then writes its samples to mmap'd
+files there, without cross-process locks, and render() merges them on
+scrape.
+"""
+
+import os
+from typing import Iterable, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.metrics_core import Metric
+from prometheus_client.registry import Collector
+
+# ---------- Database connection pool ----------
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to check a connection out of the pool (queue wait, connect, pre-ping).",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT.",
+    ["engine"],
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Maximum connections the pool may open (pool size + overflow).",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_SATURATION = Gauge(
+    "db_pool_saturation_ratio",
+    "Checked-out connections as a fraction of pool capacity.",
+    ["engine"],
+    multiprocess_mode="livemax",
+)
+
+DB_CONNECTIONS_OPENED = Counter(
+    "db_pool_connections_opened_total",
+    "New DBAPI connections opened by the pool.",
+    ["engine"],
+)
+
+DB_CONNECTIONS_CLOSED = Counter(
+    "db_pool_connections_closed_total",
+    "DBAPI connections closed by the pool (recycle, overflow, dispose).",
+    ["engine"],
+)
+
+DB_CONNECTIONS_INVALIDATED = Counter(
+    "db_pool_connections_invalidated_total",
+    "Connections invalidated after errors or failed pre-ping.",
+    ["engine"],
+)
+
+
+# ---------- Prompt audio cache ----------
+
+PROMPT_AUDIO_REQUESTS = Counter(
+    "prompt_audio_requests_total",
+    "Prompt audio cache lookups by result (hit / miss).",
+    ["result"],
+)
+
+PROMPT_AUDIO_SYNTHESIZED = Counter(
+    "prompt_audio_synthesized_total",
+    "Prompts synthesized by the TTS backend (cache fills).",
+)
+
+
+# ---------- LeadSnapshot cache ----------
+
+SNAPSHOT_CACHE_REQUESTS = Counter(
+    "snapshot_cache_requests_total",
+    "LeadSnapshot cache lookups by result (hit / miss).",
+    ["result"],
+)
+
+SNAPSHOT_CACHE_EVICTIONS = Counter(
+    "snapshot_cache_evictions_total",
+    "LeadSnapshot cache entries dropped by reason (size / ttl / invalidate).",
+    ["reason"],
+)
+
+SNAPSHOT_CACHE_ENTRIES = Gauge(
+    "snapshot_cache_entries",
+    "LeadSnapshot entries currently cached.",
+    multiprocess_mode="livesum",
+)
+
+
+# ---------- Logging ----------
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the logging queue was full.",
+)
+
+
+# ---------- HTTP ----------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template and method.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+# ---------- Turns ----------
+
+TURN_STAGE_DURATION = Histogram(
+    "call_turn_stage_seconds",
+    "Time spent per user-turn stage (db_load, lock_wait, faq, extraction, "
+    "transition, commit).",
+    ["stage"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+TURNS_HANDLED = Counter(
+    "call_turns_total",
+    "User turns handled, by path (faq interrupt / flow).",
+    ["path"],
+)
+
+STATE_TRANSITIONS = Counter(
+    "state_transitions_total",
+    "StateMachine.next_state decisions.",
+    ["from_state", "to_state"],
+)
+
+
+# ---------- CRM outbox ----------
+
+OUTBOX_DELIVERY_LAG = Histogram(
+    "crm_outbox_delivery_lag_seconds",
+    "Time from enqueue to successful CRM delivery.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 4 * 3600, 24 * 3600),
+)
+
+
+# ---------- Summarizer ----------
+
+CALLS_SUMMARIZED = Counter(
+    "summarizer_calls_total",
+    "Calls summarized, by mode (single / batch).",
+    ["mode"],
+)
+
+
+# ---------- Exposition ----------
+
+class _Families(Collector):
+    """Adapts already-collected metric families to generate_latest."""
+
+    def __init__(self, families: Iterable[Metric]) -> None:
+        self.families = list(families)
+
+    def collect(self) -> Iterable[Metric]:
+        """Return the families."""
+        return self.families
+
+
+def multiprocess_dir() -> Optional[str]:
+    """The shared multiprocess directory, if multiprocess mode is on."""
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR") or None
+
+
+def render(extra: Iterable[Metric] = ()) -> bytes:
+    """
+    Text exposition of this process's (or all processes') metrics.
+
+    Args:
+        extra: Families computed at scrape time (e.g. from the database),
+            appended as they are.
+    """
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        output = generate_latest(registry)
+    else:
+        output = generate_latest(REGISTRY)
+    return output + generate_latest(_Families(extra))
+
+
+def process_exited(pid: int) -> None:
+    """Drop a stopped worker's live gauges (multiprocess mode only)."""
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
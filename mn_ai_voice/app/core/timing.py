@@ -0,0 +1,40 @@
+"""
+Per-turn latency breakdown.
+
+A TurnTimer accumulates wall time per stage of one user turn (DB
+load, lock wait, FAQ routing, extraction, state transition, commit);
+the API logs the breakdown once the turn is done.
+"""
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+
+class TurnTimer:
+    """Wall time per named stage, in seconds."""
+
+    def __init__(self) -> None:
+        self.started = perf_counter()
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the block, adding to any earlier time of the same stage."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add time measured elsewhere to a stage."""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def elapsed(self) -> float:
+        """Seconds since the timer was created."""
+        return perf_counter() - self.started
+
+    def as_ms(self) -> dict[str, float]:
+        """Stage times in milliseconds, rounded to microseconds."""
+        return {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
@@ -0,0 +1,142 @@
+"""
+Incrementally maintained analytics aggregates.
+
+Admin dashboards read three small tables instead of running GROUP BY
+scans over calls and lead_snapshot:
+
+- funnel_stats: per CallState, transitions into it, open calls in it
+  and calls that ended in it (drop-off)
+- qualification_stats: leads by qualification status, region and
+  budget band
+- turn_stats: turns-per-call histogram of summarized calls
+
+Writers collect changes in an AnalyticsDeltas and execute its
+statements in the same transaction as the change they count, so the
+aggregates commit or roll back with it:
+
+- start_call: entry into the first state; a new lead's bucket
+- user_turn: state transition; qualification bucket move
+- end_call: drop-off in the call's final state
+- summarizer: the call's turn count
+
+Each delta is one INSERT ... ON CONFLICT DO UPDATE adding to the
+counters (Postgres and SQLite). Statements run in key order so
+concurrent transactions lock aggregate rows in the same order.
+workers/analytics_rebuild.py recomputes every table from scratch.
+"""
+
+from collections import Counter
+from typing import Optional, cast
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+from mn_ai_voice.app.db.models import FunnelStat, LeadSnapshot, QualificationStat, TurnStat
+
+FUNNEL = cast(Table, FunnelStat.__table__)
+QUALIFICATION = cast(Table, QualificationStat.__table__)
+TURNS = cast(Table, TurnStat.__table__)
+
+# Calls with more turns share the last histogram bucket
+TURNS_CAP = 50
+
+UNKNOWN = "unknown"
+
+QualificationKey = tuple[str, str, str]
+
+
+def qualification_key(snapshot: LeadSnapshot) -> QualificationKey:
+    """A snapshot's (qualification_status, region_value, budget_band) bucket."""
+    return (
+        str(snapshot.qualification_status or UNKNOWN),
+        str(snapshot.region_value or UNKNOWN),
+        str(snapshot.budget_band or UNKNOWN),
+    )
+
+
+def upsert_add(dialect: str, table: Table, key: dict, counts: dict) -> Insert:
+    """INSERT key with counts, or add counts to the existing row."""
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(table).values(**key, **counts)
+    return stmt.on_conflict_do_update(
+        index_elements=list(key),
+        set_={col: table.c[col] + stmt.excluded[col] for col in counts},
+    )
+
+
+class AnalyticsDeltas:
+    """Aggregate changes made by one transaction."""
+
+    def __init__(self) -> None:
+        self.funnel: Counter[tuple[str, str]] = Counter()  # (state, column)
+        self.qualification: Counter[QualificationKey] = Counter()
+        self.turns: Counter[int] = Counter()
+
+    def enter(self, state: str) -> None:
+        """A call moved into state (or started in it)."""
+        self.funnel[(state, "entered")] += 1
+        self.funnel[(state, "in_progress")] += 1
+
+    def transition(self, before: str, after: str) -> None:
+        """A turn moved a call from before to after (no-op if unchanged)."""
+        if before != after:
+            self.funnel[(before, "in_progress")] -= 1
+            self.enter(after)
+
+    def end(self, state: str) -> None:
+        """A call ended in state."""
+        self.funnel[(state, "in_progress")] -= 1
+        self.funnel[(state, "ended")] += 1
+
+    def requalify(self, before: Optional[QualificationKey], after: QualificationKey) -> None:
+        """A lead moved buckets (before is None for a new lead)."""
+        if before == after:
+            return
+        if before is not None:
+            self.qualification[before] -= 1
+        self.qualification[after] += 1
+
+    def summarized(self, turns: int) -> None:
+        """A call with this many turns was summarized."""
+        self.turns[min(turns, TURNS_CAP)] += 1
+
+    def merge(self, other: "AnalyticsDeltas") -> None:
+        """Add another set of deltas to this one (e.g. to commit them together)."""
+        self.funnel.update(other.funnel)
+        self.qualification.update(other.qualification)
+        self.turns.update(other.turns)
+
+    def statements(self, dialect: str) -> list[Insert]:
+        """Upserts applying the deltas, in key order; zero deltas are skipped."""
+        stmts = []
+
+        by_state: dict[str, dict[str, int]] = {}
+        for (state, column), n in sorted(self.funnel.items()):
+            if n:
+                by_state.setdefault(state, {})[column] = n
+        for state, counts in by_state.items():
+            stmts.append(upsert_add(dialect, FUNNEL, {"state": state}, counts))
+
+        for (status, region, band), n in sorted(self.qualification.items()):
+            if n:
+                key = {"qualification_status": status, "region_value": region, "budget_band": band}
+                stmts.append(upsert_add(dialect, QUALIFICATION, key, {"leads": n}))
+
+        for turns, n in sorted(self.turns.items()):
+            if n:
+                stmts.append(upsert_add(dialect, TURNS, {"turns": turns}, {"calls": n}))
+
+        return stmts
+
+    def apply(self, db: Session) -> None:
+        """Execute the deltas in db's transaction."""
+        for stmt in self.statements(db.get_bind().dialect.name):
+            db.execute(stmt)
+
+    async def apply_async(self, db: AsyncSession) -> None:
+        """Execute the deltas in db's transaction."""
+        for stmt in self.statements(db.get_bind().dialect.name):
+            await db.execute(stmt)
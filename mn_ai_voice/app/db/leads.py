@@ -0,0 +1,117 @@
+"""
+Lead resolution by phone number.
+
+start_call finds a caller's lead, or creates it together with its
+LeadSnapshot, without a SELECT-then-INSERT race: the lead is inserted
+with ON CONFLICT (primary_phone) DO NOTHING RETURNING, so concurrent
+calls from one new number create exactly one lead and the others find
+it.
+
+On Postgres this is one statement, and one round trip: data-modifying
+CTEs insert the lead and its snapshot, and a UNION ALL returns either
+the new lead or the existing one. A lead committed by a concurrent
+transaction after the statement started is invisible to it; that
+rare case costs one more SELECT. SQLite has no data-modifying CTEs
+(and no network round trips), so there the insert, the snapshot
+insert or the SELECT run as separate statements.
+"""
+
+from typing import Any, Optional, cast
+
+from sqlalchemy import CompoundSelect, Table, false, literal, select, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import ColumnDefault
+from sqlalchemy.sql.dml import Insert
+
+from mn_ai_voice.app.db.models import Lead, LeadSnapshot
+
+LEADS = cast(Table, Lead.__table__)
+SNAPSHOTS = cast(Table, LeadSnapshot.__table__)
+
+
+def column_defaults(table: Table) -> dict[str, Any]:
+    """
+    The table's Python-side column defaults, evaluated now.
+
+    SQLAlchemy cannot apply callable defaults to an INSERT nested in a
+    CTE, so the statements here pass every defaulted column explicitly.
+    """
+    values = {}
+    for column in table.c:
+        default = column.default
+        if isinstance(default, ColumnDefault) and not column.primary_key:
+            values[column.name] = default.arg(None) if default.is_callable else default.arg
+    return values
+
+
+def insert_lead(dialect: str, lead_id: str, phone: str) -> Insert:
+    """INSERT a lead unless the phone has one, RETURNING its lead_id if inserted."""
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return (
+        insert(LEADS)
+        .values(**column_defaults(LEADS), lead_id=lead_id, primary_phone=phone)
+        .on_conflict_do_nothing(index_elements=["primary_phone"])
+        .returning(LEADS.c.lead_id)
+    )
+
+
+def insert_snapshot(dialect: str, lead_id: str) -> Insert:
+    """INSERT a lead's empty snapshot unless it has one."""
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return (
+        insert(SNAPSHOTS)
+        .values(**column_defaults(SNAPSHOTS), lead_id=lead_id)
+        .on_conflict_do_nothing()
+    )
+
+
+def resolve_statement(lead_id: str, phone: str) -> CompoundSelect:
+    """
+    Postgres: create the lead and snapshot, or find the lead, in one statement.
+
+    Returns (lead_id, created) rows: the new lead, or the existing one,
+    or no row if a concurrent insert of the phone was not yet visible.
+    """
+    new_lead = insert_lead("postgresql", lead_id, phone).cte("new_lead")
+    defaults = column_defaults(SNAPSHOTS)
+    snapshot = select(
+        new_lead.c.lead_id,
+        *(literal(value, SNAPSHOTS.c[name].type) for name, value in defaults.items()),
+    )
+    new_snapshot = (
+        postgresql.insert(SNAPSHOTS)
+        .from_select(["lead_id", *defaults], snapshot)
+        .on_conflict_do_nothing()
+        .cte("new_snapshot")
+    )
+    created = select(new_lead.c.lead_id, true().label("created")).add_cte(new_snapshot)
+    existing = select(LEADS.c.lead_id, false()).where(LEADS.c.primary_phone == phone)
+    return created.union_all(existing)
+
+
+async def resolve_lead(db: AsyncSession, lead_id: str, phone: str) -> tuple[str, bool]:
+    """
+    Return (lead_id, created) for phone, creating the lead as lead_id
+    (with an empty snapshot) if the phone has none.
+
+    phone must already be normalized (see engine/phone.py).
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        row = (await db.execute(resolve_statement(lead_id, phone))).first()
+        if row is not None:
+            return row.lead_id, row.created
+    else:
+        inserted: Optional[str] = (
+            await db.execute(insert_lead(dialect, lead_id, phone))
+        ).scalar_one_or_none()
+        if inserted is not None:
+            await db.execute(insert_snapshot(dialect, inserted))
+            return inserted, True
+
+    existing = (
+        await db.execute(select(LEADS.c.lead_id).where(LEADS.c.primary_phone == phone))
+    ).scalar_one()
+    return existing, False
@@ -0,0 +1,426 @@
+"""
+Event ledger partitioning and archived segments.
+
+The events table is logically partitioned by created_at (day or month).
+Cold partitions are moved into compressed JSONL segment files so the hot
+table stays small; EventLedger reads across both transparently.
+
+Segment layout (one pair of files per segment):
+
+- events-<partition>[.<n>].jsonl.gz: one gzip member per call, rows
+  ordered by (call_id, event_id), so a single call can be read without
+  decompressing the whole segment
+- events-<partition>[.<n>].index.json: partition metadata and, per
+  call, the byte offset/length of its gzip member
+
+A partition's first segment has no sequence suffix. Rows that reach
+an already archived partition later (late writes, ids committed out
+of order) go into follow-up segments .1, .2, ...; readers merge all
+of them by event_id.
+
+The index is written last; a segment without an index is incomplete
+and ignored.
+"""
+
+import asyncio
+import gzip
+import heapq
+import io
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import groupby, islice
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterable, Iterator, Optional, cast
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from mn_ai_voice.app.db.models import Event
+
+SEGMENT_PREFIX = "events-"
+DATA_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".index.json"
+
+
+@dataclass(frozen=True)
+class LedgerEvent:
+    """A ledger event, read from either the hot table or a segment."""
+
+    event_id: int
+    call_id: str
+    type: str
+    payload_json: Any
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_row(cls, event: Event) -> "LedgerEvent":
+        """Build from an Event ORM row."""
+        return cls(
+            event_id=cast(int, event.event_id),
+            call_id=cast(str, event.call_id),
+            type=cast(str, event.type),
+            payload_json=event.payload_json,
+            created_at=cast(Optional[datetime], event.created_at),
+        )
+
+    def to_record(self) -> dict:
+        """Serialize to a JSON-compatible segment record."""
+        return {
+            "event_id": self.event_id,
+            "call_id": self.call_id,
+            "type": self.type,
+            "payload_json": self.payload_json,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict) -> "LedgerEvent":
+        """Deserialize a segment record."""
+        created_at = record.get("created_at")
+        return cls(
+            event_id=record["event_id"],
+            call_id=record["call_id"],
+            type=record["type"],
+            payload_json=record["payload_json"],
+            created_at=datetime.fromisoformat(created_at) if created_at else None,
+        )
+
+
+# ---------- Partitioning ----------
+
+def partition_key(ts: datetime, granularity: str) -> str:
+    """Return the partition key ("2026-08" or "2026-08-14") for a timestamp."""
+    if granularity == "day":
+        return ts.strftime("%Y-%m-%d")
+    return ts.strftime("%Y-%m")
+
+
+def partition_bounds(key: str) -> tuple[datetime, datetime]:
+    """Return the [start, end) range covered by a partition key."""
+    if len(key) == 10:
+        start = datetime.strptime(key, "%Y-%m-%d")
+        return start, datetime.fromordinal(start.toordinal() + 1)
+
+    start = datetime.strptime(key, "%Y-%m")
+    if start.month == 12:
+        return start, start.replace(year=start.year + 1, month=1)
+    return start, start.replace(month=start.month + 1)
+
+
+def hot_cutoff(now: datetime, granularity: str, hot_partitions: int) -> datetime:
+    """Return the start of the oldest partition that must stay hot."""
+    start, _ = partition_bounds(partition_key(now, granularity))
+    for _ in range(max(hot_partitions, 1) - 1):
+        start, _ = partition_bounds(partition_key(
+            datetime.fromordinal(start.toordinal() - 1), granularity
+        ))
+    return start
+
+
+# ---------- Segment files ----------
+
+@dataclass(frozen=True)
+class Segment:
+    """Index of one archived partition."""
+
+    partition: str
+    data_path: Path
+    rows: int
+    min_event_id: int
+    max_event_id: int
+    calls: dict[str, list[int]]  # call_id -> [offset, length, min_id, max_id]
+    sequence: int = 0  # 0 for the partition's first segment
+
+    def iter_events(self) -> Iterator[LedgerEvent]:
+        """Yield every event in the segment."""
+        with open(self.data_path, "rb") as f:
+            for offset, length, _, _ in self.calls.values():
+                f.seek(offset)
+                yield from _decode_member(f.read(length))
+
+    def covers(self, call_id: str, event_id: int) -> bool:
+        """Whether event_id lies within the call's id range in this segment."""
+        entry = self.calls.get(call_id)
+        return entry is not None and entry[2] <= event_id <= entry[3]
+
+    def iter_call(self, call_id: str) -> Iterator[LedgerEvent]:
+        """Yield one call's events from the segment."""
+        entry = self.calls.get(call_id)
+        if entry is None:
+            return
+        with open(self.data_path, "rb") as f:
+            f.seek(entry[0])
+            yield from _decode_member(f.read(entry[1]))
+
+
+def write_segment(
+    archive_dir: Path,
+    partition: str,
+    events: Iterable[LedgerEvent],
+    sequence: int = 0,
+) -> Optional[Segment]:
+    """
+    Write events (ordered by call_id, event_id) as a segment.
+
+    Files are written under temporary names, fsynced and then renamed,
+    data first and index last, so readers never see partial segments.
+
+    Args:
+        archive_dir: Directory holding the segments.
+        partition: Partition key of the events.
+        events: Events to write.
+        sequence: 0 for a partition's first segment, n for its n-th
+            follow-up segment.
+
+    Returns:
+        The written Segment, or None if there were no events.
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"{SEGMENT_PREFIX}{partition}" + (f".{sequence}" if sequence else "")
+    data_path = archive_dir / f"{stem}{DATA_SUFFIX}"
+    index_path = archive_dir / f"{stem}{INDEX_SUFFIX}"
+    tmp_data = data_path.with_name(data_path.name + ".tmp")
+    tmp_index = index_path.with_name(index_path.name + ".tmp")
+
+    calls: dict[str, list[int]] = {}
+    rows = 0
+    min_id: Optional[int] = None
+    max_id: Optional[int] = None
+
+    with open(tmp_data, "wb") as f:
+        for call_id, group in groupby(events, key=lambda e: e.call_id):
+            call_events = list(group)
+            first_id, last_id = call_events[0].event_id, call_events[-1].event_id
+
+            offset = f.tell()
+            f.write(gzip.compress(b"".join(_encode(e) for e in call_events)))
+            calls[call_id] = [offset, f.tell() - offset, first_id, last_id]
+
+            rows += len(call_events)
+            min_id = first_id if min_id is None else min(min_id, first_id)
+            max_id = last_id if max_id is None else max(max_id, last_id)
+
+        f.flush()
+        os.fsync(f.fileno())
+
+    if rows == 0:
+        tmp_data.unlink()
+        return None
+
+    segment = Segment(
+        partition=partition,
+        data_path=data_path,
+        rows=rows,
+        min_event_id=min_id or 0,
+        max_event_id=max_id or 0,
+        calls=calls,
+        sequence=sequence,
+    )
+
+    with open(tmp_index, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "partition": partition,
+                "data_file": data_path.name,
+                "rows": rows,
+                "min_event_id": segment.min_event_id,
+                "max_event_id": segment.max_event_id,
+                "sequence": sequence,
+                "calls": calls,
+            },
+            f,
+        )
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_data, data_path)
+    os.replace(tmp_index, index_path)
+    return segment
+
+
+def _encode(event: LedgerEvent) -> bytes:
+    return json.dumps(event.to_record()).encode("utf-8") + b"\n"
+
+
+def _decode_member(member: bytes) -> Iterator[LedgerEvent]:
+    with gzip.GzipFile(fileobj=io.BytesIO(member)) as f:
+        for line in f:
+            yield LedgerEvent.from_record(json.loads(line))
+
+
+def _unique(events: Iterable[LedgerEvent]) -> Iterator[LedgerEvent]:
+    """Drop repeats of the previous event_id from an event_id ordered stream."""
+    last = None
+    for event in events:
+        if event.event_id != last:
+            last = event.event_id
+            yield event
+
+
+class SegmentCatalog:
+    """
+    In-memory catalog of archived segments.
+
+    Index files are parsed once and cached by modification time.
+    """
+
+    def __init__(self, archive_dir: Path) -> None:
+        self.archive_dir = Path(archive_dir)
+        self._cache: dict[Path, tuple[float, Segment]] = {}
+
+    def segments(self) -> list[Segment]:
+        """Return all complete segments, oldest partition first."""
+        if not self.archive_dir.exists():
+            return []
+
+        found = []
+        for index_path in sorted(self.archive_dir.glob(f"{SEGMENT_PREFIX}*{INDEX_SUFFIX}")):
+            mtime = index_path.stat().st_mtime
+            cached = self._cache.get(index_path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, self._load(index_path))
+                self._cache[index_path] = cached
+            found.append(cached[1])
+        return sorted(found, key=lambda seg: (seg.partition, seg.sequence))
+
+    def for_partition(self, partition: str) -> list[Segment]:
+        """Return a partition's segments, first segment first."""
+        return [seg for seg in self.segments() if seg.partition == partition]
+
+    def iter_call_events(
+        self,
+        call_id: str,
+        after_event_id: Optional[int] = None,
+    ) -> Iterator[LedgerEvent]:
+        """
+        Return archived events for one call in event_id order.
+
+        Segments are listed when this is called, not when iteration
+        starts. Each segment's member for the call is already ordered,
+        so members are streamed and merged (follow-up segments may hold
+        ids lower than earlier segments) rather than collected.
+        """
+        after = after_event_id if after_event_id is not None else float("-inf")
+        members = [
+            (event for event in segment.iter_call(call_id) if event.event_id > after)
+            for segment in self.segments()
+            if call_id in segment.calls and segment.calls[call_id][3] > after
+        ]
+        return _unique(heapq.merge(*members, key=lambda event: event.event_id))
+
+    @staticmethod
+    def _load(index_path: Path) -> Segment:
+        with open(index_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return Segment(
+            partition=meta["partition"],
+            data_path=index_path.with_name(meta["data_file"]),
+            rows=meta["rows"],
+            min_event_id=meta["min_event_id"],
+            max_event_id=meta["max_event_id"],
+            calls=meta["calls"],
+            sequence=meta.get("sequence", 0),
+        )
+
+
+# ---------- Reader ----------
+
+class EventLedger:
+    """
+    Reads call events across archived segments and the hot table.
+
+    The hot statement is executed before the segments are listed: rows
+    an archiver run deletes after the statement started are still
+    returned by it, and rows deleted before were written to a segment
+    whose index then already exists. Rows seen on both sides (also
+    after an archival run interrupted before its delete) are read once.
+    """
+
+    def __init__(self, archive_dir: Path) -> None:
+        self.catalog = SegmentCatalog(archive_dir)
+
+    def iter_call_events(
+        self,
+        db: Session,
+        call_id: str,
+        since_event_id: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> Iterator[LedgerEvent]:
+        """
+        Yield a call's events in event_id order, oldest first.
+
+        Args:
+            db: Session used for the hot table.
+            call_id: Call whose events are read.
+            since_event_id: Only events with a greater event_id are returned.
+            batch_size: Rows fetched per round trip from the hot table.
+        """
+        rows = db.execute(
+            _hot_query(call_id, since_event_id).execution_options(yield_per=batch_size)
+        )
+        archived = self.catalog.iter_call_events(call_id, since_event_id)
+        hot = (LedgerEvent(**row._mapping) for row in rows)
+
+        # Archived events come first among equal ids, so they win.
+        yield from _unique(heapq.merge(archived, hot, key=lambda event: event.event_id))
+
+    async def aiter_call_events(
+        self,
+        db: AsyncSession,
+        call_id: str,
+        since_event_id: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[LedgerEvent]:
+        """
+        Async form of iter_call_events, for the API.
+
+        Hot rows are streamed through a server-side cursor as plain
+        rows (not ORM objects, which the session would keep), and
+        archived events are decoded batch_size at a time in a worker
+        thread, so memory stays flat however long the call.
+        """
+        rows = await db.stream(
+            _hot_query(call_id, since_event_id).execution_options(yield_per=batch_size)
+        )
+        archived = await asyncio.to_thread(
+            self.catalog.iter_call_events, call_id, since_event_id
+        )
+        buffered: Iterator[LedgerEvent] = iter(())
+
+        async def next_archived() -> Optional[LedgerEvent]:
+            nonlocal buffered
+            event = next(buffered, None)
+            if event is None:
+                batch = await asyncio.to_thread(lambda: list(islice(archived, batch_size)))
+                buffered = iter(batch)
+                event = next(buffered, None)
+            return event
+
+        pending = await next_archived()
+        async for row in rows:
+            while pending is not None and pending.event_id < row.event_id:
+                yield pending
+                pending = await next_archived()
+            if pending is None or pending.event_id != row.event_id:
+                yield LedgerEvent(**row._mapping)
+
+        while pending is not None:
+            yield pending
+            pending = await next_archived()
+
+
+def _hot_query(call_id: str, since_event_id: Optional[int]) -> Select:
+    """Select a call's hot rows as plain columns, in event_id order."""
+    query = select(
+        Event.event_id,
+        Event.call_id,
+        Event.type,
+        Event.payload_json,
+        Event.created_at,
+    ).where(Event.call_id == call_id)
+    if since_event_id is not None:
+        query = query.where(Event.event_id > since_event_id)
+    return query.order_by(Event.event_id)
@@ -16,6 +16,7 @@ from sqlalchemy import (
     JSON,
     Integer,
     ForeignKey,
+    Index,
 )
 
 
@@ -66,6 +67,7 @@ class Call(Base):
 
     status = Column(String)        # CallStatus enum value
     current_state = Column(String) # CallState enum value
+    flow = Column(String, nullable=True)  # engine/flows.py flow name; None = default
 
     started_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     ended_at = Column(DateTime, nullable=True)
@@ -82,9 +84,20 @@ class Event(Base):
     Immutable event log for a call.
 
     No idempotency — every event is recorded.
+    Turn idempotency lives in TurnRecord.
     """
 
     __tablename__ = "events"
+    __table_args__ = (
+        # Ordered per-call reads (transcript reconstruction)
+        Index("ix_events_call_id_event_id", "call_id", "event_id"),
+        # Per-call reads filtered by type (summaries, turn counts)
+        Index("ix_events_call_id_type_event_id", "call_id", "type", "event_id"),
+        # Time-range scans by type (e.g. recently ended calls)
+        Index("ix_events_type_created_at", "type", "created_at"),
+        # Partition range scans (ledger archival)
+        Index("ix_events_created_at", "created_at"),
+    )
 
     event_id = Column(Integer, primary_key=True)
     call_id = Column(String, ForeignKey("calls.call_id"), nullable=False)
@@ -95,6 +108,33 @@ class Event(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
+# =========================
+# Turn Idempotency
+# =========================
+
+class TurnRecord(Base):
+    """
+    Idempotency record for a processed user turn.
+
+    Keyed on (call_id, turn_id) so a replayed turn resolves with a
+    single primary-key lookup and returns the original reply.
+    """
+
+    __tablename__ = "turn_records"
+
+    call_id = Column(
+        String,
+        ForeignKey("calls.call_id"),
+        primary_key=True,
+    )
+    turn_id = Column(String, primary_key=True)
+
+    reply_text = Column(String, nullable=False)
+    state = Column(String, nullable=False)  # CallState after the turn
+
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
 # =========================
 # Lead Snapshot (Identity-level memory)
 # =========================
@@ -145,6 +185,11 @@ class Artifact(Base):
     """
 
     __tablename__ = "artifacts"
+    __table_args__ = (
+        # Summary lookups per call; one artifact of each type per call
+        # (concurrent summarizers skip conflicting inserts)
+        Index("ix_artifacts_call_id_type", "call_id", "type", unique=True),
+    )
 
     artifact_id = Column(Integer, primary_key=True)
     call_id = Column(String, ForeignKey("calls.call_id"), nullable=False)
@@ -166,21 +211,42 @@ class CRMOutbox(Base):
     Outbox table for CRM actions.
 
     Uses idempotency_key to guarantee exactly-once semantics.
+
+    A pending row is due once next_attempt_at has passed. Workers lease
+    rows by setting locked_by/locked_until and moving next_attempt_at
+    to the lease expiry; failed deliveries are rescheduled with backoff
+    (see workers/outbox_worker.py). Rows carrying a lead_id are
+    coalesced per lead before delivery.
     """
 
     __tablename__ = "crm_outbox"
+    __table_args__ = (
+        # Lease scans: due pending rows first
+        Index("ix_crm_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        # Coalescing: other pending rows for a leased lead
+        Index("ix_crm_outbox_lead_id_status", "lead_id", "status"),
+    )
 
     outbox_id = Column(Integer, primary_key=True)
     call_id = Column(String, ForeignKey("calls.call_id"), nullable=False)
+    lead_id = Column(String, ForeignKey("leads.lead_id"), nullable=True)
 
     action = Column(String)  # upsert_lead / set_stage / append_note
     payload_json = Column(JSON)
 
     idempotency_key = Column(String, unique=True, nullable=False)
 
-    status = Column(String, default="pending")  # pending / success / failed
+    status = Column(String, default="pending")  # pending / success / dead
     attempts = Column(Integer, default=0)
     last_error = Column(String, nullable=True)
+    next_attempt_at = Column(
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+    )
+
+    locked_by = Column(String, nullable=True)  # worker id holding the lease
+    locked_until = Column(DateTime, nullable=True)
 
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
@@ -188,3 +254,40 @@ class CRMOutbox(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+
+
+# =========================
+# Analytics Aggregates (see db/analytics.py)
+# =========================
+
+class FunnelStat(Base):
+    """Per-state call funnel counters."""
+
+    __tablename__ = "funnel_stats"
+
+    state = Column(String, primary_key=True)  # CallState enum value
+
+    entered = Column(Integer, nullable=False, default=0)  # transitions into the state
+    in_progress = Column(Integer, nullable=False, default=0)  # open calls in the state
+    ended = Column(Integer, nullable=False, default=0)  # calls that ended in the state
+
+
+class QualificationStat(Base):
+    """Lead counts by qualification status, region and budget band."""
+
+    __tablename__ = "qualification_stats"
+
+    qualification_status = Column(String, primary_key=True)
+    region_value = Column(String, primary_key=True)
+    budget_band = Column(String, primary_key=True)
+
+    leads = Column(Integer, nullable=False, default=0)
+
+
+class TurnStat(Base):
+    """Histogram of turns per summarized call."""
+
+    __tablename__ = "turn_stats"
+
+    turns = Column(Integer, primary_key=True, autoincrement=False)  # capped at TURNS_CAP
+    calls = Column(Integer, nullable=False, default=0)
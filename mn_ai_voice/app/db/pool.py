@@ -0,0 +1,103 @@
+"""
+Instrumented connection pools.
+
+Pool subclasses and event listeners that export checkout latency,
+saturation and connection churn to the metrics in core/metrics.py.
+The engine label comes from the engine's pool_logging_name.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from mn_ai_voice.app.core.metrics import (
+    DB_CONNECTIONS_CLOSED,
+    DB_CONNECTIONS_INVALIDATED,
+    DB_CONNECTIONS_OPENED,
+    DB_POOL_CAPACITY,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_POOL_SATURATION,
+)
+
+
+def _label(pool: Pool) -> str:
+    return getattr(pool, "logging_name", None) or "default"
+
+
+class _CheckoutTimingMixin:
+    """Times Pool.connect(), which blocks while the pool is exhausted."""
+
+    def connect(self):  # type: ignore[no-untyped-def]
+        """Check out a connection, recording latency and timeouts."""
+        label = _label(self)  # type: ignore[arg-type]
+        start = time.perf_counter()
+        try:
+            return super().connect()  # type: ignore[misc]
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(label).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    """QueuePool that records checkout latency."""
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout latency."""
+
+
+def instrument_engine(engine: Engine, capacity: int = 0) -> None:
+    """
+    Attach saturation and churn listeners to an engine's pool.
+
+    Args:
+        engine: Sync engine (use AsyncEngine.sync_engine for async).
+        capacity: Pool size + max overflow; 0 skips saturation.
+    """
+
+    label = _label(engine.pool)
+    checked_out = DB_POOL_CHECKED_OUT.labels(label)
+    saturation = DB_POOL_SATURATION.labels(label)
+
+    if capacity:
+        DB_POOL_CAPACITY.labels(label).set(capacity)
+
+    # Pool.checkedout() is not yet updated when "checkin" fires,
+    # so keep our own count.
+    in_use = [0]
+    lock = threading.Lock()
+
+    def _track(delta: int) -> None:
+        with lock:
+            in_use[0] += delta
+            current = in_use[0]
+        checked_out.set(current)
+        if capacity:
+            saturation.set(current / capacity)
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, record, proxy):  # pylint: disable=unused-argument
+        _track(1)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, record):  # pylint: disable=unused-argument
+        _track(-1)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, record):  # pylint: disable=unused-argument
+        DB_CONNECTIONS_OPENED.labels(label).inc()
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection, record):  # pylint: disable=unused-argument
+        DB_CONNECTIONS_CLOSED.labels(label).inc()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, record, exception):  # pylint: disable=unused-argument
+        DB_CONNECTIONS_INVALIDATED.labels(label).inc()
@@ -1,12 +1,83 @@
 """Database session and engine configuration.
 
-Provides SQLAlchemy engine and session factory.
+Provides SQLAlchemy engines and session factories:
+
+- engine / SessionLocal: sync, used by workers and scripts
+- async_engine / AsyncSessionLocal: async, used by the API request path
+
+Both engines use the pool settings from Settings and export pool
+telemetry (see db/pool.py).
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.config import Settings, settings
+from mn_ai_voice.app.db.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    instrument_engine,
+)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for: {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def engine_options(config: Settings, label: str, is_async: bool = False) -> dict:
+    """
+    Build create_engine() keyword arguments from pool settings.
 
-engine = create_engine(settings.DATABASE_URL)
+    SQLite keeps SQLAlchemy's default pool; sizing options only apply
+    to server databases.
+    """
+    options: dict = {
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_logging_name": label,
+    }
+
+    if make_url(config.DATABASE_URL).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+        )
+
+    return options
+
+
+def pool_capacity(options: dict) -> int:
+    """Return the connection limit implied by engine options (0 if unbounded)."""
+    if "pool_size" not in options or options["max_overflow"] < 0:
+        # No pool sizing, or QueuePool's unlimited overflow.
+        return 0
+    return options["pool_size"] + options["max_overflow"]
+
+
+_sync_options = engine_options(settings, "sync")
+engine = create_engine(settings.DATABASE_URL, **_sync_options)
+instrument_engine(engine, pool_capacity(_sync_options))
 SessionLocal = sessionmaker(bind=engine)
+
+_async_options = engine_options(settings, "async", is_async=True)
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL), **_async_options
+)
+instrument_engine(async_engine.sync_engine, pool_capacity(_async_options))
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
@@ -0,0 +1,251 @@
+"""
+In-process LeadSnapshot cache.
+
+A bounded LRU cache with TTL, keyed by lead_id, holding plain column
+values (never session-bound ORM instances). Writes go to the database
+first and are copied into the cache after commit (write-through).
+
+Per-lead asyncio locks serialize concurrent turns for the same lead
+within this process. Each commit (or invalidation) bumps the lead's
+generation, so a turn that read the call and snapshot before taking
+the lock can tell whether another turn committed in between, even if
+the lock was free by the time it got there. Edits made outside the
+process must call invalidate(); the TTL bounds staleness if they do
+not.
+"""
+
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.metrics import (
+    SNAPSHOT_CACHE_ENTRIES,
+    SNAPSHOT_CACHE_EVICTIONS,
+    SNAPSHOT_CACHE_REQUESTS,
+)
+from mn_ai_voice.app.db.models import LeadSnapshot
+
+SNAPSHOT_COLUMNS = tuple(column.key for column in LeadSnapshot.__table__.columns)
+
+
+class SnapshotCache:
+    """Bounded LRU/TTL cache of LeadSnapshot values with per-lead locks."""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._call_leads: OrderedDict[str, str] = OrderedDict()
+        self._locks: dict[str, tuple[asyncio.Lock, int]] = {}
+        self._generation = 0
+        self._generations: OrderedDict[str, int] = OrderedDict()
+        self._dropped = 0  # generation counter when a lead was last dropped
+
+    # ---------- Locking ----------
+
+    @asynccontextmanager
+    async def locked(self, lead_id: str) -> AsyncIterator[bool]:
+        """
+        Hold the lock for a lead.
+
+        Yields:
+            True if the lock was contended, i.e. another turn for the
+            lead may have committed while this one waited.
+        """
+        lock, waiters = self._locks.get(lead_id, (asyncio.Lock(), 0))
+        self._locks[lead_id] = (lock, waiters + 1)
+        contended = lock.locked()
+        try:
+            async with lock:
+                yield contended
+        finally:
+            lock, waiters = self._locks[lead_id]
+            if waiters == 1:
+                del self._locks[lead_id]
+            else:
+                self._locks[lead_id] = (lock, waiters - 1)
+
+    # ---------- Generations ----------
+
+    def generation(self, lead_id: Optional[str]) -> Optional[int]:
+        """
+        Return the lead's change generation, or None if it is not tracked.
+
+        Compare a value read before loading with one read under the lock:
+        a difference, or None on either side, means the loaded call and
+        snapshot may be stale.
+        """
+        if lead_id is None or lead_id not in self._generations:
+            return None
+        self._generations.move_to_end(lead_id)
+        return self._generations[lead_id]
+
+    def track(self, lead_id: str) -> int:
+        """
+        Return the lead's generation, starting to track it if needed.
+
+        For holders of long-lived copies (e.g. a WebSocket stream) that
+        must notice any later change. Starting to track bumps the
+        generation, which untracked readers already treat as stale.
+        """
+        if lead_id not in self._generations:
+            self._bump(lead_id)
+        self._generations.move_to_end(lead_id)
+        return self._generations[lead_id]
+
+    def counter(self) -> int:
+        """The process-wide generation counter; read it before a load to seed()."""
+        return self._generation
+
+    def seed(self, lead_id: str, since: int) -> Optional[int]:
+        """
+        Start tracking a lead loaded after counter() returned since.
+
+        Returns the lead's new generation, valid for the rows just
+        loaded, if it was untracked and no lead has been dropped since
+        then: no turn for it can have committed in this process after
+        the load. Returns None otherwise (treat the rows as stale).
+        """
+        if lead_id in self._generations or self._dropped > since:
+            return None
+        self._bump(lead_id)
+        return self._generations[lead_id]
+
+    def _bump(self, lead_id: str) -> None:
+        # Generations come from one process-wide counter, so a lead that
+        # is evicted and re-added never repeats an earlier value.
+        self._generation += 1
+        self._generations[lead_id] = self._generation
+        self._generations.move_to_end(lead_id)
+        while len(self._generations) > self.max_size:
+            self._generations.popitem(last=False)
+            self._dropped = self._generation
+
+    # ---------- Cache operations ----------
+
+    def get(self, lead_id: Optional[str]) -> Optional[dict]:
+        """Return a copy of the cached column values, or None.
+
+        A None lead_id (lead not yet known) counts as a miss.
+        """
+        entry = self._entries.get(lead_id) if lead_id is not None else None
+        if entry is None or self._clock() - entry[0] > self.ttl_seconds:
+            if entry is not None:
+                self._drop(entry[1]["lead_id"], "ttl")
+            SNAPSHOT_CACHE_REQUESTS.labels("miss").inc()
+            return None
+
+        self._entries.move_to_end(entry[1]["lead_id"])
+        SNAPSHOT_CACHE_REQUESTS.labels("hit").inc()
+        return copy.deepcopy(entry[1])
+
+    def committed(self, snapshot: LeadSnapshot) -> None:
+        """Write through a snapshot just committed by a turn."""
+        self._bump(str(snapshot.lead_id))
+        self.put(snapshot)
+
+    def put(self, snapshot: LeadSnapshot) -> None:
+        """Store a committed snapshot's column values."""
+        lead_id = str(snapshot.lead_id)
+        values = {key: copy.deepcopy(getattr(snapshot, key)) for key in SNAPSHOT_COLUMNS}
+        self._entries[lead_id] = (self._clock(), values)
+        self._entries.move_to_end(lead_id)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._drop(oldest, "size")
+
+        SNAPSHOT_CACHE_ENTRIES.set(len(self._entries))
+
+    def fill(self, snapshot: LeadSnapshot, generation: Optional[int]) -> None:
+        """
+        Store a snapshot read outside the lead's lock.
+
+        generation is the lead's generation from before the read (or
+        from seed()). The snapshot is stored only while it is still
+        current: a turn committing during the read has written through
+        newer values, which a stale read must not replace.
+        """
+        if generation is not None and self.generation(str(snapshot.lead_id)) == generation:
+            self.put(snapshot)
+
+    def remember_call(self, call_id: str, lead_id: str) -> None:
+        """Record a call's lead; calls never change lead."""
+        self._call_leads[call_id] = lead_id
+        self._call_leads.move_to_end(call_id)
+        while len(self._call_leads) > self.max_size:
+            self._call_leads.popitem(last=False)
+
+    def lead_for_call(self, call_id: str) -> Optional[str]:
+        """Return a remembered call's lead_id, if known."""
+        return self._call_leads.get(call_id)
+
+    def invalidate(self, lead_id: str) -> None:
+        """Drop a lead's entry, e.g. after an out-of-process edit."""
+        self._bump(lead_id)
+        if lead_id in self._entries:
+            self._drop(lead_id, "invalidate")
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self._call_leads.clear()
+        self._generations.clear()
+        self._dropped = self._generation
+        SNAPSHOT_CACHE_ENTRIES.set(0)
+
+    async def load(self, db: AsyncSession, lead_id: str) -> Optional[LeadSnapshot]:
+        """
+        Return the lead's snapshot attached to the session.
+
+        A cache hit is attached as a persistent instance without a
+        SELECT; changes to it flush as a normal UPDATE. A miss is
+        cached only if no turn committed during the SELECT (see fill).
+        """
+        values = self.get(lead_id)
+        if values is None:
+            generation = self.generation(lead_id)
+            snapshot = await db.get(LeadSnapshot, lead_id)
+            if snapshot is not None:
+                self.fill(snapshot, generation)
+            return snapshot
+
+        return self.attach(db, values)
+
+    @staticmethod
+    def attach(db: AsyncSession, values: dict) -> LeadSnapshot:
+        """Attach cached values to the session as a persistent snapshot."""
+        existing = db.identity_map.get(
+            db.identity_key(LeadSnapshot, values["lead_id"])
+        )
+        if existing is not None:
+            return existing
+
+        snapshot = LeadSnapshot(**values)
+        make_transient_to_detached(snapshot)
+        db.add(snapshot)
+        return snapshot
+
+    def _drop(self, lead_id: str, reason: str) -> None:
+        del self._entries[lead_id]
+        SNAPSHOT_CACHE_EVICTIONS.labels(reason).inc()
+        SNAPSHOT_CACHE_ENTRIES.set(len(self._entries))
+
+
+snapshot_cache = SnapshotCache(
+    max_size=settings.SNAPSHOT_CACHE_SIZE,
+    ttl_seconds=settings.SNAPSHOT_CACHE_TTL_SECONDS,
+)
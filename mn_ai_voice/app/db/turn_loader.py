@@ -0,0 +1,93 @@
+"""
+Turn loading data access.
+
+Fetches everything a user turn needs before any work starts (the Call,
+its lead's LeadSnapshot and the TurnRecord for the turn_id) in a single
+statement, instead of one round trip per object.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mn_ai_voice.app.db.models import Call, LeadSnapshot, TurnRecord
+from mn_ai_voice.app.db.snapshot_cache import SnapshotCache
+
+
+@dataclass
+class TurnContext:
+    """Objects loaded for one user turn; None where no row exists."""
+
+    call: Optional[Call]
+    snapshot: Optional[LeadSnapshot]
+    record: Optional[TurnRecord]
+    # The lead's cache generation the rows are valid for; None if unknown
+    generation: Optional[int] = None
+
+
+async def load_turn(
+    db: AsyncSession,
+    call_id: str,
+    turn_id: str,
+    cache: SnapshotCache,
+) -> TurnContext:
+    """
+    Load the Call, LeadSnapshot and TurnRecord for a turn in one statement.
+
+    When the call's lead is known and its snapshot is cached, the
+    snapshot join is dropped and the cached snapshot is attached to the
+    session instead.
+
+    The lead's generation is read before the statement; a lead this
+    process does not track yet is seeded after it when that is safe
+    (see SnapshotCache.seed), so its first turn needs no refresh. A
+    snapshot read from the database is cached only if that generation
+    is still current (see SnapshotCache.fill).
+
+    Args:
+        db: Async database session.
+        call_id: Call receiving the turn.
+        turn_id: Client-supplied turn identifier.
+        cache: Snapshot cache consulted for the lead's snapshot.
+    """
+    lead_id = cache.lead_for_call(call_id)
+    generation, since = cache.generation(lead_id), cache.counter()
+    cached = cache.get(lead_id)
+    join_snapshot = cached is None
+
+    entities: list = [Call, TurnRecord]
+    if join_snapshot:
+        entities.append(LeadSnapshot)
+
+    stmt = (
+        select(*entities)
+        .select_from(Call)
+        .outerjoin(
+            TurnRecord,
+            and_(TurnRecord.call_id == Call.call_id, TurnRecord.turn_id == turn_id),
+        )
+        .where(Call.call_id == call_id)
+    )
+    if join_snapshot:
+        stmt = stmt.outerjoin(LeadSnapshot, LeadSnapshot.lead_id == Call.lead_id)
+
+    row = (await db.execute(stmt)).one_or_none()
+    if row is None:
+        return TurnContext(call=None, snapshot=None, record=None)
+
+    call, record = row[0], row[1]
+    if call.lead_id is not None:
+        cache.remember_call(str(call.call_id), str(call.lead_id))
+        if generation is None:
+            generation = cache.seed(str(call.lead_id), since)
+
+    if cached is None:
+        snapshot = row[2]
+        if snapshot is not None:
+            cache.fill(snapshot, generation)
+    else:
+        snapshot = cache.attach(db, cached)
+
+    return TurnContext(call=call, snapshot=snapshot, record=record, generation=generation)
@@ -6,12 +6,22 @@ Pure logic. No DB. No framework.
 """
 
 import re
+from dataclasses import dataclass
 from typing import Optional
 
+from mn_ai_voice.app.engine.keyword_matcher import IncrementalScan, KeywordMatcher, Match
+
 
 class LanguageExtractor:
     """Detect preferred language from user input."""
 
+    # Checked in order; the first language with a matching keyword wins.
+    KEYWORDS = (
+        ("hinglish", ("hinglish", "mix")),
+        ("hindi", ("hindi", "हिंदी")),
+        ("english", ("english", "eng")),
+    )
+
     def extract(self, text: str) -> str:
         """
         Extract the preferred language from user input text.
@@ -24,14 +34,9 @@ class LanguageExtractor:
         """
         t = text.lower()
 
-        if any(word in t for word in ["hinglish", "mix"]):
-            return "hinglish"
-
-        if any(word in t for word in ["hindi", "हिंदी"]):
-            return "hindi"
-
-        if any(word in t for word in ["english", "eng"]):
-            return "english"
+        for language, words in self.KEYWORDS:
+            if any(word in t for word in words):
+                return language
 
         return "unknown"
 
@@ -50,6 +55,13 @@ class RegionExtractor:
         "delhi", "ncr", "gurgaon", "gurugram", "noida", "ghaziabad"
     }
 
+    # Checked in order; the first region with a matching token wins.
+    REGIONS = (
+        ("south_india", SOUTH_INDIA_STATES),
+        ("maharashtra", MAHARASHTRA),
+        ("delhi_ncr", DELHI_NCR),
+    )
+
     def extract(self, text: str) -> str:
         """
         Extract the serviceable region from user input text.
@@ -62,14 +74,9 @@ class RegionExtractor:
         """
         t = text.lower()
 
-        if self._contains_any(self.SOUTH_INDIA_STATES, t):
-            return "south_india"
-
-        if self._contains_any(self.MAHARASHTRA, t):
-            return "maharashtra"
-
-        if self._contains_any(self.DELHI_NCR, t):
-            return "delhi_ncr"
+        for region, tokens in self.REGIONS:
+            if self._contains_any(tokens, t):
+                return region
 
         return "unknown"
 
@@ -88,6 +95,8 @@ class RegionExtractor:
 class BudgetExtractor:
     """Extract budget band from text (in lakhs)."""
 
+    NUMBER_PATTERN = r"\d+(?:\.\d+)?"
+
     def extract(self, text: str) -> str:
         """
         Extract budget band from text by finding numeric values.
@@ -98,12 +107,15 @@ class BudgetExtractor:
         Returns:
             Budget band: "below_6L", "6_to_9L", "above_9L", or "unknown".
         """
-        match = re.search(r"(\d+(\.\d+)?)", text)
+        match = re.search(self.NUMBER_PATTERN, text)
         if not match:
             return "unknown"
 
-        value = float(match.group(1))
+        return self.band(float(match.group(0)))
 
+    @staticmethod
+    def band(value: float) -> str:
+        """Map a budget in lakhs to its band."""
         if value < 6:
             return "below_6L"
 
@@ -116,6 +128,14 @@ class BudgetExtractor:
 class TimelineExtractor:
     """Bucket timeline intent."""
 
+    # Checked in order; the first bucket with a matching phrase wins.
+    KEYWORDS = (
+        ("immediate", ("immediate", "asap", "now")),
+        ("1_month", ("1 month", "one month")),
+        ("2_3_months", ("2 months", "3 months", "2-3", "2 to 3")),
+        ("3_plus", ("later", "next year", "3+")),
+    )
+
     def extract(self, text: str) -> str:
         """
         Extract timeline intent from user input text.
@@ -129,17 +149,9 @@ class TimelineExtractor:
         """
         t = text.lower()
 
-        if any(k in t for k in ["immediate", "asap", "now"]):
-            return "immediate"
-
-        if "1 month" in t or "one month" in t:
-            return "1_month"
-
-        if any(k in t for k in ["2 months", "3 months", "2-3", "2 to 3"]):
-            return "2_3_months"
-
-        if any(k in t for k in ["later", "next year", "3+"]):
-            return "3_plus"
+        for bucket, phrases in self.KEYWORDS:
+            if any(k in t for k in phrases):
+                return bucket
 
         return "unknown"
 
@@ -147,6 +159,8 @@ class TimelineExtractor:
 class EmailExtractor:
     """Extract email using regex."""
 
+    PATTERN = r"[\w\.-]+@[\w\.-]+\.\w+"
+
     def extract(self, text: str) -> Optional[str]:
         """
         Extract the first email address found in the text.
@@ -157,7 +171,7 @@ class EmailExtractor:
         Returns:
             The first email address found, or None if no email is found.
         """
-        match = re.search(r"[\w\.-]+@[\w\.-]+\.\w+", text)
+        match = re.search(self.PATTERN, text)
         return match.group(0) if match else None
 
 
@@ -175,3 +189,191 @@ class RoomSizeExtractor:
             The input text with leading and trailing whitespace removed.
         """
         return text.strip()
+
+
+# ---------- Single-pass extraction ----------
+
+@dataclass(frozen=True)
+class Extraction:
+    """Every field extracted from one utterance."""
+
+    language: str = "unknown"
+    region: str = "unknown"
+    timeline: str = "unknown"
+    budget_band: str = "unknown"
+    email: Optional[str] = None
+
+
+class ExtractionEngine:
+    """
+    All extractors compiled once, applied in one pass per utterance.
+
+    Language, region and timeline keywords share one KeywordMatcher;
+    budget numbers and emails share one regex. Results are identical
+    to running each extractor class separately. Callers that need a
+    single field use language(), budget_band() or email() instead of
+    extract().
+    """
+
+    _CATEGORIES = (
+        ("language", LanguageExtractor.KEYWORDS),
+        ("region", RegionExtractor.REGIONS),
+        ("timeline", TimelineExtractor.KEYWORDS),
+    )
+
+    def __init__(self) -> None:
+        keywords: list[tuple[str, tuple[str, int, str]]] = []
+        for field, table in self._CATEGORIES:
+            for rank, (value, words) in enumerate(table):
+                keywords.extend((word, (field, rank, value)) for word in words)
+
+        self.matcher: KeywordMatcher[tuple[str, int, str]] = KeywordMatcher(keywords)
+        self._number = re.compile(BudgetExtractor.NUMBER_PATTERN)
+        self._email = re.compile(EmailExtractor.PATTERN)
+        self._language = LanguageExtractor()
+        self._email_or_number = re.compile(
+            rf"(?P<email>{EmailExtractor.PATTERN})|(?P<number>{BudgetExtractor.NUMBER_PATTERN})"
+        )
+
+    def extract(self, text: str) -> Extraction:
+        """
+        Extract all fields from user input text.
+
+        Args:
+            text: User input text.
+
+        Returns:
+            Extraction with "unknown" (or None for email) for fields
+            the text does not mention.
+        """
+        t = text.lower()
+        budget_band, email = self.budget_and_email(text)
+        return self.fields(t, self.matcher.find_all(t), budget_band, email)
+
+    def language(self, text: str) -> str:
+        """Preferred language in text, as LanguageExtractor finds it."""
+        return self._language.extract(text)
+
+    def budget_band(self, text: str) -> str:
+        """Budget band of the first number in text, as BudgetExtractor finds it."""
+        match = self._number.search(text)
+        return BudgetExtractor.band(float(match.group(0))) if match else "unknown"
+
+    def email(self, text: str) -> Optional[str]:
+        """First email address in text, as EmailExtractor finds it."""
+        match = self._email.search(text)
+        return match.group(0) if match else None
+
+    def incremental(self) -> "IncrementalExtraction":
+        """Start extracting from a text that arrives as partial hypotheses."""
+        return IncrementalExtraction(self)
+
+    def fields(
+        self,
+        t: str,
+        matches: list[Match[tuple[str, int, str]]],
+        budget_band: str,
+        email: Optional[str],
+    ) -> Extraction:
+        """Build the Extraction from keyword matches over lowercased text t."""
+        # Lowest rank per field, i.e. the value its extractor checks first.
+        best: dict[str, tuple[int, str]] = {}
+        for match in matches:
+            field, rank, value = match.value
+            if field == "region" and not self._is_word(t, match.start, match.end):
+                continue
+            if field not in best or rank < best[field][0]:
+                best[field] = (rank, value)
+
+        return Extraction(
+            language=best.get("language", (0, "unknown"))[1],
+            region=best.get("region", (0, "unknown"))[1],
+            timeline=best.get("timeline", (0, "unknown"))[1],
+            budget_band=budget_band,
+            email=email,
+        )
+
+    def budget_and_email(
+        self, text: str, pos: int = 0, number: Optional[str] = None
+    ) -> tuple[str, Optional[str]]:
+        """
+        First number and first email, from one left-to-right scan.
+
+        The scan may start at pos with the first number (if any) of
+        text[:pos] already known; pos must not fall inside a match.
+        """
+        for match in self._email_or_number.finditer(text, pos):
+            if match.lastgroup == "number":
+                if number is None:
+                    number = match.group("number")
+                continue
+
+            # Nothing matched before the email, so the first number (if
+            # any) starts inside it or after it.
+            if number is None:
+                inner = self._number.search(text, match.start())
+                number = inner.group(0) if inner else None
+            email = match.group("email")
+            break
+        else:
+            email = None
+
+        budget_band = BudgetExtractor.band(float(number)) if number else "unknown"
+        return budget_band, email
+
+    @staticmethod
+    def _is_word(text: str, start: int, end: int) -> bool:
+        """Whether text[start:end] is a whole word, as regex word boundaries define it."""
+        before = text[start - 1] if start > 0 else " "
+        after = text[end] if end < len(text) else " "
+        return not (before.isalnum() or before == "_" or after.isalnum() or after == "_")
+
+
+class IncrementalExtraction:
+    """
+    ExtractionEngine state for one utterance that is still arriving.
+
+    Keywords are matched with an IncrementalScan. Numbers and emails
+    never contain whitespace, so the text before the last whitespace
+    is settled: only the first number found there is kept, and later
+    hypotheses are scanned from that point on. Results are identical
+    to ExtractionEngine.extract() on the same text.
+    """
+
+    _NUMBER = re.compile(BudgetExtractor.NUMBER_PATTERN)
+    _LAST_WORD = re.compile(r"\S*\Z")
+
+    def __init__(self, engine: ExtractionEngine) -> None:
+        self.engine = engine
+        self.text = ""
+        self._scan = IncrementalScan(engine.matcher)
+        self._settled = 0  # text[:_settled] ends in whitespace and holds no email
+        self._first_number: Optional[str] = None  # in text[:_settled]
+
+    def update(self, text: str) -> Extraction:
+        """Extract all fields from the latest hypothesis."""
+        t = text.lower()
+        self._scan.update(t)
+
+        if text[: self._settled] != self.text[: self._settled]:
+            self._settled, self._first_number = 0, None
+        self.text = text
+
+        budget_band, email = self.engine.budget_and_email(
+            text, self._settled, self._first_number
+        )
+        if email is None:
+            self._settle(text)
+
+        return self.engine.fields(t, self._scan.matches, budget_band, email)
+
+    def _settle(self, text: str) -> None:
+        """Move the settled point to the start of the last word."""
+        last_word = self._LAST_WORD.search(text)
+        cut = last_word.start() if last_word else 0
+        if cut <= self._settled:
+            return
+        if self._first_number is None:
+            found = self._NUMBER.search(text, self._settled, cut)
+            self._first_number = found.group(0) if found else None
+        self._settled = cut
@@ -0,0 +1,247 @@
+"""
+Declarative conversation flows.
+
+A flow is a YAML file (see knowledge/flows/default.yaml) listing, per
+CallState, ordered rules over snapshot signals and a default next
+state. It is validated and compiled once at load time into a
+transition table indexed by (state, signal bitmask), so choosing the
+next state is a single list lookup.
+
+Pure logic apart from reading the flow files. No DB. No framework.
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import yaml
+
+from mn_ai_voice.app.core.config import DEFAULT_FLOW, FLOWS_DIR
+from mn_ai_voice.app.core.constants import CallState, QualificationStatus
+
+# Snapshot signals, one bit each, in bit order
+SIGNALS = ("has_timeline", "has_room_size", "qualified", "nurture", "unqualified")
+SIGNAL_BITS = {name: 1 << bit for bit, name in enumerate(SIGNALS)}
+MASKS = 1 << len(SIGNALS)
+RULE_KEYS = {"when", "unless", "next"}
+
+_STATUS_SIGNALS = {
+    QualificationStatus.QUALIFIED: SIGNAL_BITS["qualified"],
+    QualificationStatus.NURTURE: SIGNAL_BITS["nurture"],
+    QualificationStatus.UNQUALIFIED: SIGNAL_BITS["unqualified"],
+}
+
+
+def signal_mask(
+    has_timeline: bool = False,
+    has_room_size: bool = False,
+    qualification_status: Optional[QualificationStatus] = None,
+) -> int:
+    """Encode snapshot signals as a bitmask over SIGNALS."""
+    mask = _STATUS_SIGNALS.get(qualification_status, 0) if qualification_status else 0
+    if has_timeline:
+        mask |= SIGNAL_BITS["has_timeline"]
+    if has_room_size:
+        mask |= SIGNAL_BITS["has_room_size"]
+    return mask
+
+
+@dataclass(frozen=True)
+class Flow:
+    """One compiled, immutable conversation flow."""
+
+    name: str
+    start: CallState
+    states: tuple[CallState, ...]
+    terminal: frozenset[CallState]
+    index: dict[CallState, int]
+    table: tuple[int, ...]  # state index * MASKS + mask -> next state index
+
+    def next(self, current: CallState, mask: int) -> CallState:
+        """
+        Return the state that follows current for the given signals.
+
+        Raises:
+            ValueError: If current is not a state of this flow.
+        """
+        position = self.index.get(current)
+        if position is None:
+            raise ValueError(f"State {current} is not in flow '{self.name}'")
+        return self.states[self.table[position * MASKS + mask]]
+
+
+def compile_flow(name: str, data: Any) -> Flow:
+    """
+    Validate a parsed flow definition and compile its transition table.
+
+    Raises:
+        ValueError: If the definition is malformed, names unknown states
+            or signals, has unreachable states, or has states from
+            which no terminal state can be reached.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("states"), dict):
+        raise ValueError(f"Flow '{name}' must be a mapping with 'states'")
+    if not data["states"]:
+        raise ValueError(f"Flow '{name}' has no states")
+
+    states = tuple(_state(name, key) for key in data["states"])
+    index = {state: i for i, state in enumerate(states)}
+    start = _state(name, data.get("start"))
+    if start not in index:
+        raise ValueError(f"Flow '{name}' starts in undefined state {start.value}")
+
+    def target(value: Any) -> int:
+        state = _state(name, value)
+        if state not in index:
+            raise ValueError(f"Flow '{name}' moves to undefined state {state.value}")
+        return index[state]
+
+    table: list[int] = []
+    terminal = set()
+    for state, spec in zip(states, data["states"].values()):
+        spec = spec or {}
+        if not isinstance(spec, dict) or set(spec) - {"next", "rules", "terminal"}:
+            raise ValueError(f"Flow '{name}': state {state.value} is malformed")
+
+        if spec.get("terminal"):
+            if "next" in spec or "rules" in spec:
+                raise ValueError(f"Flow '{name}': terminal state {state.value} has transitions")
+            terminal.add(state)
+            table.extend([index[state]] * MASKS)
+            continue
+
+        if "next" not in spec:
+            raise ValueError(f"Flow '{name}': state {state.value} has no next state")
+        rules = [_rule(name, state, rule, target) for rule in spec.get("rules") or []]
+        default = target(spec["next"])
+        table.extend(_decide(rules, mask, default) for mask in range(MASKS))
+
+    flow = Flow(
+        name=name,
+        start=start,
+        states=states,
+        terminal=frozenset(terminal),
+        index=index,
+        table=tuple(table),
+    )
+    _check_reachability(flow)
+    return flow
+
+
+def _state(name: str, value: Any) -> CallState:
+    try:
+        return CallState(value)
+    except ValueError:
+        raise ValueError(f"Flow '{name}': unknown state {value!r}") from None
+
+
+def _rule(
+    name: str, state: CallState, rule: Any, target: Callable[[Any], int]
+) -> tuple[int, int, int]:
+    """Compile one rule to (required bits, forbidden bits, next state index)."""
+    if not isinstance(rule, dict) or "next" not in rule or set(rule) - RULE_KEYS:
+        raise ValueError(f"Flow '{name}': state {state.value} has an invalid rule")
+
+    def bits(signals: Any) -> int:
+        if not isinstance(signals, list):
+            raise ValueError(f"Flow '{name}': rule signals must be a list")
+        mask = 0
+        for signal in signals:
+            if signal not in SIGNAL_BITS:
+                raise ValueError(f"Flow '{name}': unknown signal {signal!r}")
+            mask |= SIGNAL_BITS[signal]
+        return mask
+
+    return bits(rule.get("when", [])), bits(rule.get("unless", [])), target(rule["next"])
+
+
+def _decide(rules: list[tuple[int, int, int]], mask: int, default: int) -> int:
+    """Next state index for a mask: the first matching rule, else the default."""
+    for required, forbidden, nxt in rules:
+        if mask & required == required and not mask & forbidden:
+            return nxt
+    return default
+
+
+def _check_reachability(flow: Flow) -> None:
+    """Every state is reachable from start and can reach a terminal state."""
+    edges = [
+        set(flow.table[i * MASKS:(i + 1) * MASKS]) for i in range(len(flow.states))
+    ]
+
+    reached = {flow.index[flow.start]}
+    queue = deque(reached)
+    while queue:
+        for nxt in edges[queue.popleft()] - reached:
+            reached.add(nxt)
+            queue.append(nxt)
+    unreachable = [s.value for i, s in enumerate(flow.states) if i not in reached]
+    if unreachable:
+        raise ValueError(f"Flow '{flow.name}' has unreachable states: {unreachable}")
+
+    if not flow.terminal:
+        raise ValueError(f"Flow '{flow.name}' has no terminal state")
+    finishing = {flow.index[state] for state in flow.terminal}
+    grew = True
+    while grew:
+        grew = False
+        for i, targets in enumerate(edges):
+            if i not in finishing and targets & finishing:
+                finishing.add(i)
+                grew = True
+    stuck = [s.value for i, s in enumerate(flow.states) if i not in finishing]
+    if stuck:
+        raise ValueError(f"Flow '{flow.name}' cannot finish from states: {stuck}")
+
+
+def load_flow(path: Path) -> Flow:
+    """
+    Parse and compile a flow file; the flow is named after the file.
+
+    Raises:
+        ValueError: If the file is not a valid flow.
+    """
+    try:
+        data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    except yaml.YAMLError as exc:
+        raise ValueError(f"Flow '{path.stem}' is not valid YAML: {exc}") from exc
+    return compile_flow(path.stem, data)
+
+
+class FlowRegistry:
+    """Compiled flows by name, loaded from a directory of YAML files."""
+
+    def __init__(self, path: Path = FLOWS_DIR, default: str = DEFAULT_FLOW) -> None:
+        """
+        Load and compile every *.yaml file in path.
+
+        Raises:
+            ValueError: If a flow is invalid or the default flow is missing.
+        """
+        self.path = Path(path)
+        self.default = default
+        flows = [load_flow(file) for file in sorted(self.path.glob("*.yaml"))]
+        self._flows = {flow.name: flow for flow in flows}
+        if default not in self._flows:
+            raise ValueError(f"No '{default}' flow in {self.path}")
+
+    @property
+    def names(self) -> list[str]:
+        """Names of the loaded flows."""
+        return sorted(self._flows)
+
+    def get(self, name: Optional[str] = None) -> Flow:
+        """
+        Return a flow by name; None selects the default flow.
+
+        Raises:
+            ValueError: If no flow has that name.
+        """
+        flow = self._flows.get(name or self.default)
+        if flow is None:
+            raise ValueError(f"Unknown flow: {name}")
+        return flow
+
+
+flow_registry = FlowRegistry()
@@ -0,0 +1,219 @@
+"""
+Knowledge base versions and hot reload.
+
+The knowledge base is compiled into an immutable KBVersion (parsed
+data, KBIndex and router). KnowledgeBaseManager builds new versions
+from knowledge_base.yaml or an admin upload and publishes them with a
+single reference assignment, so turns already holding a version keep
+using it and new turns pick up the replacement. Compilation happens
+off the request path (watcher thread or worker thread), never while a
+turn is waiting.
+
+Every version is identified by a short hash of its source text, which
+is recorded on assistant events for auditing.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+from mn_ai_voice.app.core.config import DEFAULT_KNOWLEDGE_BASE, KB_PATH
+from mn_ai_voice.app.engine.kb_router import KBIndex, KBRouter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class KBVersion:
+    """One compiled, immutable knowledge base."""
+
+    version: str
+    source: str
+    loaded_at: datetime
+    data: dict[str, Any]
+    router: KBRouter
+
+    @property
+    def entries(self) -> int:
+        """Number of FAQ entries in this version."""
+        return len(self.router.index.entries)
+
+    def describe(self) -> dict:
+        """Return JSON-compatible version metadata."""
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at.isoformat(),
+            "entries": self.entries,
+        }
+
+
+def build_version(text: str, source: str) -> KBVersion:
+    """
+    Parse and compile knowledge base YAML.
+
+    Args:
+        text: YAML source.
+        source: Where the text came from (path or "upload").
+
+    Raises:
+        ValueError: If the text is not a valid knowledge base.
+    """
+    try:
+        data = yaml.safe_load(text) if text.strip() else {}
+    except yaml.YAMLError as exc:
+        raise ValueError(f"Knowledge base is not valid YAML: {exc}") from exc
+
+    if not isinstance(data, dict):
+        raise ValueError("Knowledge base must be a mapping")
+
+    return KBVersion(
+        version=hashlib.sha256(text.encode("utf-8")).hexdigest()[:12],
+        source=source,
+        loaded_at=datetime.now(timezone.utc),
+        data=data,
+        router=KBRouter(KBIndex(data)),
+    )
+
+
+def _default_version() -> KBVersion:
+    return build_version(yaml.safe_dump(DEFAULT_KNOWLEDGE_BASE), "default")
+
+
+class KnowledgeBaseManager:
+    """Owns the current KBVersion and replaces it on change."""
+
+    def __init__(self, path: Path = KB_PATH) -> None:
+        self.path = Path(path)
+        self._build_lock = threading.Lock()
+        self._stat: Optional[tuple[int, int]] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._current = self.load_file() or _default_version()
+
+    @property
+    def current(self) -> KBVersion:
+        """The published version. Read once per turn and reuse it."""
+        return self._current
+
+    # ---------- Loading ----------
+
+    def load_file(self) -> Optional[KBVersion]:
+        """
+        Build a version from the YAML file and publish it.
+
+        Returns:
+            The new version, or None if the file does not exist.
+
+        Raises:
+            ValueError: If the file is not a valid knowledge base; the
+                current version stays in place.
+        """
+        with self._build_lock:
+            stat = self._file_stat()
+            if stat is None:
+                return None
+
+            version = build_version(
+                self.path.read_text(encoding="utf-8"), str(self.path)
+            )
+            self._stat = stat
+            self._publish(version)
+            return version
+
+    def load_text(self, text: str, source: str = "upload", persist: bool = True) -> KBVersion:
+        """
+        Build a version from uploaded YAML and publish it.
+
+        Args:
+            text: YAML source.
+            source: Label recorded on the version.
+            persist: Also replace the YAML file (atomically) so other
+                replicas watching it converge on the same version.
+
+        Raises:
+            ValueError: If the text is not a valid knowledge base.
+        """
+        version = build_version(text, source)
+
+        with self._build_lock:
+            if persist:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                self._stat = self._file_stat()
+
+            self._publish(version)
+        return version
+
+    def check_for_changes(self) -> Optional[KBVersion]:
+        """Reload the file if its mtime or size changed since the last load."""
+        stat = self._file_stat()
+        if stat is None or stat == self._stat:
+            return None
+        return self.load_file()
+
+    def _file_stat(self) -> Optional[tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _publish(self, version: KBVersion) -> None:
+        previous = getattr(self, "_current", None)
+        self._current = version
+        if previous is None or previous.version != version.version:
+            logger.info(
+                "knowledge base %s loaded from %s (%d entries)",
+                version.version,
+                version.source,
+                version.entries,
+            )
+
+    # ---------- File watcher ----------
+
+    def start_watcher(self, interval: float) -> None:
+        """Poll the YAML file for changes every interval seconds."""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch,
+            args=(interval,),
+            name="kb-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        """Stop the file watcher, if running."""
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.check_for_changes()
+            except (OSError, TypeError, ValueError):
+                # Keep serving the last good version; a fixed file is
+                # picked up on a later poll.
+                logger.exception("knowledge base reload failed")
+
+
+kb_manager = KnowledgeBaseManager()
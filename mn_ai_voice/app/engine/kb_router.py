@@ -2,28 +2,108 @@
 Knowledge base routing logic.
 
 Routes user input to predefined knowledge base responses
-using simple keyword-based matching.
+using keyword matching.
+
+FAQ keywords are compiled once per knowledge base version into a
+KeywordMatcher, so routing is a single pass over the utterance
+regardless of how many entries the knowledge base holds.
+Versions are loaded and swapped by engine/kb_manager.py.
 """
 
-from mn_ai_voice.app.core.config import KNOWLEDGE_BASE
+from dataclasses import dataclass
+from typing import Any, Optional
 
+from mn_ai_voice.app.engine.keyword_matcher import IncrementalScan, KeywordMatcher, Match
 
-class KBRouter:  # pylint: disable=too-few-public-methods
-    """Routes user input text to relevant knowledge base entries."""
 
-    def route(self, text: str) -> str | None:
-        """Return a knowledge base response for the given text, if any."""
+@dataclass(frozen=True)
+class FAQEntry:
+    """A compiled FAQ entry."""
+
+    keyword: str
+    answer: str
+    weight: int
+    order: int  # position in the knowledge base
+
+    def priority(self) -> tuple[int, int, int]:
+        """Sort key: higher weight, then longer keyword, then KB order."""
+        return (-self.weight, -len(self.keyword), self.order)
+
+
+class KBIndex:
+    """
+    Compiled FAQ index for one knowledge base.
+
+    FAQ entries are either `keyword: answer` or
+    `keyword: {answer: ..., weight: N, aliases: [...]}`.
+    When several keywords match, the highest weight wins, then the
+    longest keyword, then the entry listed first.
+    """
+
+    def __init__(self, knowledge_base: dict[str, Any]) -> None:
+        """
+        Compile a parsed knowledge base.
+
+        Raises:
+            ValueError: If the knowledge base is malformed.
+        """
+        self.entries: list[FAQEntry] = []
+        keywords: list[tuple[str, FAQEntry]] = []
+
+        faq = (knowledge_base or {}).get("faq") or {}
+        if not isinstance(faq, dict):
+            raise ValueError("Knowledge base 'faq' must be a mapping")
 
+        for order, (keyword, spec) in enumerate(faq.items()):
+            if isinstance(spec, dict) and "answer" not in spec:
+                raise ValueError(f"FAQ entry '{keyword}' has no answer")
+
+            if isinstance(spec, dict):
+                answer = spec["answer"]
+                try:
+                    weight = int(spec.get("weight", 0))
+                except (TypeError, ValueError) as exc:
+                    raise ValueError(f"FAQ entry '{keyword}' weight must be a number") from exc
+                aliases = spec.get("aliases", [])
+                if not isinstance(aliases, list):
+                    raise ValueError(f"FAQ entry '{keyword}' aliases must be a list")
+            else:
+                answer, weight, aliases = spec, 0, []
+
+            for term in [keyword, *aliases]:
+                entry = FAQEntry(str(term).lower(), answer, weight, order)
+                self.entries.append(entry)
+                keywords.append((entry.keyword, entry))
+
+        self.matcher: KeywordMatcher[FAQEntry] = KeywordMatcher(keywords)
+
+    def route(self, text: str) -> Optional[str]:
+        """Return the answer of the highest-priority matching entry, if any."""
         if not text:
             return None
+        return self.answer(self.matcher.find_all(text))
 
-        normalized = text.lower()
-        faq_entries = KNOWLEDGE_BASE.get("faq", {})
-        if not faq_entries:
-            return None
+    def scan(self) -> IncrementalScan[FAQEntry]:
+        """Start matching a text that arrives as partial hypotheses."""
+        return IncrementalScan(self.matcher)
+
+    @staticmethod
+    def answer(matches: list[Match[FAQEntry]]) -> Optional[str]:
+        """Return the answer of the highest-priority entry among matches."""
+        best: Optional[FAQEntry] = None
+        for match in matches:
+            if best is None or match.value.priority() < best.priority():
+                best = match.value
+
+        return best.answer if best else None
 
-        for keyword, answer in faq_entries.items():
-            if keyword.lower() in normalized:
-                return answer
 
-        return None
+class KBRouter:  # pylint: disable=too-few-public-methods
+    """Routes user input text to relevant knowledge base entries."""
+
+    def __init__(self, index: KBIndex) -> None:
+        self.index = index
+
+    def route(self, text: str) -> str | None:
+        """Return a knowledge base response for the given text, if any."""
+        return self.index.route(text)
@@ -0,0 +1,177 @@
+"""
+Multi-pattern keyword matching.
+
+Aho-Corasick automaton: built once from a keyword set, then finds every
+keyword occurrence in a single left-to-right pass over the text,
+independent of how many keywords there are.
+
+Pure logic. No DB. No framework.
+"""
+
+from typing import Generic, Iterable, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase text character for character, keeping its length.
+
+    str.lower() turns a few characters into several (e.g. "İ"), which
+    would shift match positions; those are left as they are.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(low if len(low := ch.lower()) == 1 else ch for ch in text)
+
+
+class Match(NamedTuple, Generic[T]):
+    """A keyword occurrence: text[start:end] matched the keyword for value."""
+
+    start: int
+    end: int
+    value: T
+
+
+class KeywordMatcher(Generic[T]):
+    """
+    Aho-Corasick automaton over case-insensitive keywords.
+
+    Matching is resumable: scan() takes and returns the automaton state,
+    so a growing text can be fed in pieces without rescanning.
+    """
+
+    ROOT = 0
+
+    def __init__(self, keywords: Iterable[tuple[str, T]]) -> None:
+        """
+        Build the automaton.
+
+        Args:
+            keywords: (keyword, value) pairs. Keywords are lowercased
+                (see fold()); empty keywords are ignored. A keyword may map to
+                several values.
+        """
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [self.ROOT]
+        self._out: list[tuple[tuple[int, T], ...]] = [()]
+
+        for keyword, value in keywords:
+            keyword = fold(keyword)
+            if keyword:
+                self._insert(keyword, value)
+
+        self._link()
+
+    def __len__(self) -> int:
+        """Number of automaton states."""
+        return len(self._goto)
+
+    def scan(
+        self,
+        text: str,
+        state: int = ROOT,
+        offset: int = 0,
+    ) -> tuple[list[Match[T]], int]:
+        """
+        Find all keyword occurrences in text, continuing from a state.
+
+        Args:
+            text: Text to scan (lowercased internally with fold()).
+            state: Automaton state after the previously scanned text.
+            offset: Position of text[0] in the full text, used for
+                reported match positions.
+
+        Returns:
+            (matches in order of end position, state after text)
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        matches: list[Match[T]] = []
+
+        for i, ch in enumerate(fold(text)):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, self.ROOT)
+
+            if out[state]:
+                end = offset + i + 1
+                for length, value in out[state]:
+                    matches.append(Match(end - length, end, value))
+
+        return matches, state
+
+    def find_all(self, text: str) -> list[Match[T]]:
+        """Return every keyword occurrence in text."""
+        return self.scan(text)[0]
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _insert(self, keyword: str, value: T) -> None:
+        state = self.ROOT
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(self.ROOT)
+                self._out.append(())
+            state = nxt
+        self._out[state] += ((len(keyword), value),)
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge suffix outputs."""
+        queue = list(self._goto[self.ROOT].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, self.ROOT)
+
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+
+class IncrementalScan(Generic[T]):
+    """
+    Keyword matches over a text that arrives as successive hypotheses.
+
+    Each update() scans only what changed since the previous one. A
+    hypothesis that extends the last one continues from its automaton
+    state; one that revises earlier text (as speech recognizers do)
+    resumes from the latest checkpoint before the first changed
+    character, dropping matches that ended after it.
+    """
+
+    def __init__(self, matcher: KeywordMatcher[T]) -> None:
+        self.matcher = matcher
+        self.text = ""
+        self.matches: list[Match[T]] = []
+        # (position, automaton state there), one per update, ascending
+        self._checkpoints: list[tuple[int, int]] = [(0, KeywordMatcher.ROOT)]
+
+    def update(self, text: str) -> list[Match[T]]:
+        """Scan a new hypothesis; return the matches it added."""
+        common = 0
+        for old, new in zip(self.text, text):
+            if old != new:
+                break
+            common += 1
+
+        while self._checkpoints[-1][0] > common:
+            self._checkpoints.pop()
+        position, state = self._checkpoints[-1]
+        if position < len(self.text):
+            self.matches = [m for m in self.matches if m.end <= position]
+
+        added, state = self.matcher.scan(text[position:], state, position)
+        self.matches.extend(added)
+        self.text = text
+        if len(text) > position:
+            self._checkpoints.append((len(text), state))
+        return added
@@ -0,0 +1,63 @@
+"""
+Phone number normalization.
+
+Callers reach the same lead whether the telephony provider reports
+"+91 98765 43210", "098765-43210" or "9876543210": every number is
+normalized to E.164 ("+919876543210") before it is looked up or
+stored. Numbers without an international prefix are taken to be in
+the configured country.
+
+Pure logic. No DB. No framework.
+"""
+
+import re
+from typing import Optional
+
+from mn_ai_voice.app.core.config import settings
+
+# Visual separators allowed between digits
+_SEPARATORS = re.compile(r"[\s\-./()]")
+
+# E.164 allows at most 15 digits; shorter than this is not dialable
+MIN_DIGITS = 8
+MAX_DIGITS = 15
+
+
+def normalize_phone(
+    raw: str,
+    country_code: Optional[str] = None,
+    national_length: Optional[int] = None,
+) -> str:
+    """
+    Return raw as an E.164 number.
+
+    - "+<digits>" and "00<digits>" are international
+    - "0<digits>" is national with a trunk prefix
+    - bare national-length digits are national
+    - "+<country code> (0) ..." drops the trunk zero
+
+    Raises:
+        ValueError: If raw is not a phone number.
+    """
+    country_code = country_code or settings.PHONE_COUNTRY_CODE
+    national_length = national_length or settings.PHONE_NATIONAL_LENGTH
+
+    text = _SEPARATORS.sub("", raw)
+    if text.startswith("+"):
+        digits = text[1:]
+    elif text.startswith("00"):
+        digits = text[2:]
+    elif text.startswith("0"):
+        digits = country_code + text[1:]
+    elif len(text) == national_length:
+        digits = country_code + text
+    else:
+        digits = text
+
+    if not digits.isdigit() or not MIN_DIGITS <= len(digits) <= MAX_DIGITS:
+        raise ValueError(f"Invalid phone number: {raw!r}")
+
+    trunk = country_code + "0"
+    if digits.startswith(trunk) and len(digits) == len(trunk) + national_length:
+        digits = country_code + digits[len(trunk):]
+    return "+" + digits
@@ -0,0 +1,182 @@
+"""
+Pre-synthesized prompt audio.
+
+A content-addressed cache of synthesized speech: each audio file is
+named by a hash of (prompt text, language, voice), so identical
+prompts share one file across calls, processes and restarts. Files
+are written once (atomically) and memory-mapped; /audio/{key} sends a
+memoryview over the mapping, so serving a prompt copies nothing.
+
+The language is the TTS language for the call's language (see
+settings.TTS_LANGUAGES), or the default one while it is unknown.
+
+Synthesis happens off the request path: warm() fills the cache for
+every static prompt in every configured language at startup. Turns
+only look keys up; text that is not cached (e.g. a new knowledge base
+answer) gets no key and the media layer falls back to live synthesis.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.metrics import PROMPT_AUDIO_REQUESTS, PROMPT_AUDIO_SYNTHESIZED
+from mn_ai_voice.app.tools.tts_tool import TTSBackend, TTSError, tts_backend
+
+logger = logging.getLogger(__name__)
+
+KEY_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def audio_key(text: str, language: str, voice: str) -> str:
+    """Content address of the audio for (text, language, voice)."""
+    source = f"{language}\x1f{voice}\x1f{text}".encode("utf-8")
+    return hashlib.sha256(source).hexdigest()[:32]
+
+
+class PromptAudioCache:
+    """Memory-mapped, content-addressed store of synthesized prompts."""
+
+    def __init__(
+        self,
+        directory: Path,
+        backend: TTSBackend,
+        language: str,
+        voice: str,
+        languages: Optional[dict[str, str]] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.backend = backend
+        self.language = language
+        self.voice = voice
+        self.languages = languages or {}  # call language -> TTS language
+        self._maps: dict[str, mmap.mmap] = {}
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        """File holding the audio for key."""
+        return self.directory / key[:2] / f"{key}.wav"
+
+    def tts_language(self, call_language: Optional[str] = None) -> str:
+        """TTS language for a call's language (the default if unmapped)."""
+        return self.languages.get(call_language or "", self.language)
+
+    # ---------- Request path ----------
+
+    def lookup(self, text: str, language: Optional[str] = None) -> Optional[str]:
+        """Return the key of text's audio if it is cached; never synthesizes."""
+        key = audio_key(text, language or self.language, self.voice)
+        if key in self._maps:
+            PROMPT_AUDIO_REQUESTS.labels("hit").inc()
+            return key
+        PROMPT_AUDIO_REQUESTS.labels("miss").inc()
+        return None
+
+    def describe(self, text: str, call_language: Optional[str] = None) -> dict:
+        """
+        Return JSON-compatible text plus its audio_key (None if not cached),
+        in the TTS language for the call's language.
+        """
+        return {"text": text, "audio_key": self.lookup(text, self.tts_language(call_language))}
+
+    def view(self, key: str) -> Optional[memoryview]:
+        """
+        Return the audio for key without copying it, or None.
+
+        A file another process synthesized is mapped on first use.
+        """
+        mapped = self._maps.get(key)
+        if mapped is None and KEY_PATTERN.fullmatch(key):
+            with self._lock:
+                if key not in self._maps and self.path(key).is_file():
+                    self._map(key)
+                mapped = self._maps.get(key)
+        return memoryview(mapped) if mapped is not None else None
+
+    # ---------- Filling ----------
+
+    def ensure(self, text: str, language: Optional[str] = None) -> str:
+        """
+        Return the key of text's audio, synthesizing it if needed.
+
+        Raises:
+            TTSError: If synthesis failed.
+        """
+        key = audio_key(text, language or self.language, self.voice)
+        with self._lock:
+            if key in self._maps:
+                return key
+
+            path = self.path(key)
+            if not path.exists():
+                audio = self.backend.synthesize(text, language or self.language, self.voice)
+                if not audio:
+                    raise TTSError("Empty audio")
+                self._write(path, audio)
+                PROMPT_AUDIO_SYNTHESIZED.inc()
+
+            self._map(key)
+        return key
+
+    def warm(self, prompts: Iterable[str]) -> int:
+        """
+        Make sure every prompt is cached and mapped, in the default and
+        every mapped TTS language.
+
+        A prompt that fails to synthesize is logged and skipped; turns
+        using it simply carry no audio key.
+
+        Returns:
+            Number of (prompt, language) pairs now cached.
+        """
+        languages = list(dict.fromkeys([self.language, *self.languages.values()]))
+        cached = 0
+        for text in prompts:
+            for language in languages:
+                try:
+                    self.ensure(text, language)
+                    cached += 1
+                except (OSError, TTSError):
+                    logger.warning("prompt audio synthesis failed", exc_info=True)
+        return cached
+
+    def close(self) -> None:
+        """Unmap every file (views still held keep their mapping open)."""
+        with self._lock:
+            for mapped in self._maps.values():
+                try:
+                    mapped.close()
+                except BufferError:
+                    pass
+            self._maps.clear()
+
+    def _map(self, key: str) -> None:
+        """Map key's file; the caller holds the lock."""
+        with open(self.path(key), "rb") as f:
+            self._maps[key] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _write(path: Path, audio: bytes) -> None:
+        """Write a file atomically, so readers never map a partial one."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(audio)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+prompt_audio = PromptAudioCache(
+    settings.PROMPT_AUDIO_DIR,
+    tts_backend(),
+    language=settings.TTS_LANGUAGE,
+    voice=settings.TTS_VOICE,
+    languages=settings.TTS_LANGUAGES,
+)
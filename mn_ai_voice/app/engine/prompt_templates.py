@@ -17,6 +17,7 @@ class PromptRenderer:
         CallState.ASK_TIMELINE: "When are you planning to start?",
         CallState.ASK_BUDGET: "A full kids room typically costs ₹6–₹9 lakhs. Does that work?",
         CallState.ASK_ROOM_SIZE: "What is the room size?",
+        CallState.QUALIFY: "Thanks! Shall I check whether we can take up your project?",
         CallState.ASK_EMAIL: "Please share your email for consultation details.",
         CallState.CLOSE: "Thanks! You’ll receive the details shortly.",
     }
@@ -26,3 +27,8 @@ class PromptRenderer:
         if state not in self._prompts:
             raise ValueError(f"No prompt defined for CallState: {state}")
         return self._prompts[state]
+
+    @classmethod
+    def static_prompts(cls) -> list[str]:
+        """Every fixed prompt string (e.g. to pre-synthesize them)."""
+        return list(dict.fromkeys(cls._prompts.values()))
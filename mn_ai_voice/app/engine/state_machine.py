@@ -1,30 +1,39 @@
 """
 Deterministic conversation state machine.
 
-Defines allowed transitions between call states.
-Supports conditional and non-linear progression.
+Transitions come from declarative flows (see engine/flows.py), each
+compiled to a table indexed by (state, signal bitmask). A call picks
+its flow by name; the default flow applies otherwise.
 """
 
 from typing import Optional
 
 from mn_ai_voice.app.core.constants import CallState, QualificationStatus
+from mn_ai_voice.app.core.metrics import STATE_TRANSITIONS
+from mn_ai_voice.app.engine.flows import FlowRegistry, flow_registry, signal_mask
 
 
 class StateMachine:
     """
     Deterministic conversation flow controller.
 
+    In the default flow:
+
     - First three states are strictly linear
     - Timeline and room size are optional
     - Qualification result determines whether email is asked
     """
 
+    def __init__(self, flows: Optional[FlowRegistry] = None) -> None:
+        self.flows = flows or flow_registry
+
     def next_state(
         self,
         current: CallState,
         has_timeline: bool = False,
         has_room_size: bool = False,
         qualification_status: Optional[QualificationStatus] = None,
+        flow: Optional[str] = None,
     ) -> CallState:
         """
         Return the next conversation state based on current state
@@ -35,53 +44,37 @@ class StateMachine:
             has_timeline: Whether timeline is already known
             has_room_size: Whether room size is already known
             qualification_status: Result after QUALIFY (if available)
+            flow: Name of the call's flow (None for the default)
 
         Returns:
             Next CallState
+
+        Raises:
+            ValueError: If current is not a state of the flow, or the
+                flow is unknown.
         """
+        nxt = self.peek(current, has_timeline, has_room_size, qualification_status, flow)
+        STATE_TRANSITIONS.labels(current.value, nxt.value).inc()
+        return nxt
+
+    def peek(
+        self,
+        current: CallState,
+        has_timeline: bool = False,
+        has_room_size: bool = False,
+        qualification_status: Optional[QualificationStatus] = None,
+        flow: Optional[str] = None,
+    ) -> CallState:
+        """Like next_state(), without recording a transition (e.g. for a preview)."""
 
         # --- Guard against invalid input ---
         if not isinstance(current, CallState):
             raise ValueError(f"Invalid CallState: {current}")
 
-        # --- Mandatory linear flow ---
-        if current == CallState.ASK_LANGUAGE:
-            return CallState.ASK_CITY_OR_REGION
-
-        if current == CallState.ASK_CITY_OR_REGION:
-            return CallState.ASK_REGION_CONFIRM
-
-        if current == CallState.ASK_REGION_CONFIRM:
-            return CallState.ASK_BUDGET
-
-        # --- Optional steps ---
-        if current == CallState.ASK_BUDGET:
-            if not has_timeline:
-                return CallState.ASK_TIMELINE
-            if not has_room_size:
-                return CallState.ASK_ROOM_SIZE
-            return CallState.QUALIFY
-
-        if current == CallState.ASK_TIMELINE:
-            if not has_room_size:
-                return CallState.ASK_ROOM_SIZE
-            return CallState.QUALIFY
-
-        if current == CallState.ASK_ROOM_SIZE:
-            return CallState.QUALIFY
-
-        # --- Qualification decision ---
-        if current == CallState.QUALIFY:
-            if qualification_status in {
-                QualificationStatus.QUALIFIED,
-                QualificationStatus.NURTURE,
-            }:
-                return CallState.ASK_EMAIL
-            return CallState.CLOSE
-
-        # --- Terminal states ---
-        if current in {CallState.ASK_EMAIL, CallState.CLOSE}:
-            return CallState.CLOSE
-
-        # Fallback safety
-        return CallState.CLOSE
+        return self.flows.get(flow).next(
+            current, signal_mask(has_timeline, has_room_size, qualification_status)
+        )
+
+    def start_state(self, flow: Optional[str] = None) -> CallState:
+        """Return the state a call on the given flow starts in."""
+        return self.flows.get(flow).start
@@ -1,19 +1,117 @@
 """FastAPI application entry point for MN AI Voice Agent."""
 
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 
+from fastapi import Depends, FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.metrics_core import Metric
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from mn_ai_voice.app.api.admin import router as admin_router
+from mn_ai_voice.app.api.audio import router as audio_router
 from mn_ai_voice.app.api.calls import router as calls_router
+from mn_ai_voice.app.api.dependencies import get_db, require_admin
+from mn_ai_voice.app.api.middleware import RouteLatencyMiddleware
+from mn_ai_voice.app.core import metrics as app_metrics
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.logging import configure_logging, shutdown_logging
+from mn_ai_voice.app.db.models import CRMOutbox
+from mn_ai_voice.app.engine.kb_manager import kb_manager
+from mn_ai_voice.app.engine.prompt_audio import prompt_audio
+from mn_ai_voice.app.engine.prompt_templates import PromptRenderer
+from mn_ai_voice.app.workers.summary_trigger import summary_trigger
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Start and stop background services."""
+    configure_logging()
+    if settings.PROMPT_AUDIO_WARM:
+        await asyncio.to_thread(prompt_audio.warm, PromptRenderer.static_prompts())
+    kb_manager.start_watcher(settings.KB_WATCH_INTERVAL_SECONDS)
+    if settings.SUMMARY_TRIGGER_ENABLED:
+        await summary_trigger.start()
+    try:
+        yield
+    finally:
+        await summary_trigger.stop()
+        kb_manager.stop_watcher()
+        prompt_audio.close()
+        app_metrics.process_exited(os.getpid())
+        shutdown_logging()
+
 
 app = FastAPI(
     title="MN AI Voice Agent",
     version="0.1.0",
     description="AI-powered voice call agent for lead qualification.",
+    lifespan=lifespan,
 )
 
+app.add_middleware(RouteLatencyMiddleware)
+
 app.include_router(calls_router, prefix="/calls", tags=["calls"])
+app.include_router(audio_router, prefix="/audio", tags=["audio"])
+app.include_router(
+    admin_router,
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
 
 
 @app.get("/health", tags=["system"])
 def health() -> dict:
     """Health check endpoint."""
     return {"status": "ok"}
+
+
+@app.get("/metrics", tags=["system"])
+async def metrics(db: AsyncSession = Depends(get_db)) -> Response:
+    """
+    Prometheus metrics endpoint.
+
+    Merges all worker processes in multiprocess mode (see
+    core/metrics.py). Outbox backlog gauges are read from the database
+    on each scrape, so every API process reports the same values.
+    """
+    try:
+        backlog = await _outbox_backlog(db)
+    except Exception:  # pylint: disable=broad-exception-caught
+        # Keep exporting process metrics while the database is down.
+        logger.warning("outbox backlog query failed", exc_info=True)
+        backlog = []
+    return Response(app_metrics.render(backlog), media_type=CONTENT_TYPE_LATEST)
+
+
+async def _outbox_backlog(db: AsyncSession) -> list[Metric]:
+    """Pending outbox rows and the age of the oldest one."""
+    depth, oldest = (
+        await db.execute(
+            select(func.count(), func.min(CRMOutbox.created_at)).where(
+                CRMOutbox.status == "pending"
+            )
+        )
+    ).one()
+
+    age = 0.0
+    if oldest is not None:
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        age = max((now - oldest.replace(tzinfo=None)).total_seconds(), 0.0)
+
+    return [
+        GaugeMetricFamily("crm_outbox_pending", "Outbox rows waiting for delivery.", depth),
+        GaugeMetricFamily(
+            "crm_outbox_oldest_pending_age_seconds",
+            "Age of the oldest pending outbox row (0 when none).",
+            age,
+        ),
+    ]
@@ -3,18 +3,64 @@ Call orchestration logic.
 
 Coordinates a single user turn by routing input, updating state,
 applying skills, and emitting events.
+
+A turn whose text arrives as partial speech recognition hypotheses
+can be routed and extracted incrementally (PartialTurn), so its reply
+is ready by the time the final hypothesis arrives.
 """
 
-from sqlalchemy.orm import Session
+from typing import Optional, Protocol
 
+from mn_ai_voice.app.engine.extractors import Extraction, ExtractionEngine, IncrementalExtraction
+from mn_ai_voice.app.engine.kb_manager import KBVersion
+from mn_ai_voice.app.engine.kb_router import FAQEntry
+from mn_ai_voice.app.engine.keyword_matcher import IncrementalScan
 from mn_ai_voice.app.engine.state_machine import StateMachine
 from mn_ai_voice.app.engine.prompt_templates import PromptRenderer
-from mn_ai_voice.app.skills.faq_skill import FAQSkill
+from mn_ai_voice.app.skills.faq_skill import FAQContext, FAQSkill
 from mn_ai_voice.app.skills.qualification_skill import QualificationSkill
 from mn_ai_voice.app.core.constants import EventType, CallState, QualificationStatus
+from mn_ai_voice.app.core.metrics import TURNS_HANDLED
+from mn_ai_voice.app.core.timing import TurnTimer
 from mn_ai_voice.app.db.models import Event, Call, LeadSnapshot
 
 
+class TurnWrites(Protocol):
+    """Where a turn's new and changed objects go: a Session, AsyncSession or a buffer."""
+
+    def add(self, instance: object) -> None:
+        """Stage an object for writing."""
+
+
+class PartialTurn:
+    """
+    FAQ routing and extraction state for a turn still being spoken.
+
+    Pins the knowledge base version at the first hypothesis. Each
+    update() scans only what changed since the previous hypothesis.
+    """
+
+    def __init__(self, kb: KBVersion, extractor: ExtractionEngine) -> None:
+        self.kb = kb
+        self.text = ""
+        self.fields = Extraction()
+        self._faq: IncrementalScan[FAQEntry] = kb.router.index.scan()
+        self._extraction: IncrementalExtraction = extractor.incremental()
+
+    def update(self, text: str) -> None:
+        """Take the latest hypothesis for the turn."""
+        if text == self.text:
+            return
+        self._faq.update(text)
+        self.fields = self._extraction.update(text)
+        self.text = text
+
+    @property
+    def answer(self) -> Optional[str]:
+        """FAQ answer for the text so far, if any."""
+        return self.kb.router.index.answer(self._faq.matches) if self.text else None
+
+
 class CallOrchestrator:
     """Coordinates a single conversational turn for a call."""
 
@@ -26,58 +72,75 @@ class CallOrchestrator:
 
     def handle_turn(
         self,
-        db: Session,
+        db: TurnWrites,
         call: Call,
         snapshot: LeadSnapshot,
         text: str,
+        timer: Optional[TurnTimer] = None,
+        partial: Optional[PartialTurn] = None,
     ) -> str:
-        """Handle one user turn and return the assistant reply."""
+        """
+        Handle one user turn and return the assistant reply.
+
+        Performs no I/O: events and snapshot changes are only added to
+        the session, so the same code serves sync and async callers.
+        The caller flushes and commits (or, for a buffer, persists the
+        added events itself).
+
+        If a timer is given, the FAQ routing, extraction and transition
+        stages are recorded on it.
+
+        If partial is given (see begin_partial()), text is its final
+        hypothesis and only what changed since the last partial one is
+        scanned, under the knowledge base version the turn started with.
+        """
+
+        timer = timer or TurnTimer()
+
+        # --- Pin the knowledge base version for this turn ---
+        kb = partial.kb if partial is not None else self.faq.manager.current
 
         # --- FAQ interrupt (no state or snapshot mutation) ---
-        if self.faq.can_handle(text):
-            answer = self.faq.handle(type("Ctx", (), {"text": text}))
-            if answer:
-                db.add(
-                    Event(
-                        call_id=call.call_id,
-                        type=EventType.ASSISTANT_TURN,
-                        payload_json={"text": answer},
-                    )
+        with timer.stage("faq"):
+            if partial is not None:
+                partial.update(text)
+                answer = partial.answer
+            else:
+                answer = self.faq.handle(FAQContext(text=text, kb=kb))
+        if answer:
+            TURNS_HANDLED.labels("faq").inc()
+            db.add(
+                Event(
+                    call_id=call.call_id,
+                    type=EventType.ASSISTANT_TURN,
+                    payload_json={"text": answer, "kb_version": kb.version},
                 )
-                return answer
+            )
+            return answer
 
         # --- Log user input (non-interrupt path only) ---
+        TURNS_HANDLED.labels("flow").inc()
         db.add(
             Event(
                 call_id=call.call_id,
                 type=EventType.USER_TURN,
-                payload={"text": text},
+                payload_json={"text": text},
             )
         )
 
         # --- Apply qualification skill ---
         current_state = CallState(call.current_state)
-        self.qualification.apply(current_state, text, snapshot)
+        with timer.stage("extraction"):
+            self.qualification.apply(
+                current_state, text, snapshot, partial.fields if partial else None
+            )
         db.add(snapshot)
 
-        # --- Derive snapshot signals ---
-        has_timeline = snapshot.timeline_bucket not in {None, "unknown"}
-        has_room_size = bool(snapshot.room_size_text)
-
-        qualification_status = None
-        if snapshot.qualification_status:
-            try:
-                qualification_status = QualificationStatus(snapshot.qualification_status)
-            except ValueError:
-                qualification_status = None
-
         # --- Determine next state ---
-        next_state = self.state_machine.next_state(
-            current_state,
-            has_timeline=has_timeline,
-            has_room_size=has_room_size,
-            qualification_status=qualification_status,
-        )
+        with timer.stage("transition"):
+            next_state = self.state_machine.next_state(
+                current_state, **self._signals(snapshot), flow=self._flow(call)
+            )
 
         call.current_state = next_state.value
 
@@ -88,8 +151,52 @@ class CallOrchestrator:
             Event(
                 call_id=call.call_id,
                 type=EventType.ASSISTANT_TURN,
-                payload={"text": reply},
+                payload_json={"text": reply, "kb_version": kb.version},
             )
         )
 
         return reply
+
+    def begin_partial(self) -> PartialTurn:
+        """Start a turn whose text will arrive as partial hypotheses."""
+        return PartialTurn(self.faq.manager.current, self.qualification.extractor)
+
+    def preview(self, call: Call, snapshot: LeadSnapshot, partial: PartialTurn) -> str:
+        """
+        Return the reply the turn would get if the caller stopped now.
+
+        Changes nothing: extraction is applied to a copy of the
+        snapshot and no transition or event is recorded.
+        """
+        if partial.answer:
+            return partial.answer
+
+        columns = LeadSnapshot.__table__.columns
+        shadow = LeadSnapshot(**{column.key: getattr(snapshot, column.key) for column in columns})
+        current_state = CallState(call.current_state)
+        self.qualification.apply(current_state, partial.text, shadow, partial.fields)
+        next_state = self.state_machine.peek(
+            current_state, **self._signals(shadow), flow=self._flow(call)
+        )
+        return self.prompts.render(next_state)
+
+    @staticmethod
+    def _flow(call: Call) -> Optional[str]:
+        """The call's flow name, or None for the default flow."""
+        return str(call.flow) if call.flow else None
+
+    @staticmethod
+    def _signals(snapshot: LeadSnapshot) -> dict:
+        """Snapshot signals the state machine decides on."""
+        qualification_status = None
+        if snapshot.qualification_status:
+            try:
+                qualification_status = QualificationStatus(snapshot.qualification_status)
+            except ValueError:
+                qualification_status = None
+
+        return {
+            "has_timeline": snapshot.timeline_bucket not in {None, "unknown"},
+            "has_room_size": bool(snapshot.room_size_text),
+            "qualification_status": qualification_status,
+        }
@@ -5,27 +5,35 @@ Handles user queries that map to predefined knowledge base entries.
 """
 
 from dataclasses import dataclass
+from typing import Optional
 
 from mn_ai_voice.app.skills.base import Skill
-from mn_ai_voice.app.engine.kb_router import KBRouter
+from mn_ai_voice.app.engine.kb_manager import KBVersion, KnowledgeBaseManager, kb_manager
 
 
 @dataclass
 class FAQContext:
-    """Context object containing user input text for FAQ processing."""
+    """
+    Context object containing user input text for FAQ processing.
+
+    kb pins the knowledge base version used for the turn; when omitted
+    the manager's current version is used.
+    """
     text: str
+    kb: Optional[KBVersion] = None
 
 
 class FAQSkill(Skill):
     """Skill responsible for answering FAQ-style user questions."""
 
-    def __init__(self) -> None:
-        self.router = KBRouter()
+    def __init__(self, manager: Optional[KnowledgeBaseManager] = None) -> None:
+        self.manager = manager or kb_manager
 
     def can_handle(self, text: str) -> bool:
         """Return True if the input text can be routed to the knowledge base."""
-        return self.router.route(text) is not None
+        return self.manager.current.router.route(text) is not None
 
     def handle(self, context: FAQContext) -> str | None:
         """Handle the request by returning a knowledge base response."""
-        return self.router.route(context.text)
+        kb = context.kb or self.manager.current
+        return kb.router.route(context.text)
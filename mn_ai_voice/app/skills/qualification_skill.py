@@ -5,7 +5,9 @@ Applies extraction and qualification rules to update a lead snapshot
 based on user input, independent of strict conversation order.
 """
 
-from mn_ai_voice.app.engine.extractors import BudgetExtractor, EmailExtractor
+from typing import Optional
+
+from mn_ai_voice.app.engine.extractors import Extraction, ExtractionEngine
 from mn_ai_voice.app.engine.qualification_rules import QualificationService
 from mn_ai_voice.app.core.constants import CallState
 from mn_ai_voice.app.db.models import LeadSnapshot
@@ -15,27 +17,43 @@ class QualificationSkill:
     """Skill responsible for extracting and evaluating lead qualification data."""
 
     def __init__(self) -> None:
-        self.budget_extractor = BudgetExtractor()
-        self.email_extractor = EmailExtractor()
+        self.extractor = ExtractionEngine()
         self.qualifier = QualificationService()
 
-    def apply(self, state: CallState, text: str, snapshot: LeadSnapshot) -> LeadSnapshot:
+    def apply(
+        self,
+        state: CallState,
+        text: str,
+        snapshot: LeadSnapshot,
+        fields: Optional[Extraction] = None,
+    ) -> LeadSnapshot:
         """
         Apply qualification-related logic based on user input.
 
+        - Record the language when asked
         - Extract budget whenever mentioned
         - Extract email only when explicitly asked
         - Evaluate qualification once sufficient data exists
+
+        fields, if given, were already extracted from text (e.g.
+        incrementally while it arrived) and are used as they are;
+        otherwise only the fields used here are extracted.
         """
 
-        # --- Budget extraction (can happen anytime) ---
-        budget_band = self.budget_extractor.extract(text)
-        if budget_band and budget_band != "unknown":
+        # --- Language (only when asked) ---
+        if state == CallState.ASK_LANGUAGE:
+            language = fields.language if fields else self.extractor.language(text)
+            if language != "unknown":
+                snapshot.language = language  # type: ignore[assignment]
+
+        # --- Budget (can happen anytime) ---
+        budget_band = fields.budget_band if fields else self.extractor.budget_band(text)
+        if budget_band != "unknown":
             snapshot.budget_band = budget_band
 
-        # --- Email extraction (only when asked) ---
+        # --- Email (only when asked) ---
         if state == CallState.ASK_EMAIL:
-            email = self.email_extractor.extract(text)
+            email = fields.email if fields else self.extractor.email(text)
             if email:
                 snapshot.email = email
 
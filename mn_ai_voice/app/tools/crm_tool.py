@@ -0,0 +1,111 @@
+"""
+CRM client.
+
+Delivers outbox actions (upsert_lead / set_stage / append_note, and
+the bulk append_notes used when notes are coalesced) to the CRM. The
+outbox worker depends only on the CRMClient protocol, so the HTTP
+client can be swapped for a vendor SDK or a test double.
+
+Every request carries the outbox idempotency_key; the CRM must treat
+a repeated key as the same request. Each note in an append_notes
+payload also carries its own idempotency_key, which the CRM must
+de-duplicate individually.
+"""
+
+from typing import Any, Optional, Protocol
+
+import httpx
+
+from mn_ai_voice.app.core.config import settings
+
+
+class CRMError(Exception):
+    """A CRM request failed."""
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = True,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after  # seconds, if the CRM asked for a delay
+
+
+class CRMClient(Protocol):  # pylint: disable=too-few-public-methods
+    """Delivers one outbox action. Must be safe to call from threads."""
+
+    def deliver(self, action: str, payload: dict[str, Any], idempotency_key: str) -> None:
+        """
+        Deliver an action.
+
+        Raises:
+            CRMError: If the CRM did not accept the action.
+        """
+
+
+class HTTPCRMClient:
+    """
+    JSON-over-HTTP CRM client.
+
+    POSTs each action to <base_url>/<action> with the idempotency key
+    in the Idempotency-Key header. Transport errors, timeouts, 408, 429
+    and 5xx responses are retryable; other 4xx responses are not. A
+    Retry-After header (in seconds) is passed on to the caller.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_connections: int = 20,
+    ) -> None:
+        headers = {}
+        api_key = api_key if api_key is not None else settings.CRM_API_KEY
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        self._client = httpx.Client(
+            base_url=base_url or settings.CRM_BASE_URL,
+            headers=headers,
+            timeout=timeout or settings.CRM_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def deliver(self, action: str, payload: dict[str, Any], idempotency_key: str) -> None:
+        """POST one action to the CRM."""
+        try:
+            response = self._client.post(
+                f"/{action}",
+                json=payload,
+                headers={"Idempotency-Key": idempotency_key},
+            )
+        except httpx.HTTPError as exc:
+            raise CRMError(f"{type(exc).__name__}: {exc}") from exc
+
+        if response.is_success:
+            return
+
+        retryable = response.status_code in (408, 429) or response.status_code >= 500
+        raise CRMError(
+            f"HTTP {response.status_code}: {response.text[:200]}",
+            retryable=retryable,
+            retry_after=_retry_after(response),
+        )
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._client.close()
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)."""
+    try:
+        return max(float(response.headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return None
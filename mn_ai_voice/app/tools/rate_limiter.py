@@ -0,0 +1,95 @@
+"""
+Token-bucket rate limiting for outbound API calls.
+
+Each key (e.g. a CRM action) gets its own bucket refilled at a fixed
+rate. acquire() blocks until a token is available, so callers run at
+the configured rate rather than failing fast.
+
+Limits are per process; with N workers sharing one vendor quota,
+configure each with quota / N.
+"""
+
+import threading
+import time
+from typing import Callable, Mapping, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket capacity; defaults to one second of tokens
+                (at least 1).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one will be.
+        """
+        with self._lock:
+            self._refill()
+            # Tolerate float rounding (0.9999999999999998 is a full token).
+            if self._tokens >= 1 - 1e-9:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """
+        Take a token, blocking until it is due.
+
+        The token is reserved up front: the bucket goes into debt and the
+        caller sleeps exactly the deficit, so waiters are served in order
+        and no retry loop is needed.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self._sleep(wait)
+
+
+class RateLimiter:
+    """One TokenBucket per key; keys without a configured rate are unlimited."""
+
+    def __init__(self, rates: Mapping[str, float], **bucket_options) -> None:
+        self.buckets = {
+            key: TokenBucket(rate, **bucket_options)
+            for key, rate in rates.items()
+            if rate > 0
+        }
+
+    def acquire(self, key: str) -> None:
+        """Block until a request for key may be sent."""
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.acquire()
@@ -0,0 +1,127 @@
+"""
+Text-to-speech clients.
+
+The prompt audio cache (engine/prompt_audio.py) depends only on the
+TTSBackend protocol, so the HTTP client can be swapped for a vendor
+SDK. StubTTSBackend synthesizes deterministic placeholder audio
+locally, for tests and development without a TTS service.
+"""
+
+import hashlib
+import struct
+from typing import Optional, Protocol
+
+import httpx
+
+from mn_ai_voice.app.core.config import settings
+
+
+class TTSError(Exception):
+    """A synthesis request failed."""
+
+
+class TTSBackend(Protocol):  # pylint: disable=too-few-public-methods
+    """Synthesizes speech. Must be safe to call from threads."""
+
+    def synthesize(self, text: str, language: str, voice: str) -> bytes:
+        """
+        Return the audio (a complete WAV file) for text.
+
+        Raises:
+            TTSError: If synthesis failed.
+        """
+
+
+class HTTPTTSBackend:
+    """
+    JSON-over-HTTP TTS client.
+
+    POSTs {"text", "language", "voice"} to <base_url>/synthesize and
+    expects the audio as the response body.
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> None:
+        headers = {}
+        api_key = api_key if api_key is not None else settings.TTS_API_KEY
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        self._client = httpx.Client(
+            base_url=base_url or settings.TTS_BASE_URL,
+            headers=headers,
+            timeout=timeout or settings.TTS_TIMEOUT_SECONDS,
+        )
+
+    def synthesize(self, text: str, language: str, voice: str) -> bytes:
+        """POST one synthesis request."""
+        try:
+            response = self._client.post(
+                "/synthesize",
+                json={"text": text, "language": language, "voice": voice},
+            )
+        except httpx.HTTPError as exc:
+            raise TTSError(f"{type(exc).__name__}: {exc}") from exc
+
+        if not response.is_success:
+            raise TTSError(f"HTTP {response.status_code}: {response.text[:200]}")
+        if not response.content:
+            raise TTSError("Empty audio")
+        return response.content
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self._client.close()
+
+
+class StubTTSBackend:
+    """
+    Local stand-in for a TTS service.
+
+    Returns a valid 8 kHz, 16-bit mono WAV file whose samples are
+    derived from a hash of the request, about 50 ms per character, so
+    the same request always yields the same bytes.
+    """
+
+    SAMPLE_RATE = 8000
+    SAMPLES_PER_CHAR = 400
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def synthesize(self, text: str, language: str, voice: str) -> bytes:
+        """Return placeholder audio for text."""
+        self.calls += 1
+        seed = hashlib.sha256(f"{language}\x1f{voice}\x1f{text}".encode("utf-8")).digest()
+        samples = max(len(text), 1) * self.SAMPLES_PER_CHAR * 2
+        data = (seed * (samples // len(seed) + 1))[:samples]
+        return _wav_header(len(data), self.SAMPLE_RATE) + data
+
+
+def _wav_header(data_size: int, sample_rate: int) -> bytes:
+    """RIFF/WAVE header for 16-bit mono PCM."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+def tts_backend(name: Optional[str] = None) -> TTSBackend:
+    """
+    Build the configured TTS backend ("stub" or "http").
+
+    Raises:
+        ValueError: If the name is not a known backend.
+    """
+    name = name or settings.TTS_BACKEND
+    if name == "stub":
+        return StubTTSBackend()
+    if name == "http":
+        return HTTPTTSBackend()
+    raise ValueError(f"Unknown TTS backend: {name}")
@@ -0,0 +1,152 @@
+"""
+Analytics aggregate rebuild.
+
+Recomputes funnel_stats, qualification_stats and turn_stats (see
+db/analytics.py) from the source records and replaces them in one
+transaction. Run it once after the migration that adds the tables,
+after restoring a backup, or whenever the aggregates look off.
+
+State history comes from turn_records, the per-turn ledger holding
+the state each turn left the call in; events carry no states and may
+already be archived. Turns committed while a rebuild runs can be
+missed, so run it when traffic is low.
+
+Run with:
+    python -m mn_ai_voice.app.workers.analytics_rebuild
+"""
+
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from mn_ai_voice.app.db.analytics import (
+    FUNNEL,
+    QUALIFICATION,
+    TURNS,
+    TURNS_CAP,
+    UNKNOWN,
+    AnalyticsDeltas,
+)
+from mn_ai_voice.app.db.models import Artifact, Call, LeadSnapshot, TurnRecord
+from mn_ai_voice.app.engine.flows import FlowRegistry, flow_registry
+
+
+class AnalyticsRebuilder:
+    """Recomputes the analytics aggregates from scratch."""
+
+    def __init__(
+        self,
+        batch_size: int = 10_000,
+        flows: Optional[FlowRegistry] = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flows = flows or flow_registry
+
+    def run(self, db: Session) -> AnalyticsDeltas:
+        """
+        Replace the aggregate tables with recomputed values.
+
+        Returns:
+            The recomputed counts.
+        """
+        totals = AnalyticsDeltas()
+        self._funnel(db, totals)
+        self._qualification(db, totals)
+        self._turns(db, totals)
+
+        for table in (FUNNEL, QUALIFICATION, TURNS):
+            db.execute(delete(table))
+        totals.apply(db)
+        db.commit()
+        return totals
+
+    def _funnel(self, db: Session, totals: AnalyticsDeltas) -> None:
+        # Calls enter their flow's start state, as start_call counts them.
+        starts: dict[Optional[str], str] = {}
+
+        def start(flow: Optional[str]) -> str:
+            if flow not in starts:
+                starts[flow] = self.flows.get(flow).start.value
+            return starts[flow]
+
+        entered: Counter[str] = Counter()
+        for flow, n in db.execute(select(Call.flow, func.count()).group_by(Call.flow)):
+            entered[start(flow)] += n
+
+        # Replay each call's states; a state counts on every entry into it.
+        rows = db.execute(
+            select(TurnRecord.call_id, TurnRecord.state, Call.flow)
+            .outerjoin(Call, Call.call_id == TurnRecord.call_id)
+            .order_by(TurnRecord.call_id, TurnRecord.created_at, TurnRecord.turn_id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        call_id, state = None, None
+        for row in rows:
+            if row.call_id != call_id:
+                call_id, state = row.call_id, start(row.flow)
+            if row.state != state:
+                entered[row.state] += 1
+                state = row.state
+
+        for state, n in entered.items():
+            totals.funnel[(state, "entered")] = n
+
+        rows = db.execute(
+            select(Call.current_state, Call.ended_at.is_(None), func.count())
+            .group_by(Call.current_state, Call.ended_at.is_(None))
+        )
+        for state, is_open, n in rows:
+            column = "in_progress" if is_open else "ended"
+            totals.funnel[(state or UNKNOWN, column)] += n
+
+    def _qualification(self, db: Session, totals: AnalyticsDeltas) -> None:
+        bucket = (
+            func.coalesce(LeadSnapshot.qualification_status, UNKNOWN),
+            func.coalesce(LeadSnapshot.region_value, UNKNOWN),
+            func.coalesce(LeadSnapshot.budget_band, UNKNOWN),
+        )
+        for status, region, band, n in db.execute(
+            select(*bucket, func.count()).group_by(*bucket)
+        ):
+            totals.qualification[(status, region, band)] = n
+
+    def _turns(self, db: Session, totals: AnalyticsDeltas) -> None:
+        summarized = (
+            select(Artifact.call_id)
+            .where(Artifact.type == "summary")
+            .distinct()
+            .subquery()
+        )
+        turns = (
+            select(TurnRecord.call_id, func.count().label("n"))
+            .group_by(TurnRecord.call_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(func.coalesce(turns.c.n, 0), func.count())
+            .select_from(summarized)
+            .outerjoin(turns, turns.c.call_id == summarized.c.call_id)
+            .group_by(func.coalesce(turns.c.n, 0))
+        )
+        for n_turns, calls in rows:
+            totals.turns[min(n_turns, TURNS_CAP)] += calls
+
+
+def main() -> None:
+    """Rebuild the aggregates in the configured database."""
+    # pylint: disable=import-outside-toplevel
+    from mn_ai_voice.app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        totals = AnalyticsRebuilder().run(db)
+    print(
+        f"rebuilt analytics: {len(totals.funnel)} funnel counters, "
+        f"{len(totals.qualification)} qualification buckets, "
+        f"{sum(totals.turns.values())} summarized calls"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Event ledger archiver.
+
+Moves cold event partitions out of the hot events table into
+compressed segment files (see db/ledger.py).
+
+A partition is archived by writing its segment first and only then
+deleting exactly the rows written to it, so a crash at any point
+leaves every event readable and rows committed meanwhile are never
+lost. Re-running after a crash reuses the existing segments; rows
+that reach an archived partition later go into a follow-up segment.
+
+Run once with:
+    python -m mn_ai_voice.app.workers.ledger_archiver
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.db.ledger import (
+    LedgerEvent,
+    Segment,
+    SegmentCatalog,
+    hot_cutoff,
+    partition_bounds,
+    partition_key,
+    write_segment,
+)
+from mn_ai_voice.app.db.models import Event
+
+
+class LedgerArchiver:
+    """Archives event partitions older than the hot window."""
+
+    def __init__(
+        self,
+        archive_dir: Optional[Path] = None,
+        granularity: Optional[str] = None,
+        hot_partitions: Optional[int] = None,
+        batch_size: int = 1000,
+    ) -> None:
+        self.archive_dir = Path(archive_dir or settings.LEDGER_ARCHIVE_DIR)
+        self.granularity = granularity or settings.LEDGER_PARTITION
+        self.hot_partitions = hot_partitions or settings.LEDGER_HOT_PARTITIONS
+        self.batch_size = batch_size
+        self.catalog = SegmentCatalog(self.archive_dir)
+
+    def run(self, db: Session, now: Optional[datetime] = None) -> list[Segment]:
+        """
+        Archive every cold partition, oldest first.
+
+        Args:
+            db: Database session.
+            now: Reference time (naive UTC); defaults to the current time.
+
+        Returns:
+            Segments archived by this run.
+        """
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        cutoff = hot_cutoff(now, self.granularity, self.hot_partitions)
+
+        archived = []
+        start: Optional[datetime] = None
+        while True:
+            # Each partition is visited once per run; rows arriving in it
+            # during the run are left for the next one.
+            query = db.query(func.min(Event.created_at)).filter(Event.created_at < cutoff)
+            if start is not None:
+                query = query.filter(Event.created_at >= start)
+            oldest = query.scalar()
+            if oldest is None:
+                break
+
+            partition = partition_key(oldest, self.granularity)
+            segment = self.archive_partition(db, partition)
+            if segment is not None:
+                archived.append(segment)
+            start = partition_bounds(partition)[1]
+
+        return archived
+
+    def archive_partition(self, db: Session, partition: str) -> Optional[Segment]:
+        """
+        Move a partition's hot rows into a segment.
+
+        Rows already in one of the partition's segments (an earlier run
+        was interrupted before its delete) are only deleted; any other
+        rows are written to a new segment first. A row is looked up in
+        a segment only if the index's id range for its call covers it,
+        so the common runs decompress nothing.
+
+        Returns:
+            The segment written, or None if every row was already archived.
+        """
+        start, end = partition_bounds(partition)
+        in_partition = (Event.created_at >= start, Event.created_at < end)
+
+        existing = self.catalog.for_partition(partition)
+        archived_ids: list[int] = []
+        written_ids: list[int] = []
+
+        def new_events() -> Iterator[LedgerEvent]:
+            rows = (
+                db.query(Event)
+                .filter(*in_partition)
+                .order_by(Event.call_id, Event.event_id)
+                .yield_per(self.batch_size)
+            )
+            # Ids of the current call's members, per segment, read on demand
+            members: dict[int, set[int]] = {}
+            call_id = None
+            for row in rows:
+                event = LedgerEvent.from_row(row)
+                if event.call_id != call_id:
+                    call_id, members = event.call_id, {}
+                if _in_segments(existing, members, event.call_id, event.event_id):
+                    archived_ids.append(event.event_id)
+                else:
+                    written_ids.append(event.event_id)
+                    yield event
+
+        sequence = max((seg.sequence for seg in existing), default=-1) + 1
+        segment = write_segment(self.archive_dir, partition, new_events(), sequence)
+
+        # Delete exactly the archived ids; rows committed after the scan
+        # (possibly with lower ids) stay for the next run.
+        to_delete = archived_ids + written_ids
+        for i in range(0, len(to_delete), self.batch_size):
+            db.query(Event).filter(
+                *in_partition,
+                Event.event_id.in_(to_delete[i:i + self.batch_size]),
+            ).delete(synchronize_session=False)
+
+        db.commit()
+        return segment
+
+
+def _in_segments(
+    segments: list[Segment],
+    members: dict[int, set[int]],
+    call_id: str,
+    event_id: int,
+) -> bool:
+    """Whether a call's event is in one of segments, caching read members."""
+    for i, segment in enumerate(segments):
+        if not segment.covers(call_id, event_id):
+            continue
+        if i not in members:
+            members[i] = {event.event_id for event in segment.iter_call(call_id)}
+        if event_id in members[i]:
+            return True
+    return False
+
+
+def main() -> None:
+    """Archive all cold partitions using the configured database."""
+    # pylint: disable=import-outside-toplevel
+    from mn_ai_voice.app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        for segment in LedgerArchiver().run(db):
+            print(
+                f"archived {segment.partition} (segment {segment.sequence}): "
+                f"{segment.rows} events"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+"""
+CRM outbox dispatcher.
+
+Leases batches of due crm_outbox rows, coalesces them per lead,
+delivers them through a CRMClient with bounded concurrency and
+per-action rate limits, and records the results in bulk.
+
+Leasing is a short transaction that stamps rows with this worker's id
+and a lease expiry, and moves next_attempt_at to that expiry so a
+single range condition finds due rows. On Postgres candidates are
+selected with FOR UPDATE SKIP LOCKED, so concurrent workers never wait
+on or pick the same rows. SQLite has no row locks; there the lease UPDATE
+re-checks availability and SQLite's single writer makes it the
+arbiter, and only rows returned by UPDATE ... RETURNING are delivered.
+
+Coalescing: a lease also takes the lead's other due upsert_lead and
+append_note rows. Upserts for one lead are merged into a single
+request carrying the latest state; notes are sent in bulk through the
+CRM's append_notes action, each note keeping its own idempotency_key.
+Every row covered by a request gets that request's outcome.
+
+Results are written only while the lease is still ours. A worker that
+dies mid-batch leaves its rows to be re-leased after locked_until; the
+redelivery carries the same idempotency_key.
+
+Retryable failures are rescheduled with jittered exponential backoff
+(or the CRM's Retry-After, if longer). Rows that fail permanently or
+exhaust OUTBOX_MAX_ATTEMPTS move to the dead status and stay there
+until requeued by hand.
+
+Run with:
+    python -m mn_ai_voice.app.workers.outbox_worker
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional, cast
+
+from sqlalchemy import Table, and_, bindparam, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.metrics import OUTBOX_DELIVERY_LAG
+from mn_ai_voice.app.db.models import CRMOutbox
+from mn_ai_voice.app.tools.crm_tool import CRMClient, CRMError
+from mn_ai_voice.app.tools.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Core table: bulk updates use executemany, not ORM bulk-by-primary-key.
+OUTBOX = cast(Table, CRMOutbox.__table__)
+
+# Actions merged per lead before delivery
+COALESCED_ACTIONS = ("upsert_lead", "append_note")
+
+
+def utcnow() -> datetime:
+    """Current time as naive UTC, the form stored in the lease columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def backoff_seconds(
+    attempts: int,
+    base: float,
+    cap: float,
+    rng: Callable[[], float] = random.random,
+) -> float:
+    """
+    Delay before the next attempt after `attempts` failed deliveries.
+
+    Exponential (base, 2*base, 4*base, ... up to cap) with equal
+    jitter: the delay is uniform in [d/2, d], so retries after an
+    outage spread out without ever retrying immediately.
+    """
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return delay / 2 + rng() * delay / 2
+
+
+@dataclass(frozen=True)
+class OutboxItem:
+    """A leased outbox row."""
+
+    outbox_id: int
+    action: str
+    payload: dict[str, Any]
+    idempotency_key: str
+    attempts: int = 0  # before this delivery
+    lead_id: Optional[str] = None
+    created_at: Optional[datetime] = None  # enqueue time
+
+
+@dataclass(frozen=True)
+class CRMRequest:
+    """One CRM API call, covering one or more outbox rows."""
+
+    action: str
+    payload: dict[str, Any]
+    idempotency_key: str
+    items: tuple[OutboxItem, ...]
+
+
+@dataclass(frozen=True)
+class Delivery:
+    """Outcome of delivering one request."""
+
+    request: CRMRequest
+    error: Optional[str] = None
+    retryable: bool = True
+    retry_after: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the CRM accepted the action."""
+        return self.error is None
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    """Counts for one dispatched batch."""
+
+    leased: int = 0
+    requests: int = 0
+    delivered: int = 0
+    retrying: int = 0
+    dead: int = 0
+
+
+# ---------- Coalescing ----------
+
+def single_request(item: OutboxItem) -> CRMRequest:
+    """Send one row as it was enqueued."""
+    return CRMRequest(item.action, item.payload, item.idempotency_key, (item,))
+
+
+def _merged_request(action: str, payload: dict[str, Any], items: list[OutboxItem]) -> CRMRequest:
+    # Same rows, same key: a redelivered merge is recognised by the CRM.
+    digest = hashlib.sha256(
+        "\n".join(sorted(item.idempotency_key for item in items)).encode("utf-8")
+    ).hexdigest()[:32]
+    return CRMRequest(action, payload, f"{action}:{digest}", tuple(items))
+
+
+def coalesce(items: list[OutboxItem], max_notes: int) -> list[CRMRequest]:
+    """
+    Turn leased rows into CRM requests, merging rows of the same lead.
+
+    Args:
+        items: Leased rows, oldest first.
+        max_notes: Most notes sent in one append_notes request.
+
+    Returns:
+        Requests in first-row order. upsert_lead rows for a lead become
+        one upsert_lead whose payload merges theirs (newest value wins);
+        append_note rows for a lead become append_notes requests with a
+        "notes" list. Other rows, and rows without a lead, pass through.
+    """
+    requests: list[CRMRequest] = []
+    groups: dict[tuple[str, str], list[OutboxItem]] = {}
+
+    for item in items:
+        if item.lead_id is None or item.action not in COALESCED_ACTIONS:
+            requests.append(single_request(item))
+        else:
+            groups.setdefault((item.action, item.lead_id), []).append(item)
+
+    for (action, lead_id), group in groups.items():
+        if action == "upsert_lead":
+            chunks = [group]
+        else:
+            chunks = [group[i:i + max_notes] for i in range(0, len(group), max_notes)]
+
+        for chunk in chunks:
+            if len(chunk) == 1:
+                requests.append(single_request(chunk[0]))
+            elif action == "upsert_lead":
+                payload: dict[str, Any] = {}
+                for item in chunk:
+                    payload.update(item.payload)
+                requests.append(_merged_request(action, payload, chunk))
+            else:
+                notes = [
+                    {"idempotency_key": item.idempotency_key, **item.payload}
+                    for item in chunk
+                ]
+                requests.append(
+                    _merged_request("append_notes", {"lead_id": lead_id, "notes": notes}, chunk)
+                )
+
+    return sorted(requests, key=lambda r: r.items[0].outbox_id)
+
+
+class OutboxWorker:
+    """Drains the CRM outbox. Several workers may run in parallel."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        client: CRMClient,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        lease_seconds: Optional[float] = None,
+        worker_id: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        coalesce: Optional[bool] = None,  # pylint: disable=redefined-outer-name
+        clock: Callable[[], datetime] = utcnow,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.session_factory = session_factory
+        self.client = client
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.concurrency = concurrency or settings.OUTBOX_CONCURRENCY
+        self.lease = timedelta(seconds=lease_seconds or settings.OUTBOX_LEASE_SECONDS)
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+        self.rate_limiter = rate_limiter or RateLimiter(settings.CRM_RATE_LIMITS)
+        self.coalesce = settings.OUTBOX_COALESCE if coalesce is None else coalesce
+        self.max_notes = settings.OUTBOX_MAX_NOTES_PER_REQUEST
+        self._clock = clock
+        self._rng = rng
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix="outbox",
+        )
+
+    # ---------- Leasing ----------
+
+    def lease_batch(self, db: Session) -> list[OutboxItem]:
+        """
+        Lease up to batch_size due rows, longest-waiting first.
+
+        With coalescing on, up to batch_size more due rows belonging to
+        the same leads are leased too, so a lead's backlog is merged in
+        one pass.
+        """
+        now = self._clock()
+        until = now + self.lease
+        available = and_(
+            OUTBOX.c.status == "pending",
+            OUTBOX.c.next_attempt_at <= now,
+        )
+
+        found = db.execute(
+            select(OUTBOX.c.outbox_id, OUTBOX.c.lead_id)
+            .where(available)
+            .order_by(OUTBOX.c.next_attempt_at, OUTBOX.c.outbox_id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not found:
+            db.commit()
+            return []
+
+        candidates = [row.outbox_id for row in found]
+        leads = {row.lead_id for row in found if row.lead_id is not None}
+        if self.coalesce and leads:
+            candidates += db.scalars(
+                select(OUTBOX.c.outbox_id)
+                .where(
+                    available,
+                    OUTBOX.c.lead_id.in_(leads),
+                    OUTBOX.c.action.in_(COALESCED_ACTIONS),
+                    OUTBOX.c.outbox_id.not_in(candidates),
+                )
+                .order_by(OUTBOX.c.outbox_id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+
+        rows = db.execute(
+            update(OUTBOX)
+            .where(OUTBOX.c.outbox_id.in_(candidates), available)
+            .values(
+                locked_by=self.worker_id,
+                locked_until=until,
+                next_attempt_at=until,
+            )
+            .returning(
+                OUTBOX.c.outbox_id,
+                OUTBOX.c.action,
+                OUTBOX.c.payload_json,
+                OUTBOX.c.idempotency_key,
+                OUTBOX.c.attempts,
+                OUTBOX.c.lead_id,
+                OUTBOX.c.created_at,
+            )
+        ).all()
+        db.commit()
+
+        return sorted(
+            (
+                OutboxItem(
+                    outbox_id=row.outbox_id,
+                    action=row.action,
+                    payload=row.payload_json or {},
+                    idempotency_key=row.idempotency_key,
+                    attempts=row.attempts or 0,
+                    lead_id=row.lead_id,
+                    created_at=row.created_at,
+                )
+                for row in rows
+            ),
+            key=lambda item: item.outbox_id,
+        )
+
+    # ---------- Delivery ----------
+
+    def deliver(self, items: list[OutboxItem]) -> list[Delivery]:
+        """
+        Coalesce items and deliver the requests concurrently (at most
+        `concurrency` in flight).
+
+        Each request waits for its action's rate limit, so a batch runs
+        at the configured throughput; size batches so they finish well
+        within the lease.
+        """
+        if self.coalesce:
+            requests = coalesce(items, self.max_notes)
+        else:
+            requests = [single_request(item) for item in items]
+        return list(self._pool.map(self._deliver_one, requests))
+
+    def _deliver_one(self, request: CRMRequest) -> Delivery:
+        try:
+            self.rate_limiter.acquire(request.action)
+            self.client.deliver(request.action, request.payload, request.idempotency_key)
+        except CRMError as exc:
+            return Delivery(
+                request,
+                error=str(exc),
+                retryable=exc.retryable,
+                retry_after=exc.retry_after,
+            )
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            # A client bug must not take the batch down with it.
+            return Delivery(request, error=f"{type(exc).__name__}: {exc}")
+        return Delivery(request)
+
+    # ---------- Results ----------
+
+    def record(self, db: Session, deliveries: list[Delivery]) -> BatchResult:
+        """Write delivery results in bulk and release the leases."""
+        now = self._clock()
+        ours = OUTBOX.c.locked_by == self.worker_id
+        release = {"locked_by": None, "locked_until": None}
+
+        delivered_items = [item for d in deliveries if d.ok for item in d.request.items]
+        delivered = [item.outbox_id for item in delivered_items]
+        if delivered:
+            db.execute(
+                update(OUTBOX)
+                .where(OUTBOX.c.outbox_id.in_(delivered), ours)
+                .values(
+                    status="success",
+                    attempts=OUTBOX.c.attempts + 1,
+                    last_error=None,
+                    **release,
+                )
+            )
+
+        failures = [
+            self._failure(d, item, now)
+            for d in deliveries
+            if not d.ok
+            for item in d.request.items
+        ]
+        if failures:
+            db.execute(
+                update(OUTBOX)
+                .where(OUTBOX.c.outbox_id == bindparam("b_outbox_id"), ours)
+                .values(
+                    status=bindparam("b_status"),
+                    attempts=OUTBOX.c.attempts + 1,
+                    last_error=bindparam("b_last_error"),
+                    next_attempt_at=bindparam("b_next_attempt_at"),
+                    **release,
+                ),
+                failures,
+            )
+
+        db.commit()
+
+        for item in delivered_items:
+            if item.created_at is not None:
+                lag = now - item.created_at.replace(tzinfo=None)
+                OUTBOX_DELIVERY_LAG.observe(max(lag.total_seconds(), 0.0))
+
+        dead = sum(1 for f in failures if f["b_status"] == "dead")
+        return BatchResult(
+            leased=sum(len(d.request.items) for d in deliveries),
+            requests=len(deliveries),
+            delivered=len(delivered),
+            retrying=len(failures) - dead,
+            dead=dead,
+        )
+
+    def _failure(self, delivery: Delivery, item: OutboxItem, now: datetime) -> dict:
+        """Bound parameters rescheduling (or dead-lettering) a failed row."""
+        attempts = item.attempts + 1
+
+        if not delivery.retryable or attempts >= self.max_attempts:
+            status, next_attempt_at = "dead", now
+        else:
+            delay = backoff_seconds(
+                attempts,
+                settings.OUTBOX_BACKOFF_BASE_SECONDS,
+                settings.OUTBOX_BACKOFF_MAX_SECONDS,
+                self._rng,
+            )
+            delay = max(delay, delivery.retry_after or 0.0)
+            status, next_attempt_at = "pending", now + timedelta(seconds=delay)
+
+        return {
+            "b_outbox_id": item.outbox_id,
+            "b_status": status,
+            "b_last_error": (delivery.error or "")[:1000],
+            "b_next_attempt_at": next_attempt_at,
+        }
+
+    # ---------- Loop ----------
+
+    def run_once(self) -> BatchResult:
+        """Lease, deliver and record one batch."""
+        with self.session_factory() as db:
+            items = self.lease_batch(db)
+        if not items:
+            return BatchResult()
+
+        deliveries = self.deliver(items)
+
+        with self.session_factory() as db:
+            result = self.record(db, deliveries)
+
+        logger.info(
+            "outbox batch: %d leased in %d requests, %d delivered, %d retrying, %d dead",
+            result.leased,
+            result.requests,
+            result.delivered,
+            result.retrying,
+            result.dead,
+        )
+        return result
+
+    def run(
+        self,
+        stop: Optional[threading.Event] = None,
+        poll_interval: Optional[float] = None,
+    ) -> None:
+        """
+        Dispatch until stop is set, sleeping only when the outbox is empty.
+
+        A database error (a dropped connection, a locked SQLite file)
+        is logged and the batch retried after a poll interval; rows it
+        leased are picked up again once their lease expires.
+        """
+        stop = stop or threading.Event()
+        interval = settings.OUTBOX_POLL_INTERVAL_SECONDS if poll_interval is None else poll_interval
+
+        while not stop.is_set():
+            try:
+                leased = self.run_once().leased
+            except SQLAlchemyError:
+                # run_once's session was rolled back as its block closed.
+                logger.error("outbox batch failed", exc_info=True)
+                stop.wait(interval)
+                continue
+            if not leased:
+                stop.wait(interval)
+
+    def close(self) -> None:
+        """Stop the delivery threads."""
+        self._pool.shutdown(wait=True)
+
+
+def main() -> None:
+    """Run an outbox worker against the configured database and CRM."""
+    # pylint: disable=import-outside-toplevel
+    from mn_ai_voice.app.core.logging import configure_logging
+    from mn_ai_voice.app.db.session import SessionLocal
+    from mn_ai_voice.app.tools.crm_tool import HTTPCRMClient
+
+    parser = argparse.ArgumentParser(description="CRM outbox dispatcher")
+    parser.add_argument("--once", action="store_true", help="dispatch one batch and exit")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    configure_logging()
+    client = HTTPCRMClient()
+    worker = OutboxWorker(
+        SessionLocal,
+        client,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+    )
+    try:
+        if args.once:
+            print(worker.run_once())
+        else:
+            worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.close()
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
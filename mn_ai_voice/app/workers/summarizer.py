@@ -5,18 +5,54 @@ Generates a call summary artifact at call end
 and enqueues a CRM note via the outbox.
 
 This worker is idempotent and safe to retry.
+
+run() summarizes one call. run_batch() catches up on every ended call
+without a summary: it pages through calls by call_id, prefetches the
+page's leads, snapshots and existing outbox keys with one query each,
+and bulk-inserts artifacts and outbox rows in one transaction per
+page. Inserts skip rows another summarizer (e.g. in another process)
+wrote meanwhile, so concurrent catch-ups neither duplicate summaries
+nor fail on the outbox idempotency key. Run it with:
+    python -m mn_ai_voice.app.workers.summarizer --page-size 1000
 """
 
+import argparse
+import logging
+from typing import Optional, cast
+
+from sqlalchemy import Table, exists, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
 
+from mn_ai_voice.app.core.metrics import CALLS_SUMMARIZED
+from mn_ai_voice.app.db.analytics import AnalyticsDeltas
 from mn_ai_voice.app.db.models import (
     Call,
     Lead,
     LeadSnapshot,
     Artifact,
     CRMOutbox,
+    TurnRecord,
 )
 
+logger = logging.getLogger(__name__)
+
+ARTIFACTS = cast(Table, Artifact.__table__)
+OUTBOX = cast(Table, CRMOutbox.__table__)
+
+
+def note_key(call_id: str) -> str:
+    """Outbox idempotency key of a call's CRM note."""
+    return f"crm_note:{call_id}"
+
+
+def insert_new(dialect: str, table: Table, unique: list[str]) -> Insert:
+    """INSERT rows, skipping those that conflict on the unique columns."""
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return insert(table).on_conflict_do_nothing(index_elements=unique)
+
 
 class CallSummarizer:
     """Generates summary artifacts and CRM notes for completed calls."""
@@ -30,7 +66,8 @@ class CallSummarizer:
         - CRM outbox entry is protected by idempotency key
         """
 
-        call = db.get(Call, call_id)
+        # Row lock: concurrent summarizers of one call run one at a time.
+        call = db.get(Call, call_id, with_for_update=True)
         if call is None or call.ended_at is None:
             # Only summarize completed calls
             return
@@ -62,8 +99,12 @@ class CallSummarizer:
             )
             db.add(artifact)
 
+            deltas = AnalyticsDeltas()
+            deltas.summarized(self._turn_counts(db, [call_id]).get(call_id, 0))
+            deltas.apply(db)
+
         # 2 Enqueue CRM note (idempotent)
-        idempotency_key = f"crm_note:{call_id}"
+        idempotency_key = note_key(call_id)
 
         existing_outbox = (
             db.query(CRMOutbox)
@@ -72,19 +113,121 @@ class CallSummarizer:
         )
 
         if existing_outbox is None:
-            db.add(
-                CRMOutbox(
-                    call_id=call_id,
-                    action="append_note",
-                    payload={
-                        "lead_phone": lead.primary_phone,
-                        "summary": self._build_summary_payload(snapshot),
-                    },
-                    idempotency_key=idempotency_key,
+            db.add(CRMOutbox(**self._note_row(call, lead, snapshot)))
+
+        try:
+            db.commit()
+        except IntegrityError:
+            # A batch catch-up summarized the call meanwhile.
+            db.rollback()
+            return
+        if existing_artifact is None:
+            CALLS_SUMMARIZED.labels("single").inc()
+
+    def run_batch(self, db: Session, page_size: int = 1000) -> int:
+        """
+        Summarize every ended call that has no summary artifact yet.
+
+        Calls whose lead or snapshot is missing are skipped, as in run().
+
+        Args:
+            db: Session; committed once per page.
+            page_size: Calls per page (and per transaction).
+
+        Returns:
+            Number of calls summarized.
+        """
+        summarized = 0
+        after: Optional[str] = None
+
+        while True:
+            calls = self._unsummarized_page(db, after, page_size)
+            if not calls:
+                return summarized
+            after = str(calls[-1].call_id)
+
+            count = self._summarize_page(db, calls)
+            db.commit()
+            CALLS_SUMMARIZED.labels("batch").inc(count)
+            summarized += count
+            # Drop the page's objects so memory stays flat across pages.
+            db.expunge_all()
+
+    def _unsummarized_page(
+        self, db: Session, after: Optional[str], page_size: int
+    ) -> list[Call]:
+        has_summary = exists().where(
+            Artifact.call_id == Call.call_id,
+            Artifact.type == "summary",
+        )
+        query = (
+            select(Call)
+            .where(Call.ended_at.is_not(None), ~has_summary)
+            .order_by(Call.call_id)
+            .limit(page_size)
+        )
+        if after is not None:
+            query = query.where(Call.call_id > after)
+        return list(db.scalars(query))
+
+    def _summarize_page(self, db: Session, calls: list[Call]) -> int:
+        lead_ids = {call.lead_id for call in calls if call.lead_id is not None}
+        leads = {
+            lead.lead_id: lead
+            for lead in db.scalars(select(Lead).where(Lead.lead_id.in_(lead_ids)))
+        }
+        snapshots = {
+            snapshot.lead_id: snapshot
+            for snapshot in db.scalars(
+                select(LeadSnapshot).where(LeadSnapshot.lead_id.in_(lead_ids))
+            )
+        }
+        queued = set(
+            db.scalars(
+                select(CRMOutbox.idempotency_key).where(
+                    CRMOutbox.idempotency_key.in_([note_key(str(c.call_id)) for c in calls])
+                )
+            )
+        )
+
+        artifacts = []
+        notes = []
+        for call in calls:
+            lead = leads.get(call.lead_id)
+            snapshot = snapshots.get(call.lead_id)
+            if lead is None or snapshot is None:
+                continue
+
+            artifacts.append(
+                {
+                    "call_id": call.call_id,
+                    "type": "summary",
+                    "content_text": self._build_summary_text(lead=lead, snapshot=snapshot),
+                }
+            )
+            if note_key(str(call.call_id)) not in queued:
+                notes.append(self._note_row(call, lead, snapshot))
+
+        dialect = db.get_bind().dialect.name
+        summarized: list[str] = []
+        if artifacts:
+            summarized = list(
+                db.scalars(
+                    insert_new(dialect, ARTIFACTS, ["call_id", "type"]).returning(
+                        ARTIFACTS.c.call_id
+                    ),
+                    artifacts,
                 )
             )
 
-        db.commit()
+            deltas = AnalyticsDeltas()
+            turns = self._turn_counts(db, summarized)
+            for call_id in summarized:
+                deltas.summarized(turns.get(call_id, 0))
+            deltas.apply(db)
+        if notes:
+            db.execute(insert_new(dialect, OUTBOX, ["idempotency_key"]), notes)
+        return len(summarized)
 
     # ------------------------------------------------------------------
     # Helpers
@@ -113,6 +256,30 @@ class CallSummarizer:
 
         return "\n".join(lines)
 
+    def _turn_counts(self, db: Session, call_ids: list[str]) -> dict[str, int]:
+        """Processed turns per call (primary-key range reads on turn_records)."""
+
+        rows = db.execute(
+            select(TurnRecord.call_id, func.count())
+            .where(TurnRecord.call_id.in_(call_ids))
+            .group_by(TurnRecord.call_id)
+        )
+        return {call_id: count for call_id, count in rows}
+
+    def _note_row(self, call: Call, lead: Lead, snapshot: LeadSnapshot) -> dict:
+        """Column values of the call's append_note outbox row."""
+
+        return {
+            "call_id": call.call_id,
+            "lead_id": call.lead_id,
+            "action": "append_note",
+            "payload_json": {
+                "lead_phone": lead.primary_phone,
+                "summary": self._build_summary_payload(snapshot),
+            },
+            "idempotency_key": note_key(str(call.call_id)),
+        }
+
     def _build_summary_payload(self, snapshot: LeadSnapshot) -> dict:
         """Generate structured summary payload for CRM."""
 
@@ -125,3 +292,23 @@ class CallSummarizer:
             "qualification_reasons": snapshot.qualification_reasons,
             "email": snapshot.email,
         }
+
+
+def main() -> None:
+    """Summarize all ended calls that have no summary yet."""
+    # pylint: disable=import-outside-toplevel
+    from mn_ai_voice.app.core.logging import configure_logging
+    from mn_ai_voice.app.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Batch call summarizer")
+    parser.add_argument("--page-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    configure_logging()
+    with SessionLocal() as db:
+        count = CallSummarizer().run_batch(db, page_size=args.page_size)
+    logger.info("summarized %d calls", count)
+
+
+if __name__ == "__main__":
+    main()
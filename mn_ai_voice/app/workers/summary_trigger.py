@@ -0,0 +1,185 @@
+"""
+Event-driven call summarization.
+
+POST /calls/{call_id}/end commits CALL_ENDED and wakes the summarizer
+through a notification channel; nothing polls the calls table.
+
+- Postgres: the end-call transaction issues NOTIFY call_ended, and the
+  API process LISTENs on a dedicated asyncpg connection. NOTIFY is
+  delivered on commit, so only committed calls are announced.
+- SQLite (single process): the call id is put on an in-process queue
+  after commit.
+
+Both paths feed one asyncio.Queue, drained by a task that runs
+CallSummarizer.run in a worker thread. Notifications are not durable,
+so on start the trigger first runs CallSummarizer.run_batch to pick up
+calls that ended while no listener was running. If the LISTEN
+connection drops (e.g. a database restart or failover), it is
+reopened with backoff and followed by another catch-up. Catch-ups
+go through the same queue, so within a process they never overlap a
+summarization; across processes the summarizer skips conflicting
+inserts.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.logging import log_context
+from mn_ai_voice.app.db.session import SessionLocal
+from mn_ai_voice.app.workers.summarizer import CallSummarizer
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "call_ended"
+
+# Queued instead of a call_id: summarize every ended call without a summary
+CATCH_UP = None
+
+
+class SummaryTrigger:
+    """Summarizes calls as they end."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        database_url: str,
+        summarizer: Optional[CallSummarizer] = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.database_url = database_url
+        self.summarizer = summarizer or CallSummarizer()
+        self._queue: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._listener: Any = None  # asyncpg connection
+        self._reconnecting: Optional[asyncio.Task] = None
+
+    @property
+    def uses_notify(self) -> bool:
+        """True if ended calls are announced with Postgres NOTIFY."""
+        return make_url(self.database_url).get_backend_name() == "postgresql"
+
+    # ---------- Producer (end-call request) ----------
+
+    async def call_ended(self, db: AsyncSession, call_id: str) -> None:
+        """Announce an ended call. Call inside the end-call transaction."""
+        if self.uses_notify:
+            await db.execute(select(func.pg_notify(CHANNEL, call_id)))
+
+    def committed(self, call_id: str) -> None:
+        """Queue an ended call locally once its transaction has committed."""
+        if not self.uses_notify and self._task is not None:
+            self._queue.put_nowait(call_id)
+
+    # ---------- Consumer ----------
+
+    async def start(self) -> None:
+        """Start listening and summarizing. Call from the event loop."""
+        if self._task is not None:
+            return
+
+        # A queue belongs to the loop it is first used on; make one per start.
+        self._queue = asyncio.Queue()
+        if self.uses_notify:
+            await self._listen()
+
+        self._queue.put_nowait(CATCH_UP)
+        self._task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Stop the consumer task and close the listener connection."""
+        if self._reconnecting is not None:
+            self._reconnecting.cancel()
+            try:
+                await self._reconnecting
+            except asyncio.CancelledError:
+                pass
+            self._reconnecting = None
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            await listener.close()
+
+    async def join(self) -> None:
+        """Wait until every queued call has been summarized."""
+        await self._queue.join()
+
+    async def _listen(self) -> None:
+        """Open the LISTEN connection, watching it for termination."""
+        # pylint: disable=import-outside-toplevel
+        import asyncpg  # type: ignore[import-untyped]
+
+        dsn = make_url(self.database_url).set(drivername="postgresql")
+        connection = await asyncpg.connect(dsn.render_as_string(hide_password=False))
+        await connection.add_listener(CHANNEL, self._on_notify)
+        connection.add_termination_listener(self._on_terminated)
+        self._listener = connection
+
+    def _on_notify(self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:
+        self._queue.put_nowait(payload)
+
+    def _on_terminated(self, connection: Any) -> None:
+        """Reconnect unless the connection was closed by stop()."""
+        if connection is not self._listener or self._task is None:
+            return
+        self._listener = None
+        logger.warning("summary listener connection lost; reconnecting")
+        self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Reopen the LISTEN connection with backoff, then catch up."""
+        delay = settings.SUMMARY_LISTEN_RETRY_SECONDS
+        while True:
+            try:
+                await self._listen()
+                break
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.warning("summary listener reconnect failed", exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, settings.SUMMARY_LISTEN_RETRY_MAX_SECONDS)
+
+        # Calls that ended while disconnected were announced to nobody.
+        logger.info("summary listener reconnected")
+        self._queue.put_nowait(CATCH_UP)
+        self._reconnecting = None
+
+    async def _consume(self) -> None:
+        while True:
+            call_id = await self._queue.get()
+            try:
+                if call_id is CATCH_UP:
+                    count = await asyncio.to_thread(self._catch_up)
+                    if count:
+                        logger.info("summarized %d calls that ended unannounced", count)
+                else:
+                    await asyncio.to_thread(self._summarize, call_id)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # The next catch-up (on start or reconnect) retries it.
+                logger.exception("summarizing %s failed", call_id or "ended calls")
+            finally:
+                self._queue.task_done()
+
+    def _catch_up(self) -> int:
+        with self.session_factory() as db:
+            return self.summarizer.run_batch(db)
+
+    def _summarize(self, call_id: str) -> None:
+        with log_context(call_id=call_id), self.session_factory() as db:
+            self.summarizer.run(db, call_id)
+
+
+summary_trigger = SummaryTrigger(SessionLocal, settings.DATABASE_URL)
@@ -0,0 +1,167 @@
+"""
+Extractor benchmark: single-pass ExtractionEngine vs. per-class extractors.
+
+Runs a realistic utterance mix through both paths, checks that they
+agree on every field, and reports mean microseconds per utterance.
+The per-class path runs all five extractors, each rescanning the text,
+with region tokens compiled into fresh word-boundary regexes on every
+call. That is what extracting every field used to cost; it is not what
+a turn runs.
+
+The turn path is timed separately: QualificationSkill.apply, which
+extracts only the budget (and the email in ASK_EMAIL), against the
+per-class apply it replaced, over the same utterances and a mix of
+states.
+
+Usage:
+    python -m mn_ai_voice.benchmarks.bench_extractors
+    python -m mn_ai_voice.benchmarks.bench_extractors --utterances 20000
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+
+from mn_ai_voice.app.core.constants import CallState
+from mn_ai_voice.app.db.models import LeadSnapshot
+from mn_ai_voice.app.engine.extractors import (
+    BudgetExtractor,
+    EmailExtractor,
+    Extraction,
+    ExtractionEngine,
+    LanguageExtractor,
+    RegionExtractor,
+    TimelineExtractor,
+)
+from mn_ai_voice.app.skills.qualification_skill import QualificationSkill
+
+SAMPLES = [
+    "English please",
+    "hindi mein baat karte hain",
+    "I am in Bangalore, Karnataka",
+    "we live in pune near the bank",
+    "Gurgaon, Delhi NCR",
+    "around 8 lakhs is fine",
+    "budget is 5.5 lakh max",
+    "maybe in 2-3 months, not now",
+    "next year probably",
+    "my email is priya.sharma92@example.com",
+    "it's a 12 by 10 room for my son",
+    "can you tell me the price and warranty?",
+]
+
+
+class PerClassExtraction:  # pylint: disable=too-few-public-methods
+    """The five extractor classes applied one after another."""
+
+    def __init__(self) -> None:
+        self.language = LanguageExtractor()
+        self.region = RegionExtractor()
+        self.timeline = TimelineExtractor()
+        self.budget = BudgetExtractor()
+        self.email = EmailExtractor()
+
+    def extract(self, text: str) -> Extraction:
+        """Extract all fields, one extractor at a time."""
+        return Extraction(
+            language=self.language.extract(text),
+            region=self.region.extract(text),
+            timeline=self.timeline.extract(text),
+            budget_band=self.budget.extract(text),
+            email=self.email.extract(text),
+        )
+
+
+class PerClassQualification:  # pylint: disable=too-few-public-methods
+    """QualificationSkill.apply's extraction before ExtractionEngine."""
+
+    def __init__(self) -> None:
+        self.budget = BudgetExtractor()
+        self.email = EmailExtractor()
+
+    def apply(self, state: CallState, text: str, snapshot: LeadSnapshot) -> LeadSnapshot:
+        """Budget always, email only in ASK_EMAIL."""
+        budget_band = self.budget.extract(text)
+        if budget_band and budget_band != "unknown":
+            snapshot.budget_band = budget_band  # type: ignore[assignment]
+        if state == CallState.ASK_EMAIL:
+            email = self.email.extract(text)
+            if email:
+                snapshot.email = email  # type: ignore[assignment]
+        return snapshot
+
+
+# States a turn's text is applied in, as a call moves through them
+# (QUALIFY is left out: both sides would run the same rules after it)
+TURN_STATES = [
+    CallState.ASK_LANGUAGE,
+    CallState.ASK_CITY_OR_REGION,
+    CallState.ASK_BUDGET,
+    CallState.ASK_TIMELINE,
+    CallState.ASK_EMAIL,
+]
+
+
+def utterances(n: int, rng: random.Random) -> list[str]:
+    """Single samples and a few run-on utterances joining several."""
+    out = []
+    for i in range(n):
+        k = 3 if i % 4 == 0 else 1
+        out.append(", ".join(rng.choice(SAMPLES) for _ in range(k)))
+    return out
+
+
+def time_per_call(fn, texts: list[str]) -> float:
+    """Mean microseconds per call over texts."""
+    t0 = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - t0) / len(texts) * 1e6
+
+
+def time_apply(apply, texts: list[str]) -> float:
+    """Mean microseconds per apply() over texts, cycling through TURN_STATES."""
+    snapshot = LeadSnapshot(lead_id="l_bench")
+    states = list(itertools.islice(itertools.cycle(TURN_STATES), len(texts)))
+    t0 = time.perf_counter()
+    for state, text in zip(states, texts):
+        apply(state, text, snapshot)
+    return (time.perf_counter() - t0) / len(texts) * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print a JSON report."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--utterances", type=int, default=5_000)
+    args = parser.parse_args()
+
+    texts = utterances(args.utterances, random.Random(7))
+
+    t0 = time.perf_counter()
+    engine = ExtractionEngine()
+    build_ms = (time.perf_counter() - t0) * 1000
+    per_class = PerClassExtraction()
+
+    mismatches = sum(engine.extract(t) != per_class.extract(t) for t in texts)
+
+    report = {
+        "utterances": len(texts),
+        "mismatches": mismatches,
+        "engine_build_ms": round(build_ms, 2),
+        "engine_us": round(time_per_call(engine.extract, texts), 1),
+        "per_class_us": round(time_per_call(per_class.extract, texts), 1),
+    }
+    report["speedup"] = round(report["per_class_us"] / report["engine_us"], 1)
+
+    report["apply_us"] = round(time_apply(QualificationSkill().apply, texts), 2)
+    report["apply_per_class_us"] = round(time_apply(PerClassQualification().apply, texts), 2)
+    report["apply_speedup"] = round(report["apply_per_class_us"] / report["apply_us"], 2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
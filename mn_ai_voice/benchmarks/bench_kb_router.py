@@ -0,0 +1,94 @@
+"""
+KB router benchmark: compiled automaton vs. linear keyword scan.
+
+Builds synthetic knowledge bases of increasing size and measures build
+time and per-utterance routing latency for KBIndex and for the previous
+approach (lowercase every keyword and test `in` for each, per call).
+
+Usage:
+    python -m mn_ai_voice.benchmarks.bench_kb_router
+    python -m mn_ai_voice.benchmarks.bench_kb_router --sizes 10 1000 50000
+"""
+
+import argparse
+import json
+import random
+import string
+import time
+
+from mn_ai_voice.app.engine.kb_router import KBIndex
+
+
+def linear_route(faq: dict, text: str):
+    """The pre-automaton routing loop."""
+    normalized = text.lower()
+    for keyword, answer in faq.items():
+        if keyword.lower() in normalized:
+            return answer
+    return None
+
+
+def synthetic_faq(size: int, rng: random.Random) -> dict:
+    """A knowledge base of `size` random two-word keywords."""
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+    return {f"{word()} {word()}": f"answer {i}" for i in range(size)}
+
+
+def utterances(faq: dict, n: int, rng: random.Random) -> list[str]:
+    """Realistic-length utterances; a third mention a KB keyword."""
+    keywords = list(faq)
+    filler = "hi i wanted to ask about the kids room design for my daughter"
+    out = []
+    for i in range(n):
+        if i % 3 == 0:
+            out.append(f"{filler} and also {rng.choice(keywords)} please")
+        else:
+            out.append(filler)
+    return out
+
+
+def time_per_call(fn, texts: list[str]) -> float:
+    """Mean microseconds per call over texts."""
+    t0 = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - t0) / len(texts) * 1e6
+
+
+def main() -> None:
+    """Run the benchmark for each KB size and print a JSON report."""
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 100, 1_000, 10_000, 50_000]
+    )
+    parser.add_argument("--utterances", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    report = []
+    for size in args.sizes:
+        faq = synthetic_faq(size, rng)
+        texts = utterances(faq, args.utterances, rng)
+
+        t0 = time.perf_counter()
+        index = KBIndex({"faq": faq})
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        report.append(
+            {
+                "kb_entries": size,
+                "automaton_states": len(index.matcher),
+                "build_ms": round(build_ms, 1),
+                "automaton_us": round(time_per_call(index.route, texts), 1),
+                "linear_us": round(time_per_call(lambda t: linear_route(faq, t), texts), 1),
+            }
+        )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
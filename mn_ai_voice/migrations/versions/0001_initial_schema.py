@@ -0,0 +1,123 @@
+"""Initial schema.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "leads",
+        sa.Column("lead_id", sa.String(), nullable=False),
+        sa.Column("primary_phone", sa.String(), nullable=False),
+        sa.Column("primary_email", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("lead_id"),
+        sa.UniqueConstraint("primary_phone"),
+    )
+    op.create_table(
+        "calls",
+        sa.Column("call_id", sa.String(), nullable=False),
+        sa.Column("lead_id", sa.String(), nullable=True),
+        sa.Column("from_phone", sa.String(), nullable=True),
+        sa.Column("direction", sa.String(), nullable=False),
+        sa.Column("language_pref", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("current_state", sa.String(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("ended_at", sa.DateTime(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["lead_id"], ["leads.lead_id"]),
+        sa.PrimaryKeyConstraint("call_id"),
+    )
+    op.create_table(
+        "events",
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("call_id", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=True),
+        sa.Column("payload_json", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["call_id"], ["calls.call_id"]),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    op.create_table(
+        "turn_records",
+        sa.Column("call_id", sa.String(), nullable=False),
+        sa.Column("turn_id", sa.String(), nullable=False),
+        sa.Column("reply_text", sa.String(), nullable=False),
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["call_id"], ["calls.call_id"]),
+        sa.PrimaryKeyConstraint("call_id", "turn_id"),
+    )
+    op.create_table(
+        "lead_snapshot",
+        sa.Column("lead_id", sa.String(), nullable=False),
+        sa.Column("language", sa.String(), nullable=True),
+        sa.Column("city_text", sa.String(), nullable=True),
+        sa.Column("region_value", sa.String(), nullable=True),
+        sa.Column("region_confirmed", sa.Boolean(), nullable=True),
+        sa.Column("budget_band", sa.String(), nullable=True),
+        sa.Column("timeline_bucket", sa.String(), nullable=True),
+        sa.Column("room_size_text", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("qualification_status", sa.String(), nullable=True),
+        sa.Column("qualification_reasons", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["lead_id"], ["leads.lead_id"]),
+        sa.PrimaryKeyConstraint("lead_id"),
+    )
+    op.create_table(
+        "artifacts",
+        sa.Column("artifact_id", sa.Integer(), nullable=False),
+        sa.Column("call_id", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=True),
+        sa.Column("content_text", sa.String(), nullable=True),
+        sa.Column("content_json", sa.JSON(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["call_id"], ["calls.call_id"]),
+        sa.PrimaryKeyConstraint("artifact_id"),
+    )
+    op.create_table(
+        "crm_outbox",
+        sa.Column("outbox_id", sa.Integer(), nullable=False),
+        sa.Column("call_id", sa.String(), nullable=False),
+        sa.Column("action", sa.String(), nullable=True),
+        sa.Column("payload_json", sa.JSON(), nullable=True),
+        sa.Column("idempotency_key", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["call_id"], ["calls.call_id"]),
+        sa.PrimaryKeyConstraint("outbox_id"),
+        sa.UniqueConstraint("idempotency_key"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("crm_outbox")
+    op.drop_table("artifacts")
+    op.drop_table("lead_snapshot")
+    op.drop_table("turn_records")
+    op.drop_table("events")
+    op.drop_table("calls")
+    op.drop_table("leads")
@@ -0,0 +1,48 @@
+"""Composite indexes for event ledger access paths.
+
+- (call_id, event_id): ordered per-call reads (transcript reconstruction)
+- (call_id, type, event_id): per-call reads filtered by event type
+  (summaries, turn counts); also covers plain call_id lookups
+- (type, created_at): time-range scans by type (e.g. recently ended calls)
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_events_call_id_event_id",
+        "events",
+        ["call_id", "event_id"],
+    )
+    op.create_index(
+        "ix_events_call_id_type_event_id",
+        "events",
+        ["call_id", "type", "event_id"],
+    )
+    op.create_index(
+        "ix_events_type_created_at",
+        "events",
+        ["type", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_events_type_created_at", table_name="events")
+    op.drop_index("ix_events_call_id_type_event_id", table_name="events")
+    op.drop_index("ix_events_call_id_event_id", table_name="events")
@@ -0,0 +1,30 @@
+"""Index events.created_at for ledger partition scans.
+
+The archiver selects and deletes whole day/month partitions by
+created_at range.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_events_created_at", "events", ["created_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_events_created_at", table_name="events")
@@ -0,0 +1,41 @@
+"""Lease columns and scan index for the CRM outbox dispatcher.
+
+- locked_by / locked_until: worker lease on a row
+- (status, outbox_id): oldest pending rows first
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("crm_outbox") as batch_op:
+        batch_op.add_column(sa.Column("locked_by", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("locked_until", sa.DateTime(), nullable=True))
+    op.create_index(
+        "ix_crm_outbox_status_outbox_id",
+        "crm_outbox",
+        ["status", "outbox_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_crm_outbox_status_outbox_id", table_name="crm_outbox")
+    with op.batch_alter_table("crm_outbox") as batch_op:
+        batch_op.drop_column("locked_until")
+        batch_op.drop_column("locked_by")
@@ -0,0 +1,62 @@
+"""Retry schedule for the CRM outbox.
+
+- next_attempt_at: when a pending row is next due (backfilled from
+  created_at); also moved forward by worker leases
+- (status, next_attempt_at) replaces (status, outbox_id) for lease scans
+- rows previously marked failed become dead (dead-letter state)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "crm_outbox",
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=True),
+    )
+    op.execute(
+        "UPDATE crm_outbox "
+        "SET next_attempt_at = COALESCE(created_at, CURRENT_TIMESTAMP)"
+    )
+    op.execute("UPDATE crm_outbox SET status = 'dead' WHERE status = 'failed'")
+    with op.batch_alter_table("crm_outbox") as batch_op:
+        batch_op.alter_column(
+            "next_attempt_at",
+            existing_type=sa.DateTime(),
+            nullable=False,
+        )
+
+    op.drop_index("ix_crm_outbox_status_outbox_id", table_name="crm_outbox")
+    op.create_index(
+        "ix_crm_outbox_status_next_attempt_at",
+        "crm_outbox",
+        ["status", "next_attempt_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_crm_outbox_status_next_attempt_at", table_name="crm_outbox")
+    op.create_index(
+        "ix_crm_outbox_status_outbox_id",
+        "crm_outbox",
+        ["status", "outbox_id"],
+    )
+    op.execute("UPDATE crm_outbox SET status = 'failed' WHERE status = 'dead'")
+    with op.batch_alter_table("crm_outbox") as batch_op:
+        batch_op.drop_column("next_attempt_at")
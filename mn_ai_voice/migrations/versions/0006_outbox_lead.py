@@ -0,0 +1,50 @@
+"""Lead column on the CRM outbox for per-lead coalescing.
+
+- lead_id: lead the action belongs to (backfilled from calls)
+- (lead_id, status): pending rows for a lead
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("crm_outbox") as batch_op:
+        batch_op.add_column(sa.Column("lead_id", sa.String(), nullable=True))
+        batch_op.create_foreign_key(
+            "fk_crm_outbox_lead_id_leads",
+            "leads",
+            ["lead_id"],
+            ["lead_id"],
+        )
+    op.execute(
+        "UPDATE crm_outbox SET lead_id = "
+        "(SELECT calls.lead_id FROM calls WHERE calls.call_id = crm_outbox.call_id)"
+    )
+    op.create_index(
+        "ix_crm_outbox_lead_id_status",
+        "crm_outbox",
+        ["lead_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_crm_outbox_lead_id_status", table_name="crm_outbox")
+    with op.batch_alter_table("crm_outbox") as batch_op:
+        batch_op.drop_constraint("fk_crm_outbox_lead_id_leads", type_="foreignkey")
+        batch_op.drop_column("lead_id")
@@ -0,0 +1,33 @@
+"""Index artifacts by call and type.
+
+- (call_id, type): the summarizer's "already summarized?" check
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_artifacts_call_id_type",
+        "artifacts",
+        ["call_id", "type"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_artifacts_call_id_type", table_name="artifacts")
@@ -0,0 +1,58 @@
+"""Analytics aggregate tables.
+
+- funnel_stats: per-state entered / in_progress / ended counters
+- qualification_stats: leads by qualification status, region, budget band
+- turn_stats: turns-per-call histogram of summarized calls
+
+Run the rebuild once after upgrading to fill them from existing data:
+    python -m mn_ai_voice.app.workers.analytics_rebuild
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "funnel_stats",
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("entered", sa.Integer(), nullable=False),
+        sa.Column("in_progress", sa.Integer(), nullable=False),
+        sa.Column("ended", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("state"),
+    )
+    op.create_table(
+        "qualification_stats",
+        sa.Column("qualification_status", sa.String(), nullable=False),
+        sa.Column("region_value", sa.String(), nullable=False),
+        sa.Column("budget_band", sa.String(), nullable=False),
+        sa.Column("leads", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("qualification_status", "region_value", "budget_band"),
+    )
+    op.create_table(
+        "turn_stats",
+        sa.Column("turns", sa.Integer(), nullable=False),
+        sa.Column("calls", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("turns"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("turn_stats")
+    op.drop_table("qualification_stats")
+    op.drop_table("funnel_stats")
@@ -0,0 +1,32 @@
+"""Conversation flow per call.
+
+- flow: name of the call's flow (engine/flows.py); NULL is the default
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.add_column(sa.Column("flow", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("calls") as batch_op:
+        batch_op.drop_column("flow")
@@ -0,0 +1,139 @@
+"""Normalize lead phones to E.164, merging leads that share a number.
+
+start_call looks leads up by the E.164 form of the caller's number
+(engine/phone.py); leads stored under other formats would otherwise
+get a duplicate on the caller's next call.
+
+- leads.primary_phone: rewritten to E.164 (numbers that do not parse
+  are left as stored)
+- leads sharing a normalized number: merged into the earliest created
+  one; their calls and CRM outbox rows move to it, the most recently
+  updated snapshot is kept, and qualification_stats drops the others
+
+Data only; the merge cannot be undone, so downgrade is a no-op.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from mn_ai_voice.app.engine.phone import normalize_phone
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, Sequence[str], None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+leads = sa.table(
+    "leads",
+    sa.column("lead_id", sa.String),
+    sa.column("primary_phone", sa.String),
+    sa.column("primary_email", sa.String),
+    sa.column("created_at", sa.DateTime),
+)
+snapshots = sa.table(
+    "lead_snapshot",
+    sa.column("lead_id", sa.String),
+    sa.column("qualification_status", sa.String),
+    sa.column("region_value", sa.String),
+    sa.column("budget_band", sa.String),
+    sa.column("updated_at", sa.DateTime),
+)
+qualification_stats = sa.table(
+    "qualification_stats",
+    sa.column("qualification_status", sa.String),
+    sa.column("region_value", sa.String),
+    sa.column("budget_band", sa.String),
+    sa.column("leads", sa.Integer),
+)
+# Tables pointing at leads.lead_id
+REFERENCES = [
+    sa.table("calls", sa.column("lead_id", sa.String)),
+    sa.table("crm_outbox", sa.column("lead_id", sa.String)),
+]
+
+
+def upgrade() -> None:
+    """Upgrade data."""
+    bind = op.get_bind()
+
+    groups = defaultdict(list)
+    rows = bind.execute(
+        sa.select(leads.c.lead_id, leads.c.primary_phone, leads.c.primary_email)
+        .order_by(leads.c.created_at, leads.c.lead_id)
+    )
+    for lead_id, phone, email in rows:
+        try:
+            groups[normalize_phone(phone)].append((lead_id, phone, email))
+        except ValueError:
+            continue
+
+    for phone, members in groups.items():
+        survivor, stored, email = members[0]
+        duplicates = [lead_id for lead_id, _, _ in members[1:]]
+        if duplicates:
+            _merge(bind, survivor, duplicates)
+            email = email or next((e for _, _, e in members[1:] if e), None)
+
+        if duplicates or stored != phone:
+            bind.execute(
+                leads.update()
+                .where(leads.c.lead_id == survivor)
+                .values(primary_phone=phone, primary_email=email)
+            )
+
+
+def _merge(bind: sa.Connection, survivor: str, duplicates: list[str]) -> None:
+    """Move everything of duplicates to survivor, then delete them."""
+    group = [survivor, *duplicates]
+    found = bind.execute(
+        sa.select(
+            snapshots.c.lead_id,
+            snapshots.c.updated_at,
+            snapshots.c.qualification_status,
+            snapshots.c.region_value,
+            snapshots.c.budget_band,
+        ).where(snapshots.c.lead_id.in_(group))
+    ).all()
+
+    if found:
+        keep = max(found, key=lambda row: row.updated_at or datetime.min)
+        for row in found:
+            if row is keep:
+                continue
+            bind.execute(snapshots.delete().where(snapshots.c.lead_id == row.lead_id))
+            bind.execute(
+                qualification_stats.update()
+                .where(
+                    qualification_stats.c.qualification_status
+                    == (row.qualification_status or "unknown"),
+                    qualification_stats.c.region_value == (row.region_value or "unknown"),
+                    qualification_stats.c.budget_band == (row.budget_band or "unknown"),
+                )
+                .values(leads=qualification_stats.c.leads - 1)
+            )
+        if keep.lead_id != survivor:
+            bind.execute(
+                snapshots.update()
+                .where(snapshots.c.lead_id == keep.lead_id)
+                .values(lead_id=survivor)
+            )
+
+    for table in REFERENCES:
+        bind.execute(
+            table.update().where(table.c.lead_id.in_(duplicates)).values(lead_id=survivor)
+        )
+    bind.execute(leads.delete().where(leads.c.lead_id.in_(duplicates)))
+
+
+def downgrade() -> None:
+    """Downgrade data (nothing to do: merged leads cannot be split)."""
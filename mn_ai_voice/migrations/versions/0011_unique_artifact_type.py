@@ -0,0 +1,47 @@
+"""One artifact of each type per call.
+
+- (call_id, type): unique, so concurrent summarizers skip conflicting
+  inserts instead of writing duplicate summaries; duplicates already
+  present are dropped, keeping the first (turn_stats may have counted
+  them twice; workers/analytics_rebuild.py recomputes it)
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, Sequence[str], None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "DELETE FROM artifacts WHERE artifact_id NOT IN "
+        "(SELECT MIN(artifact_id) FROM artifacts GROUP BY call_id, type)"
+    )
+    op.drop_index("ix_artifacts_call_id_type", table_name="artifacts")
+    op.create_index(
+        "ix_artifacts_call_id_type",
+        "artifacts",
+        ["call_id", "type"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_artifacts_call_id_type", table_name="artifacts")
+    op.create_index(
+        "ix_artifacts_call_id_type",
+        "artifacts",
+        ["call_id", "type"],
+    )
@@ -0,0 +1,60 @@
+"""
+Tests for the incrementally maintained analytics aggregates.
+"""
+
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from mn_ai_voice.app.db.analytics import TURNS_CAP, AnalyticsDeltas
+from mn_ai_voice.app.db.models import Base, FunnelStat, QualificationStat, TurnStat
+
+
+def test_deltas_accumulate_across_transactions():
+    """Applied deltas add to existing counters; net-zero changes are skipped."""
+
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)  # pylint: disable=invalid-name
+
+    start = AnalyticsDeltas()
+    start.enter("ASK_LANGUAGE")
+    start.requalify(None, ("unknown", "unknown", "unknown"))
+
+    turn = AnalyticsDeltas()
+    turn.transition("ASK_LANGUAGE", "ASK_TIMELINE")
+    turn.transition("ASK_TIMELINE", "ASK_TIMELINE")
+    turn.requalify(("unknown", "unknown", "unknown"), ("qualified", "NCR", "5-10L"))
+    turn.summarized(TURNS_CAP + 10)
+
+    with Session() as db:
+        start.apply(db)
+        start.apply(db)
+        turn.apply(db)
+        db.commit()
+
+        funnel = {row.state: (row.entered, row.in_progress, row.ended) for row in db.query(FunnelStat)}
+        buckets = {
+            (row.qualification_status, row.region_value, row.budget_band): row.leads
+            for row in db.query(QualificationStat)
+        }
+        turns = {row.turns: row.calls for row in db.query(TurnStat)}
+
+    assert funnel == {"ASK_LANGUAGE": (2, 1, 0), "ASK_TIMELINE": (1, 1, 0)}
+    assert buckets == {("unknown", "unknown", "unknown"): 1, ("qualified", "NCR", "5-10L"): 1}
+    assert turns == {TURNS_CAP: 1}
+
+
+def test_statements_are_postgres_upserts_in_key_order():
+    """Postgres gets ON CONFLICT upserts, ordered to keep lock order stable."""
+
+    deltas = AnalyticsDeltas()
+    deltas.end("QUALIFY")
+    deltas.enter("ASK_BUDGET")
+
+    stmts = deltas.statements("postgresql")
+    sql = [str(stmt.compile(dialect=postgresql.dialect())) for stmt in stmts]
+
+    assert len(sql) == 2
+    assert all("ON CONFLICT (state) DO UPDATE" in s for s in sql)
+    assert [stmt.compile().params["state"] for stmt in stmts] == ["ASK_BUDGET", "QUALIFY"]
@@ -0,0 +1,697 @@
+"""
+API tests for the call lifecycle routes.
+
+Runs the FastAPI app against a temporary SQLite database.
+"""
+
+# pylint: disable=redefined-outer-name,invalid-name
+
+import json
+import logging
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from mn_ai_voice.app.main import app
+from mn_ai_voice.app.api.dependencies import get_db
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.core.constants import CallState, EventType
+from mn_ai_voice.app.db.models import (
+    Artifact,
+    Base,
+    CRMOutbox,
+    Call,
+    Event,
+    Lead,
+    LeadSnapshot,
+    TurnRecord,
+)
+from mn_ai_voice.app.db.snapshot_cache import snapshot_cache
+from mn_ai_voice.app.engine.prompt_audio import audio_key, prompt_audio
+from mn_ai_voice.app.tools.tts_tool import StubTTSBackend
+from mn_ai_voice.app.workers.summary_trigger import summary_trigger
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    """SQLite database file with the schema created."""
+    path = tmp_path / "api.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    return path
+
+
+@pytest.fixture()
+def Session(db_path):
+    """Sync session factory for inspecting the database in tests."""
+    return sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))
+
+
+@pytest.fixture()
+def client(db_path, Session, monkeypatch):
+    """Test client with the DB, summarizer and prompt audio bound to tmp_path."""
+    AsyncSession = async_sessionmaker(
+        bind=create_async_engine(f"sqlite+aiosqlite:///{db_path}"),
+        expire_on_commit=False,
+    )
+
+    async def override_get_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    monkeypatch.setattr(summary_trigger, "session_factory", Session)
+    monkeypatch.setattr(summary_trigger, "database_url", f"sqlite:///{db_path}")
+    monkeypatch.setattr(prompt_audio, "directory", db_path.parent / "prompt_audio")
+    monkeypatch.setattr(prompt_audio, "backend", StubTTSBackend())
+    snapshot_cache.clear()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_start_call_returns_language_prompt(client):
+    """Starting a call returns a call id and the language prompt."""
+
+    res = client.post("/calls/start", params={"from_phone": "+919000000001"})
+
+    assert res.status_code == 200
+    body = res.json()
+    assert body["call_id"].startswith("c_")
+    assert "English" in body["next_prompt"]["text"]
+
+
+def test_prompts_carry_keys_to_pre_synthesized_audio(client):
+    """Static prompts come with an audio_key served from the audio cache."""
+
+    body = client.post("/calls/start", params={"from_phone": "+919000000013"}).json()
+    key = body["next_prompt"]["audio_key"]
+
+    res = client.get(f"/audio/{key}")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "audio/wav"
+    assert res.content[:4] == b"RIFF"
+    assert client.get("/audio/not-a-key").status_code == 404
+
+    turn = client.post(
+        f"/calls/{body['call_id']}/user_turn", json={"turn_id": "t1", "text": "English"}
+    ).json()
+    assert turn["assistant"]["audio_key"] is not None
+
+
+def test_prompt_audio_follows_the_callers_language(client, Session):
+    """Once the caller picks a language, prompts carry audio in it."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000014"}
+    ).json()["call_id"]
+    hindi = client.post(
+        f"/calls/{call_id}/user_turn", json={"turn_id": "t1", "text": "Hindi"}
+    ).json()["assistant"]
+
+    assert hindi["audio_key"] == audio_key(hindi["text"], "hi-IN", prompt_audio.voice)
+    assert client.get(f"/audio/{hindi['audio_key']}").status_code == 200
+    with Session() as db:
+        lead_id = db.get(Call, call_id).lead_id
+        assert db.get(LeadSnapshot, lead_id).language == "hindi"
+
+
+def test_start_call_normalizes_phone_to_one_lead(client, Session):
+    """Formats of one number resolve to a single lead and snapshot."""
+
+    for number in ("+91 98765 43210", "098765-43210", "9876543210"):
+        res = client.post("/calls/start", params={"from_phone": number})
+        assert res.status_code == 200
+
+    with Session() as db:
+        leads = db.query(Lead).all()
+        assert [lead.primary_phone for lead in leads] == ["+919876543210"]
+        assert db.query(LeadSnapshot).count() == 1
+        assert {call.lead_id for call in db.query(Call)} == {leads[0].lead_id}
+        assert {call.from_phone for call in db.query(Call)} == {"+919876543210"}
+
+    assert client.post("/calls/start", params={"from_phone": "n/a"}).status_code == 422
+
+
+def test_start_call_rejects_unknown_flow(client):
+    """A call cannot start on a flow that is not loaded."""
+
+    res = client.post(
+        "/calls/start", params={"from_phone": "+919000000012", "flow": "missing"}
+    )
+
+    assert res.status_code == 400
+
+
+def test_user_turn_advances_state(client):
+    """A user turn moves the call to the next state."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000002"}
+    ).json()["call_id"]
+
+    res = client.post(
+        f"/calls/{call_id}/user_turn",
+        json={"turn_id": "t1", "text": "English please"},
+    )
+
+    assert res.status_code == 200
+    assert res.json()["state"] == CallState.ASK_CITY_OR_REGION.value
+
+
+def test_call_walks_the_flow_through_qualify(client):
+    """A call reaches CLOSE through QUALIFY, which has a prompt of its own."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000011"}
+    ).json()["call_id"]
+
+    states = []
+    for n, text in enumerate(
+        ["English", "Pune", "yes", "8 lakhs", "soon", "10 by 12", "okay"]
+    ):
+        res = client.post(
+            f"/calls/{call_id}/user_turn", json={"turn_id": f"t{n}", "text": text}
+        )
+        assert res.status_code == 200
+        states.append(res.json()["state"])
+
+    assert states[-2:] == [CallState.QUALIFY.value, CallState.CLOSE.value]
+
+
+def test_user_turn_logs_stage_breakdown(client, caplog):
+    """Each processed turn logs its stage timings under its call and turn id."""
+
+    call_id = client.post("/calls/start", params={"from_phone": "+919000000009"}).json()["call_id"]
+    with caplog.at_level(logging.INFO, logger="mn_ai_voice.app.api.calls"):
+        client.post(f"/calls/{call_id}/user_turn", json={"turn_id": "t1", "text": "English"})
+
+    (record,) = [r for r in caplog.records if r.getMessage() == "turn handled"]
+    assert (record.call_id, record.turn_id) == (call_id, "t1")
+    assert {"db_load", "lock_wait", "faq", "extraction", "transition", "commit"} <= set(
+        record.stages_ms
+    )
+    assert record.total_ms >= sum(record.stages_ms.values()) - 0.01
+
+
+def test_metrics_export_routes_turns_and_outbox_backlog(client, Session):
+    """/metrics has route latency, turn counters and the outbox backlog."""
+
+    call_id = client.post("/calls/start", params={"from_phone": "+919000000010"}).json()["call_id"]
+    client.post(f"/calls/{call_id}/user_turn", json={"turn_id": "t1", "text": "English"})
+    client.post(f"/calls/{call_id}/user_turn", json={"turn_id": "t2", "text": "What is your process?"})
+    with Session() as db:
+        db.add(CRMOutbox(call_id=call_id, action="append_note", idempotency_key="k1"))
+        db.commit()
+
+    text = client.get("/metrics").text
+
+    assert 'http_request_duration_seconds_count{method="POST",route="/calls/start"}' in text
+    assert 'route="/calls/{call_id}/user_turn"' in text
+    assert 'call_turns_total{path="faq"}' in text
+    assert 'call_turns_total{path="flow"}' in text
+    assert (
+        'state_transitions_total{from_state="ASK_LANGUAGE",to_state="ASK_CITY_OR_REGION"}'
+        in text
+    )
+    assert 'call_turn_stage_seconds_count{stage="commit"}' in text
+    assert "crm_outbox_pending 1.0" in text
+    assert "crm_outbox_oldest_pending_age_seconds" in text
+
+
+def test_replayed_turn_returns_original_reply(client, Session):
+    """
+    Replaying a turn_id returns the cached reply and state
+    without processing the turn again.
+    """
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000003"}
+    ).json()["call_id"]
+
+    first = client.post(
+        f"/calls/{call_id}/user_turn",
+        json={"turn_id": "t1", "text": "Hindi"},
+    ).json()
+    replay = client.post(
+        f"/calls/{call_id}/user_turn",
+        json={"turn_id": "t1", "text": "Hindi"},
+    ).json()
+
+    assert replay == first
+
+    with Session() as db:
+        assert db.get(TurnRecord, (call_id, "t1")) is not None
+        user_turns = (
+            db.query(Event)
+            .filter(
+                Event.call_id == call_id,
+                Event.type == EventType.USER_TURN.value,
+            )
+            .count()
+        )
+    assert user_turns == 1
+
+
+def test_user_turn_unknown_call_returns_404(client):
+    """Turns for an unknown call are rejected."""
+
+    res = client.post(
+        "/calls/c_missing/user_turn",
+        json={"turn_id": "t1", "text": "hello"},
+    )
+
+    assert res.status_code == 404
+
+
+def test_user_turn_missing_snapshot_returns_500(client, Session):
+    """A call whose lead has no snapshot is a server error."""
+
+    with Session() as db:
+        db.add(Lead(lead_id="l_orphan", primary_phone="+919000000009"))
+        db.add(Call(call_id="c_orphan", lead_id="l_orphan", current_state="ASK_LANGUAGE"))
+        db.commit()
+
+    res = client.post(
+        "/calls/c_orphan/user_turn",
+        json={"turn_id": "t1", "text": "hello"},
+    )
+
+    assert res.status_code == 500
+
+
+@pytest.fixture()
+def admin_headers(monkeypatch):
+    """Configure an admin key and return the header carrying it."""
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "s3cret")
+    return {"X-Admin-Key": "s3cret"}
+
+
+def test_end_call_emits_event_and_summarizes(client, Session):
+    """Ending a call records CALL_ENDED once and the summary follows."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000007"}
+    ).json()["call_id"]
+
+    res = client.post(f"/calls/{call_id}/end")
+    again = client.post(f"/calls/{call_id}/end", params={"reason": "duplicate"})
+
+    assert res.status_code == 200
+    assert res.json()["status"] == "ended"
+    assert again.json()["ended_at"] == res.json()["ended_at"]
+
+    deadline = time.monotonic() + 5
+    with Session() as db:
+        while db.query(Artifact).filter_by(call_id=call_id).count() == 0:
+            assert time.monotonic() < deadline, "summary not written"
+            time.sleep(0.01)
+
+        ended = db.query(Event).filter_by(
+            call_id=call_id, type=EventType.CALL_ENDED.value
+        ).all()
+        assert [e.payload_json for e in ended] == [{"reason": "hangup"}]
+        note = db.query(CRMOutbox).filter_by(call_id=call_id).one()
+        assert note.idempotency_key == f"crm_note:{call_id}"
+
+
+def test_end_unknown_call_returns_404(client):
+    """Ending a call that does not exist is a 404."""
+
+    assert client.post("/calls/c_missing/end").status_code == 404
+
+
+def test_transcript_streams_turns_and_resumes(client):
+    """The transcript lists user and assistant turns in order, resumably."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000008"}
+    ).json()["call_id"]
+    client.post(f"/calls/{call_id}/user_turn", json={"turn_id": "t1", "text": "English"})
+    client.post(f"/calls/{call_id}/user_turn", json={"turn_id": "t2", "text": "Pune"})
+
+    res = client.get(f"/calls/{call_id}/transcript")
+
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert [line["role"] for line in lines] == ["user", "assistant", "user", "assistant"]
+    assert [lines[0]["text"], lines[2]["text"]] == ["English", "Pune"]
+
+    resumed = client.get(
+        f"/calls/{call_id}/transcript",
+        params={"since_event_id": lines[1]["event_id"]},
+    )
+    assert [json.loads(line) for line in resumed.text.splitlines()] == lines[2:]
+
+    assert client.get("/calls/c_missing/transcript").status_code == 404
+
+
+def stream_turn(ws, turn_id, text):
+    """Send a turn over a call stream; return its reply and the ack."""
+    ws.send_json({"type": "turn", "turn_id": turn_id, "text": text})
+    return ws.receive_json(), ws.receive_json()
+
+
+def test_stream_runs_turns_and_commits_them(client, Session):
+    """Stream turns reply, then ack once committed like HTTP turns."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000021"}
+    ).json()["call_id"]
+
+    with client.websocket_connect(f"/calls/{call_id}/stream") as ws:
+        ready = ws.receive_json()
+        assert ready == {
+            "type": "ready",
+            "state": CallState.ASK_LANGUAGE.value,
+            "last_turn_id": None,
+        }
+        reply, ack = stream_turn(ws, "t1", "English")
+        assert reply["type"] == "reply"
+        assert reply["state"] == CallState.ASK_CITY_OR_REGION.value
+        assert ack == {"type": "ack", "turn_id": "t1"}
+        last, _ = stream_turn(ws, "t2", "Pune")
+
+    with Session() as db:
+        call = db.get(Call, call_id)
+        snapshot = db.get(LeadSnapshot, call.lead_id)
+        assert call.current_state == last["state"]
+        assert snapshot.region_value is not None
+        assert db.get(TurnRecord, (call_id, "t1")).reply_text == reply["assistant"]["text"]
+        events = db.query(Event).filter(Event.call_id == call_id).count()
+    assert events == 5  # CALL_STARTED, then user and assistant per turn
+
+
+def test_stream_reconnect_resumes_from_last_ack(client, Session):
+    """A reconnect reports the last acked turn; resending it replays."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000022"}
+    ).json()["call_id"]
+
+    with client.websocket_connect(f"/calls/{call_id}/stream") as ws:
+        ws.receive_json()
+        first, _ = stream_turn(ws, "t1", "Hindi")
+
+    with client.websocket_connect(f"/calls/{call_id}/stream") as ws:
+        ready = ws.receive_json()
+        assert ready["last_turn_id"] == "t1"
+        assert ready["state"] == first["state"]
+        ws.send_json({"type": "turn", "turn_id": "t1", "text": "Hindi"})
+        assert ws.receive_json() == first
+
+    with Session() as db:
+        user_turns = (
+            db.query(Event)
+            .filter(Event.call_id == call_id, Event.type == EventType.USER_TURN.value)
+            .count()
+        )
+    assert user_turns == 1
+
+
+def test_stream_reloads_after_an_http_turn(client):
+    """A turn committed over HTTP mid-stream is seen by the next stream turn."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000023"}
+    ).json()["call_id"]
+
+    with client.websocket_connect(f"/calls/{call_id}/stream") as ws:
+        ws.receive_json()
+        stream_turn(ws, "t1", "English")
+        client.post(f"/calls/{call_id}/user_turn", json={"turn_id": "t2", "text": "Pune"})
+        reply, ack = stream_turn(ws, "t3", "yes")
+
+    # Same turns over HTTP only, for the expected state
+    other_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000025"}
+    ).json()["call_id"]
+    for n, text in enumerate(["English", "Pune", "yes"]):
+        expected = client.post(
+            f"/calls/{other_id}/user_turn", json={"turn_id": f"t{n}", "text": text}
+        ).json()
+
+    assert ack == {"type": "ack", "turn_id": "t3"}
+    assert reply["state"] == expected["state"]
+
+
+def test_stream_partials_preview_the_reply(client, Session):
+    """Partial hypotheses get previews when the reply changes; none are committed."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000026"}
+    ).json()["call_id"]
+
+    with client.websocket_connect(f"/calls/{call_id}/stream") as ws:
+        ws.receive_json()
+        ws.send_json({"type": "partial", "turn_id": "t1", "text": "what is your"})
+        first = ws.receive_json()
+        ws.send_json({"type": "partial", "turn_id": "t1", "text": "what is your pro"})
+        ws.send_json({"type": "partial", "turn_id": "t1", "text": "what is your process"})
+        second = ws.receive_json()
+        reply, ack = stream_turn(ws, "t1", "what is your process")
+
+    assert first["type"] == second["type"] == "preview"
+    assert first["assistant"] != second["assistant"] == reply["assistant"]
+    assert ack == {"type": "ack", "turn_id": "t1"}
+    with Session() as db:
+        events = db.query(Event).filter(Event.call_id == call_id).count()
+    assert events == 2  # CALL_STARTED and the FAQ answer
+
+
+def test_stream_rejects_unknown_and_ended_calls(client):
+    """Unknown or ended calls get an error message, then a close."""
+
+    with client.websocket_connect("/calls/c_missing/stream") as ws:
+        assert ws.receive_json() == {"type": "error", "detail": "Call not found"}
+        assert ws.receive()["code"] == 4404
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000024"}
+    ).json()["call_id"]
+    with client.websocket_connect(f"/calls/{call_id}/stream") as ws:
+        ws.receive_json()
+        client.post(f"/calls/{call_id}/end")
+        ws.send_json({"type": "turn", "turn_id": "t1", "text": "English"})
+        ws.receive_json()  # the reply goes out before the commit
+        assert ws.receive_json() == {"type": "error", "detail": "Call has ended"}
+        assert ws.receive()["code"] == 4409
+
+
+def test_admin_routes_require_key(client, monkeypatch):
+    """Admin routes reject missing or wrong keys, and are off without one."""
+
+    url = "/admin/knowledge_base"
+    assert client.get(url).status_code == 403
+
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", "s3cret")
+    assert client.get(url).status_code == 403
+    assert client.get(url, headers={"X-Admin-Key": "wrong"}).status_code == 403
+    assert client.get(url, headers={"X-Admin-Key": "s3cret"}).status_code == 200
+
+
+def test_snapshot_edit_visible_after_invalidate(client, Session, admin_headers):
+    """An out-of-process snapshot edit is picked up after invalidation."""
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000004"}
+    ).json()["call_id"]
+    client.post(
+        f"/calls/{call_id}/user_turn",
+        json={"turn_id": "t1", "text": "English"},
+    )
+
+    with Session() as db:
+        snapshot = db.query(LeadSnapshot).one()
+        lead_id = snapshot.lead_id
+        snapshot.city_text = "Pune"
+        db.commit()
+
+    res = client.post(
+        f"/admin/leads/{lead_id}/snapshot/invalidate", headers=admin_headers
+    )
+    assert res.status_code == 200
+
+    client.post(
+        f"/calls/{call_id}/user_turn",
+        json={"turn_id": "t2", "text": "8 lakhs"},
+    )
+
+    with Session() as db:
+        snapshot = db.get(LeadSnapshot, lead_id)
+        assert snapshot.city_text == "Pune"
+        assert snapshot.budget_band == "6_to_9L"
+
+
+def test_analytics_follow_turns_and_match_rebuild(client, Session, admin_headers):
+    """Aggregates updated per turn equal a from-scratch rebuild."""
+
+    # pylint: disable=import-outside-toplevel
+    from mn_ai_voice.app.workers.analytics_rebuild import AnalyticsRebuilder
+
+    def get(path):
+        return client.get(f"/admin/analytics/{path}", headers=admin_headers).json()
+
+    first = client.post("/calls/start", params={"from_phone": "+919000000011"}).json()["call_id"]
+    second = client.post("/calls/start", params={"from_phone": "+919000000012"}).json()["call_id"]
+    client.post(f"/calls/{first}/user_turn", json={"turn_id": "t1", "text": "English"})
+    client.post(f"/calls/{first}/user_turn", json={"turn_id": "t1", "text": "English"})  # replay
+    client.post(f"/calls/{first}/user_turn", json={"turn_id": "t2", "text": "Pune"})
+    client.post(f"/calls/{second}/end")
+
+    # Ended calls take no more turns.
+    assert client.post(
+        f"/calls/{second}/user_turn", json={"turn_id": "t1", "text": "Hindi"}
+    ).status_code == 409
+
+    deadline = time.monotonic() + 5
+    while get("turns")["calls"] == 0:
+        assert time.monotonic() < deadline, "summary not counted"
+        time.sleep(0.01)
+
+    funnel = {row["state"]: row for row in get("funnel")["states"]}
+    assert funnel[CallState.ASK_LANGUAGE.value]["entered"] == 2
+    assert funnel[CallState.ASK_LANGUAGE.value]["ended"] == 1
+    assert funnel[CallState.ASK_LANGUAGE.value]["drop_off_rate"] == 0.5
+    assert funnel[CallState.ASK_CITY_OR_REGION.value]["entered"] == 1
+    assert sum(row["in_progress"] for row in funnel.values()) == 1
+    assert get("turns")["histogram"] == [{"turns": 0, "calls": 1}]
+    assert sum(b["leads"] for b in get("qualification")["buckets"]) == 2
+
+    before = (get("funnel"), get("qualification"), get("turns"))
+    with Session() as db:
+        AnalyticsRebuilder().run(db)
+    assert (get("funnel"), get("qualification"), get("turns")) == before
+
+
+def test_rebuild_starts_calls_in_their_flow(client, Session, admin_headers, tmp_path, monkeypatch):
+    """A flow with its own start state rebuilds to the per-turn funnel."""
+
+    # pylint: disable=import-outside-toplevel
+    from mn_ai_voice.app.api import calls
+    from mn_ai_voice.app.engine.flows import FlowRegistry, flow_registry
+    from mn_ai_voice.app.workers.analytics_rebuild import AnalyticsRebuilder
+
+    flows_dir = tmp_path / "flows"
+    flows_dir.mkdir()
+    default = (flow_registry.path / "default.yaml").read_text(encoding="utf-8")
+    (flows_dir / "default.yaml").write_text(default, encoding="utf-8")
+    (flows_dir / "budget_first.yaml").write_text(
+        "start: ASK_BUDGET\n"
+        "states:\n"
+        "  ASK_BUDGET:\n"
+        "    next: ASK_EMAIL\n"
+        "  ASK_EMAIL:\n"
+        "    next: CLOSE\n"
+        "  CLOSE:\n"
+        "    terminal: true\n",
+        encoding="utf-8",
+    )
+    registry = FlowRegistry(flows_dir)
+    monkeypatch.setattr(calls.orchestrator.state_machine, "flows", registry)
+
+    def get(path):
+        return client.get(f"/admin/analytics/{path}", headers=admin_headers).json()
+
+    call_id = client.post(
+        "/calls/start", params={"from_phone": "+919000000013", "flow": "budget_first"}
+    ).json()["call_id"]
+    client.post("/calls/start", params={"from_phone": "+919000000014"})
+    client.post(f"/calls/{call_id}/user_turn", json={"turn_id": "t1", "text": "8 lakhs"})
+
+    funnel = {row["state"]: row for row in get("funnel")["states"]}
+    assert funnel[CallState.ASK_BUDGET.value]["entered"] == 1
+    assert funnel[CallState.ASK_LANGUAGE.value]["entered"] == 1
+    assert funnel[CallState.ASK_EMAIL.value]["entered"] == 1
+
+    before = get("funnel")
+    with Session() as db:
+        AnalyticsRebuilder(flows=registry).run(db)
+    assert get("funnel") == before
+
+
+def test_turn_loaded_before_a_concurrent_commit_is_refreshed(db_path, monkeypatch):
+    """
+    A turn whose load finished before another turn for the lead committed
+    must not apply itself to the stale call state, even when it reaches
+    the lock after that turn released it.
+    """
+    # pylint: disable=import-outside-toplevel
+    import asyncio
+
+    import httpx
+
+    from mn_ai_voice.app.api import calls
+
+    real_load_turn = calls.load_turn
+
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        AsyncSession = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+        async def override_get_db():
+            async with AsyncSession() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override_get_db
+        b_loaded, a_done = asyncio.Event(), asyncio.Event()
+
+        async def load_turn(db, call_id, turn_id, cache):
+            if turn_id == "a":
+                await b_loaded.wait()
+            ctx = await real_load_turn(db, call_id, turn_id, cache)
+            if turn_id == "b":
+                b_loaded.set()
+                await a_done.wait()
+            return ctx
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            call_id = (
+                await ac.post("/calls/start", params={"from_phone": "+919000000005"})
+            ).json()["call_id"]
+            await ac.post(
+                f"/calls/{call_id}/user_turn",
+                json={"turn_id": "t1", "text": "English"},
+            )
+
+            monkeypatch.setattr(calls, "load_turn", load_turn)
+
+            async def turn_a():
+                res = await ac.post(
+                    f"/calls/{call_id}/user_turn",
+                    json={"turn_id": "a", "text": "Mumbai"},
+                )
+                a_done.set()
+                return res.json()
+
+            async def turn_b():
+                res = await ac.post(
+                    f"/calls/{call_id}/user_turn",
+                    json={"turn_id": "b", "text": "yes"},
+                )
+                return res.json()
+
+            a, b = await asyncio.gather(turn_a(), turn_b())
+
+        await engine.dispose()
+        return call_id, a, b
+
+    snapshot_cache.clear()
+    try:
+        call_id, a, b = asyncio.run(main())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert a["state"] == CallState.ASK_REGION_CONFIRM.value
+    assert b["state"] == CallState.ASK_BUDGET.value
+
+    with sessionmaker(bind=create_engine(f"sqlite:///{db_path}"))() as db:
+        assert db.get(Call, call_id).current_state == CallState.ASK_BUDGET.value
@@ -0,0 +1,165 @@
+"""
+Tests for the call stream writer under races the HTTP client cannot script.
+
+A fake WebSocket feeds messages from a queue, so the test decides when
+the writer holds or waits for the lead lock.
+"""
+
+# pylint: disable=redefined-outer-name
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+
+from mn_ai_voice.app.api.call_stream import CLOSE_CONFLICT, CallStream
+from mn_ai_voice.app.db.models import Base, Call, Lead, LeadSnapshot, TurnRecord
+from mn_ai_voice.app.db.snapshot_cache import SnapshotCache
+from mn_ai_voice.app.orchestrator.call_orchestrator import CallOrchestrator
+
+
+class FakeWebSocket:
+    """Scripted WebSocket: the test pushes client messages and reads sends."""
+
+    def __init__(self, fail_on: tuple[str, ...] = ()) -> None:
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.sent: asyncio.Queue = asyncio.Queue()
+        self.fail_on = fail_on
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send_json(self, message):
+        if message["type"] in self.fail_on:
+            raise RuntimeError("Cannot call send once a close message has been sent.")
+        await self.sent.put(message)
+
+    async def close(self, code):
+        self.close_code = code
+
+    def turn(self, turn_id, text):
+        message = {"type": "turn", "turn_id": turn_id, "text": text}
+        self.incoming.put_nowait({"type": "websocket.receive", "text": json.dumps(message)})
+
+    def disconnect(self):
+        self.incoming.put_nowait({"type": "websocket.disconnect"})
+
+
+@pytest.fixture()
+def db_url(tmp_path):
+    """SQLite database with one call on a lead with a snapshot."""
+    path = tmp_path / "stream.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(Lead(lead_id="l_1", primary_phone="+919000000001"))
+        db.add(LeadSnapshot(lead_id="l_1", updated_at=datetime(2020, 1, 1)))
+        db.add(Call(call_id="c_1", lead_id="l_1", current_state="ASK_LANGUAGE"))
+        db.commit()
+    return f"sqlite+aiosqlite:///{path}"
+
+
+async def _stream(db_url, websocket, script):
+    """Run a stream for c_1 alongside script(cache); return the committed turn ids."""
+    engine = create_async_engine(db_url)
+    AsyncSession = async_sessionmaker(  # pylint: disable=invalid-name
+        bind=engine, expire_on_commit=False
+    )
+    cache = SnapshotCache(max_size=10, ttl_seconds=60)
+
+    async with AsyncSession() as db:
+        stream = CallStream(websocket, db, "c_1", CallOrchestrator(), cache)
+        running = asyncio.create_task(stream.run())
+        assert (await websocket.sent.get())["type"] == "ready"
+        await script(cache)
+        await asyncio.wait_for(running, timeout=5)
+
+    async with AsyncSession() as db:
+        committed = (await db.scalars(select(TurnRecord.turn_id))).all()
+    await engine.dispose()
+    return sorted(committed)
+
+
+def test_stale_reload_does_not_wait_on_a_dead_writer(db_url):
+    """
+    A turn that must reload waits for queued turns to commit; if the
+    writer fails instead, the stream closes rather than hanging.
+    """
+    websocket = FakeWebSocket()
+
+    async def script(cache):
+        async with cache.locked("l_1"):
+            websocket.turn("a", "English")  # the writer takes [a], waits on the lock
+            assert (await websocket.sent.get())["turn_id"] == "a"
+            websocket.turn("b", "Pune")  # queued behind it
+            assert (await websocket.sent.get())["turn_id"] == "b"
+            cache.invalidate("l_1")  # another turn for the lead committed
+            websocket.turn("c", "yes")  # must reload, so waits for the queue
+            await asyncio.sleep(0.05)
+        assert await websocket.sent.get() == {
+            "type": "error",
+            "detail": "Lead changed by another turn",
+        }
+
+    assert asyncio.run(_stream(db_url, websocket, script)) == []
+    assert websocket.close_code == CLOSE_CONFLICT
+
+
+def test_failed_ack_does_not_stop_the_writer(db_url):
+    """Turns replied to are committed even when acks cannot be delivered."""
+    websocket = FakeWebSocket(fail_on=("ack",))
+
+    async def script(cache):
+        async with cache.locked("l_1"):
+            websocket.turn("a", "English")
+            await websocket.sent.get()
+            websocket.turn("b", "Pune")
+            await websocket.sent.get()
+            websocket.disconnect()
+            await asyncio.sleep(0.05)
+
+    assert asyncio.run(_stream(db_url, websocket, script)) == ["a", "b"]
+
+
+def test_turn_committed_over_http_closes_with_conflict(db_url):
+    """A turn_id committed elsewhere after the load ends the stream with 4409."""
+    websocket = FakeWebSocket()
+
+    async def script(cache):
+        engine = create_engine(db_url.replace("+aiosqlite", ""))
+        with Session(engine) as db:
+            db.add(TurnRecord(call_id="c_1", turn_id="a", reply_text="hi", state="ASK_LANGUAGE"))
+            db.commit()
+        websocket.turn("a", "English")
+        assert (await websocket.sent.get())["type"] == "reply"
+        assert await websocket.sent.get() == {
+            "type": "error",
+            "detail": "Turn already committed",
+        }
+
+    assert asyncio.run(_stream(db_url, websocket, script)) == ["a"]
+    assert websocket.close_code == CLOSE_CONFLICT
+
+
+def test_stream_commit_moves_snapshot_updated_at(db_url):
+    """Stream turns bump LeadSnapshot.updated_at like HTTP turns do."""
+    websocket = FakeWebSocket()
+
+    async def script(cache):
+        websocket.turn("a", "English")
+        await websocket.sent.get()  # reply
+        await websocket.sent.get()  # ack
+        websocket.disconnect()
+
+    asyncio.run(_stream(db_url, websocket, script))
+
+    with Session(create_engine(db_url.replace("+aiosqlite", ""))) as db:
+        assert db.get(LeadSnapshot, "l_1").updated_at > datetime(2020, 1, 1)
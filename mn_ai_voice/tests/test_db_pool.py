@@ -0,0 +1,90 @@
+"""
+Tests for connection pool configuration and telemetry.
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, exc
+
+from mn_ai_voice.app.core.config import Settings
+from mn_ai_voice.app.db.pool import InstrumentedQueuePool, instrument_engine
+from mn_ai_voice.app.db.session import engine_options, pool_capacity
+
+
+def _sample(name: str, engine: str) -> float:
+    return REGISTRY.get_sample_value(name, {"engine": engine}) or 0.0
+
+
+def test_engine_options_for_postgres():
+    """Server databases get the configured pool sizing."""
+
+    config = Settings(
+        DATABASE_URL="postgresql://u:p@db/app",
+        DB_POOL_SIZE=20,
+        DB_MAX_OVERFLOW=5,
+        DB_POOL_TIMEOUT=2.5,
+        DB_POOL_RECYCLE=600,
+        DB_POOL_PRE_PING=False,
+    )
+
+    options = engine_options(config, "sync")
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["max_overflow"] == 5
+    assert options["pool_timeout"] == 2.5
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is False
+    assert pool_capacity(options) == 25
+
+
+def test_pool_capacity_unbounded_overflow():
+    """A negative max_overflow means unlimited connections, not pool_size."""
+
+    options = engine_options(
+        Settings(DATABASE_URL="postgresql://u:p@db/app", DB_MAX_OVERFLOW=-1),
+        "sync",
+    )
+
+    assert pool_capacity(options) == 0
+
+
+def test_engine_options_for_sqlite():
+    """SQLite keeps its default pool and has no fixed capacity."""
+
+    options = engine_options(Settings(DATABASE_URL="sqlite:///x.db"), "sync")
+
+    assert "poolclass" not in options
+    assert "pool_size" not in options
+    assert pool_capacity(options) == 0
+
+
+def test_pool_exports_saturation_and_timeouts(tmp_path):
+    """Checkouts update saturation, churn and timeout metrics."""
+
+    label = "test_pool"
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        pool_logging_name=label,
+    )
+    instrument_engine(engine, capacity=1)
+
+    conn = engine.connect()
+    assert _sample("db_pool_saturation_ratio", label) == 1.0
+    assert _sample("db_pool_connections_opened_total", label) == 1.0
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    assert _sample("db_pool_checkout_timeouts_total", label) == 1.0
+    assert _sample("db_pool_checkout_wait_seconds_count", label) == 2.0
+
+    conn.close()
+    assert _sample("db_pool_checked_out", label) == 0.0
+    assert _sample("db_pool_saturation_ratio", label) == 0.0
+
+    engine.dispose()
+    assert _sample("db_pool_connections_closed_total", label) == 1.0
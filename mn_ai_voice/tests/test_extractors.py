@@ -0,0 +1,120 @@
+"""
+Tests for the single-pass extraction engine.
+"""
+
+import pytest
+
+from mn_ai_voice.app.engine.extractors import (
+    BudgetExtractor,
+    EmailExtractor,
+    ExtractionEngine,
+    LanguageExtractor,
+    RegionExtractor,
+    TimelineExtractor,
+)
+
+ENGINE = ExtractionEngine()
+
+
+def test_extracts_every_field_in_one_call():
+    """One utterance can fill several fields at once."""
+
+    fields = ENGINE.extract(
+        "Hindi please, we are in Pune, budget 8 lakhs, start in 1 month, a@b.com"
+    )
+
+    assert fields.language == "hindi"
+    assert fields.region == "maharashtra"
+    assert fields.budget_band == "6_to_9L"
+    assert fields.timeline == "1_month"
+    assert fields.email == "a@b.com"
+
+
+def test_unmentioned_fields_are_unknown():
+    """Fields absent from the text keep their defaults."""
+
+    fields = ENGINE.extract("hello there")
+
+    assert (fields.language, fields.region, fields.timeline) == ("unknown",) * 3
+    assert fields.budget_band == "unknown"
+    assert fields.email is None
+
+
+def test_region_tokens_respect_word_boundaries():
+    """Short state codes do not match inside other words."""
+
+    assert ENGINE.extract("I went to the bank").region == "unknown"
+    assert ENGINE.extract("bangalore, KA").region == "south_india"
+
+
+def test_category_priority_matches_extractor_order():
+    """Earlier categories win regardless of position in the text."""
+
+    assert ENGINE.extract("delhi or maybe kerala").region == "south_india"
+    assert ENGINE.extract("english or hinglish").language == "hinglish"
+
+
+def test_budget_number_inside_email():
+    """The first number may sit inside the email address, as before."""
+
+    fields = ENGINE.extract("mail rahul12@example.com, budget 7")
+
+    assert fields.email == "rahul12@example.com"
+    assert fields.budget_band == "above_9L"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "English please",
+        "eng, tamil nadu, asap",
+        "we know the gurugram site, 2 to 3 months",
+        "5.5 or 9 lakhs, next year",
+        "x.y-z@mail.co.in and 4",
+        "9abc@d.in",
+        "ka_ap tn. mh",
+        "हिंदी में, 3+ months",
+    ],
+)
+def test_engine_agrees_with_per_class_extractors(text):
+    """The engine returns exactly what the individual extractors return."""
+
+    fields = ENGINE.extract(text)
+
+    assert fields.language == LanguageExtractor().extract(text)
+    assert fields.region == RegionExtractor().extract(text)
+    assert fields.timeline == TimelineExtractor().extract(text)
+    assert fields.budget_band == BudgetExtractor().extract(text)
+    assert fields.email == EmailExtractor().extract(text)
+    assert ENGINE.language(text) == fields.language
+    assert ENGINE.budget_band(text) == fields.budget_band
+    assert ENGINE.email(text) == fields.email
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Hindi please, we are in Pune, budget 8 lakhs, start in 1 month, a@b.com",
+        "mail rahul12@example.com, budget 7",
+        "bangalore, KA",
+        "5.5 or 9 lakhs, next year",
+    ],
+)
+def test_incremental_extraction_matches_full_extraction(text):
+    """Every prefix, as a partial hypothesis, extracts like the full engine."""
+
+    partial = ENGINE.incremental()
+    for end in range(len(text) + 1):
+        assert partial.update(text[:end]) == ENGINE.extract(text[:end])
+
+
+def test_incremental_extraction_follows_revisions():
+    """A revised hypothesis drops what the replaced words contributed."""
+
+    partial = ENGINE.incremental()
+    partial.update("budget 4 lakhs in pune")
+
+    fields = partial.update("budget 8 lakhs in delhi")
+
+    assert fields == ENGINE.extract("budget 8 lakhs in delhi")
+    assert (fields.budget_band, fields.region) == ("6_to_9L", "delhi_ncr")
@@ -72,3 +72,35 @@ def test_faq_interrupt_does_not_change_state_or_snapshot():
     assert snapshot.qualification_status in (None, "unknown")
     assert snapshot.timeline_bucket in (None, "unknown")
     assert snapshot.room_size_text in (None, "")
+
+
+def test_partial_hypotheses_preview_the_final_reply():
+    """
+    Partial hypotheses give the reply early without changing anything;
+    the final turn reuses them and replies the same.
+    """
+
+    orchestrator = CallOrchestrator()
+    call = Call(call_id="c_test", current_state=CallState.ASK_BUDGET.value)
+    snapshot = LeadSnapshot(lead_id="l_test")
+
+    partial = orchestrator.begin_partial()
+    for text in ["budget", "budget around", "budget around 8 lakhs"]:
+        partial.update(text)
+        preview = orchestrator.preview(call, snapshot, partial)
+
+    assert call.current_state == CallState.ASK_BUDGET.value
+    assert snapshot.budget_band in (None, "unknown")
+
+    db = DummySession()
+    reply = orchestrator.handle_turn(
+        db, call, snapshot, "budget around 8 lakhs", partial=partial
+    )
+
+    assert reply == preview
+    assert snapshot.budget_band == "6_to_9L"
+    assert call.current_state == CallState.ASK_TIMELINE.value
+
+    partial = orchestrator.begin_partial()
+    partial.update("what is your process")
+    assert "process" in orchestrator.preview(call, snapshot, partial).lower()
@@ -0,0 +1,133 @@
+"""
+Tests for declarative conversation flows.
+"""
+
+import pytest
+
+from mn_ai_voice.app.core.constants import CallState, QualificationStatus
+from mn_ai_voice.app.engine.flows import (
+    MASKS,
+    FlowRegistry,
+    compile_flow,
+    flow_registry,
+    signal_mask,
+)
+from mn_ai_voice.app.engine.state_machine import StateMachine
+
+SHORT_FLOW = """
+start: ASK_LANGUAGE
+states:
+  ASK_LANGUAGE:
+    next: ASK_BUDGET
+  ASK_BUDGET:
+    rules:
+      - when: [unqualified]
+        next: CLOSE
+    next: ASK_EMAIL
+  ASK_EMAIL:
+    next: CLOSE
+  CLOSE:
+    terminal: true
+"""
+
+
+def _flow(states, start="ASK_LANGUAGE"):
+    return compile_flow("test", {"start": start, "states": states})
+
+
+def test_default_flow_compiles_to_one_entry_per_state_and_mask():
+    """Each (state, signals) pair has exactly one precomputed next state."""
+
+    flow = flow_registry.get()
+
+    assert flow.start == CallState.ASK_LANGUAGE
+    assert len(flow.table) == len(flow.states) * MASKS
+    assert flow.terminal == {CallState.CLOSE}
+
+
+def test_rules_apply_in_order_with_default_fallback():
+    """The first matching rule wins; `next` applies when none match."""
+
+    flow = flow_registry.get()
+
+    assert flow.next(CallState.ASK_BUDGET, 0) == CallState.ASK_TIMELINE
+    assert flow.next(
+        CallState.ASK_BUDGET, signal_mask(has_timeline=True)
+    ) == CallState.ASK_ROOM_SIZE
+    assert flow.next(
+        CallState.ASK_BUDGET, signal_mask(has_timeline=True, has_room_size=True)
+    ) == CallState.QUALIFY
+    assert flow.next(
+        CallState.QUALIFY, signal_mask(qualification_status=QualificationStatus.NURTURE)
+    ) == CallState.ASK_EMAIL
+    assert flow.next(
+        CallState.QUALIFY, signal_mask(qualification_status=QualificationStatus.UNKNOWN)
+    ) == CallState.CLOSE
+
+
+@pytest.mark.parametrize(
+    "states, message",
+    [
+        (
+            {"ASK_LANGUAGE": {"next": "CLOSE"}, "ASK_EMAIL": {"next": "CLOSE"},
+             "CLOSE": {"terminal": True}},
+            "unreachable",
+        ),
+        (
+            {"ASK_LANGUAGE": {"next": "ASK_EMAIL"}, "ASK_EMAIL": {"next": "ASK_LANGUAGE"}},
+            "no terminal",
+        ),
+        (
+            {"ASK_LANGUAGE": {"next": "ASK_EMAIL",
+                              "rules": [{"when": ["qualified"], "next": "CLOSE"}]},
+             "ASK_EMAIL": {"next": "ASK_EMAIL"}, "CLOSE": {"terminal": True}},
+            "cannot finish",
+        ),
+        ({"ASK_LANGUAGE": {"next": "QUALIFY"}}, "undefined state"),
+        ({"ASK_LANGUAGE": {"next": "NOWHERE"}}, "unknown state"),
+        (
+            {"ASK_LANGUAGE": {"next": "CLOSE", "rules": [{"when": ["rich"], "next": "CLOSE"}]},
+             "CLOSE": {"terminal": True}},
+            "unknown signal",
+        ),
+        ({"CLOSE": {"terminal": True, "next": "CLOSE"}}, "terminal state"),
+    ],
+)
+def test_invalid_flows_are_rejected_at_load(states, message):
+    """Structural problems are reported when the flow is compiled."""
+
+    with pytest.raises(ValueError, match=message):
+        _flow(states, start=next(iter(states)))
+
+
+def test_registry_holds_several_flows_selectable_by_name(tmp_path):
+    """Flows load from a directory, named after their files."""
+
+    default = (flow_registry.path / "default.yaml").read_text(encoding="utf-8")
+    (tmp_path / "default.yaml").write_text(default, encoding="utf-8")
+    (tmp_path / "short.yaml").write_text(SHORT_FLOW, encoding="utf-8")
+
+    registry = FlowRegistry(tmp_path)
+    sm = StateMachine(registry)
+
+    assert registry.names == ["default", "short"]
+    assert sm.next_state(CallState.ASK_LANGUAGE) == CallState.ASK_CITY_OR_REGION
+    assert sm.next_state(CallState.ASK_LANGUAGE, flow="short") == CallState.ASK_BUDGET
+    assert sm.next_state(
+        CallState.ASK_BUDGET,
+        qualification_status=QualificationStatus.UNQUALIFIED,
+        flow="short",
+    ) == CallState.CLOSE
+    with pytest.raises(ValueError, match="not in flow"):
+        sm.next_state(CallState.QUALIFY, flow="short")
+    with pytest.raises(ValueError, match="Unknown flow"):
+        registry.get("missing")
+
+
+def test_registry_requires_a_default_flow(tmp_path):
+    """A flow directory without the default flow is an error."""
+
+    (tmp_path / "short.yaml").write_text(SHORT_FLOW, encoding="utf-8")
+
+    with pytest.raises(ValueError, match="default"):
+        FlowRegistry(tmp_path)
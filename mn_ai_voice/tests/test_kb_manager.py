@@ -0,0 +1,142 @@
+"""
+Tests for knowledge base versioning and hot reload.
+"""
+
+import os
+
+import pytest
+
+from mn_ai_voice.app.engine.kb_manager import KnowledgeBaseManager
+from mn_ai_voice.app.orchestrator.call_orchestrator import CallOrchestrator
+from mn_ai_voice.app.skills.faq_skill import FAQContext, FAQSkill
+
+KB_V1 = "faq:\n  warranty: One year warranty.\n"
+KB_V2 = "faq:\n  warranty: Ten year warranty.\n"
+
+
+def test_missing_file_serves_default(tmp_path):
+    """Without a YAML file the built-in default knowledge base is used."""
+
+    manager = KnowledgeBaseManager(tmp_path / "kb.yaml")
+
+    assert manager.current.source == "default"
+    assert "consultation" in manager.current.router.route("your process?")
+
+
+def test_upload_swaps_version_and_persists(tmp_path):
+    """An upload publishes a new version and rewrites the file."""
+
+    path = tmp_path / "kb.yaml"
+    path.write_text(KB_V1, encoding="utf-8")
+    manager = KnowledgeBaseManager(path)
+    pinned = manager.current
+
+    uploaded = manager.load_text(KB_V2)
+
+    assert manager.current is uploaded
+    assert uploaded.version != pinned.version
+    assert path.read_text(encoding="utf-8") == KB_V2
+    # A turn holding the previous version still answers from it.
+    assert pinned.router.route("warranty?") == "One year warranty."
+    assert manager.current.router.route("warranty?") == "Ten year warranty."
+
+
+def test_version_is_content_hash(tmp_path):
+    """Identical content always yields the same version id."""
+
+    first = KnowledgeBaseManager(tmp_path / "a.yaml").load_text(KB_V1)
+    second = KnowledgeBaseManager(tmp_path / "b.yaml").load_text(KB_V1)
+
+    assert first.version == second.version
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "faq: [unclosed",
+        "- just\n- a list\n",
+        "faq:\n  price:\n    weight: 2\n",
+        "faq:\n  price:\n    answer: a\n    weight: [2]\n",
+        "faq:\n  price:\n    answer: a\n    weight: {n: 2}\n",
+        "faq:\n  price:\n    answer: a\n    weight: high\n",
+    ],
+)
+def test_invalid_upload_keeps_current_version(tmp_path, text):
+    """Invalid uploads are rejected and leave the current version serving."""
+
+    path = tmp_path / "kb.yaml"
+    path.write_text(KB_V1, encoding="utf-8")
+    manager = KnowledgeBaseManager(path)
+    before = manager.current
+
+    with pytest.raises(ValueError):
+        manager.load_text(text)
+
+    assert manager.current is before
+    assert path.read_text(encoding="utf-8") == KB_V1
+
+
+def test_check_for_changes_reloads_edited_file(tmp_path):
+    """The watcher poll reloads the file only when it changed."""
+
+    path = tmp_path / "kb.yaml"
+    path.write_text(KB_V1, encoding="utf-8")
+    manager = KnowledgeBaseManager(path)
+
+    assert manager.check_for_changes() is None
+
+    path.write_text(KB_V2, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    reloaded = manager.check_for_changes()
+    assert reloaded is not None
+    assert manager.current.router.route("warranty?") == "Ten year warranty."
+
+
+def test_faq_context_pins_version(tmp_path):
+    """FAQContext.kb overrides the manager's current version."""
+
+    path = tmp_path / "kb.yaml"
+    path.write_text(KB_V1, encoding="utf-8")
+    manager = KnowledgeBaseManager(path)
+    pinned = manager.current
+    manager.load_text(KB_V2)
+
+    skill = FAQSkill(manager)
+
+    assert skill.handle(FAQContext(text="warranty?", kb=pinned)) == "One year warranty."
+    assert skill.handle(FAQContext(text="warranty?")) == "Ten year warranty."
+
+
+class RecordingSession:  # pylint: disable=too-few-public-methods
+    """Collects objects added during a turn."""
+
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        """Record an added object."""
+        self.added.append(obj)
+
+
+def test_assistant_event_records_kb_version(tmp_path):
+    """Assistant replies carry the knowledge base version they used."""
+
+    path = tmp_path / "kb.yaml"
+    path.write_text(KB_V1, encoding="utf-8")
+    manager = KnowledgeBaseManager(path)
+
+    orchestrator = CallOrchestrator()
+    orchestrator.faq = FAQSkill(manager)
+    db = RecordingSession()
+
+    orchestrator.handle_turn(db, call=_Call(), snapshot=None, text="warranty?")
+
+    (event,) = db.added
+    assert event.payload_json["kb_version"] == manager.current.version
+
+
+class _Call:  # pylint: disable=too-few-public-methods
+    call_id = "c_kb"
+    current_state = "ASK_LANGUAGE"
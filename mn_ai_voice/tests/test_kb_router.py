@@ -0,0 +1,141 @@
+"""
+Tests for keyword matching and knowledge base routing.
+"""
+
+import random
+
+import pytest
+
+from mn_ai_voice.app.engine.kb_manager import kb_manager
+from mn_ai_voice.app.engine.kb_router import KBIndex
+from mn_ai_voice.app.engine.keyword_matcher import IncrementalScan, KeywordMatcher
+
+
+def _brute_force(keywords, text):
+    text = text.lower()
+    return sorted(
+        (i, i + len(k), k)
+        for k in keywords
+        for i in range(len(text) - len(k) + 1)
+        if text.startswith(k, i)
+    )
+
+
+def test_matcher_finds_overlapping_keywords():
+    """Every occurrence is reported, including overlaps and suffixes."""
+
+    matcher = KeywordMatcher([(k, k) for k in ["he", "she", "his", "hers"]])
+
+    found = sorted(matcher.find_all("USHERS"))
+
+    assert found == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")]
+
+
+def test_matcher_agrees_with_brute_force():
+    """Randomized check against a naive substring search."""
+
+    rng = random.Random(3)
+    alphabet = "abc "
+    for _ in range(200):
+        keywords = {
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+            for _ in range(rng.randint(1, 8))
+        }
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        matcher = KeywordMatcher([(k, k) for k in keywords])
+
+        assert sorted(matcher.find_all(text)) == _brute_force(keywords, text)
+
+
+def test_matcher_scan_is_resumable():
+    """Scanning in pieces gives the same matches as one pass."""
+
+    matcher = KeywordMatcher([(k, k) for k in ["pricing", "price", "ice"]])
+    text = "what is the pricing"
+
+    matches, state = [], KeywordMatcher.ROOT
+    for start in range(0, len(text), 4):
+        found, state = matcher.scan(text[start:start + 4], state, offset=start)
+        matches.extend(found)
+
+    assert matches == matcher.find_all(text)
+
+
+def test_matcher_positions_survive_expanding_lowercase():
+    """Characters whose lowercase form is longer do not shift match positions."""
+
+    matcher = KeywordMatcher([("emi", "emi")])
+    text = "İstanbul EMI"
+
+    assert matcher.find_all(text) == [(9, 12, "emi")]
+    assert text[9:12] == "EMI"
+
+
+def test_incremental_scan_follows_growing_and_revised_hypotheses():
+    """Extended or revised hypotheses leave the same matches as a full scan."""
+
+    rng = random.Random(5)
+    matcher = KeywordMatcher([(k, k) for k in ["ab", "bca", "c", "abc a"]])
+    for _ in range(100):
+        scan = IncrementalScan(matcher)
+        text = ""
+        for _ in range(8):
+            keep = rng.randint(0, len(text))  # revise the tail sometimes
+            text = text[:keep] + "".join(rng.choice("abc ") for _ in range(rng.randint(0, 4)))
+            scan.update(text)
+
+            assert sorted(scan.matches) == sorted(matcher.find_all(text))
+
+
+def test_index_answers_from_partial_scan():
+    """An FAQ answer is available while the sentence is still arriving."""
+
+    index = KBIndex({"faq": {"price": "short", "price list": "long"}})
+    scan = index.scan()
+
+    scan.update("send me the pri")
+    assert index.answer(scan.matches) is None
+    scan.update("send me the price")
+    assert index.answer(scan.matches) == "short"
+    scan.update("send me the price list")
+    assert index.answer(scan.matches) == "long"
+
+
+def test_router_prefers_longest_keyword():
+    """Without weights, the longest matching keyword wins."""
+
+    index = KBIndex({"faq": {"price": "short", "price list": "long"}})
+
+    assert index.route("send me the price list") == "long"
+    assert index.route("what's the price") == "short"
+    assert index.route("hello") is None
+    assert index.route("") is None
+
+
+def test_router_weight_and_aliases():
+    """Explicit weight outranks length; aliases route to their entry."""
+
+    index = KBIndex(
+        {
+            "faq": {
+                "installation process": "install",
+                "token": {"answer": "token", "weight": 5, "aliases": ["advance"]},
+            }
+        }
+    )
+
+    assert index.route("token for the installation process?") == "token"
+    assert index.route("Is the ADVANCE refundable?") == "token"
+
+
+def test_index_rejects_scalar_aliases():
+    """A single alias string is an error, not a list of characters."""
+
+    with pytest.raises(ValueError, match="aliases"):
+        KBIndex({"faq": {"token": {"answer": "token", "aliases": "advance"}}})
+
+
+def test_default_router_uses_knowledge_base():
+    """The default router answers from the bundled knowledge base."""
+
+    assert "consultation" in kb_manager.current.router.route("What is your process?")
@@ -0,0 +1,97 @@
+"""
+Tests for phone normalization and lead resolution.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from mn_ai_voice.app.db.leads import resolve_lead, resolve_statement
+from mn_ai_voice.app.db.models import Base, Lead, LeadSnapshot
+from mn_ai_voice.app.engine.phone import normalize_phone
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "+919876543210",
+        "+91 98765 43210",
+        "+91-98765-43210",
+        "+91 (0) 98765 43210",
+        "0091 98765 43210",
+        "098765 43210",
+        "9876543210",
+        "919876543210",
+    ],
+)
+def test_normalize_phone_to_e164(raw):
+    """Common ways of writing one number give the same E.164 string."""
+    assert normalize_phone(raw, country_code="91", national_length=10) == "+919876543210"
+
+
+def test_normalize_phone_keeps_foreign_numbers():
+    """Numbers with an international prefix keep their country code."""
+    assert normalize_phone("+1 (415) 555-0123", country_code="91") == "+14155550123"
+
+
+@pytest.mark.parametrize("raw", ["", "12345", "+91 98765 4321x", "+1234567890123456"])
+def test_normalize_phone_rejects_non_numbers(raw):
+    """Text that is not a dialable number is rejected."""
+    with pytest.raises(ValueError):
+        normalize_phone(raw, country_code="91")
+
+
+def test_resolve_lead_creates_once(tmp_path):
+    """The first resolution creates lead and snapshot; later ones find them."""
+    path = tmp_path / "leads.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(bind=engine)  # pylint: disable=invalid-name
+
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda *args: statements.append(args[2]),
+    )
+
+    async def resolve(lead_id):
+        async with Session() as db:
+            result = await resolve_lead(db, lead_id, "+919876543210")
+            await db.commit()
+            return result
+
+    async def scenario():
+        first = await resolve("l_first")
+        second = await resolve("l_second")
+        async with Session() as db:
+            leads = await db.scalar(select(func.count()).select_from(Lead))
+            snapshots = await db.scalar(select(func.count()).select_from(LeadSnapshot))
+        await engine.dispose()
+        return first, second, leads, snapshots
+
+    first, second, leads, snapshots = asyncio.run(scenario())
+
+    assert first == ("l_first", True)
+    assert second == ("l_first", False)
+    assert (leads, snapshots) == (1, 1)
+    # New phone: insert lead, insert snapshot; known phone: insert, select
+    assert [sql.split()[:3] for sql in statements[:4]] == [
+        ["INSERT", "INTO", "leads"],
+        ["INSERT", "INTO", "lead_snapshot"],
+        ["INSERT", "INTO", "leads"],
+        ["SELECT", "leads.lead_id", "FROM"],
+    ]
+
+
+def test_postgres_resolution_is_one_statement():
+    """On Postgres, lead, snapshot and lookup compile to one statement."""
+    sql = str(resolve_statement("l_1", "+919876543210").compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("WITH new_lead AS")
+    assert "ON CONFLICT (primary_phone) DO NOTHING RETURNING leads.lead_id" in sql
+    assert "INSERT INTO lead_snapshot" in sql
+    assert "UNION ALL" in sql
@@ -0,0 +1,268 @@
+"""
+Tests for event ledger partitioning and archival.
+"""
+
+# pylint: disable=redefined-outer-name
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from mn_ai_voice.app.db.ledger import (
+    EventLedger,
+    Segment,
+    hot_cutoff,
+    partition_bounds,
+    partition_key,
+)
+from mn_ai_voice.app.db.models import Base, Call, Event
+from mn_ai_voice.app.workers.ledger_archiver import LedgerArchiver
+
+NOW = datetime(2026, 10, 17, 12, 0)
+
+
+@pytest.fixture()
+def db_path(tmp_path):
+    """SQLite database file, outside the archive directory."""
+    return tmp_path.parent / f"{tmp_path.name}.db"
+
+
+@pytest.fixture()
+def db_session(db_path):
+    """SQLite session with two calls spanning three months of events."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    session.add_all([Call(call_id="c_1"), Call(call_id="c_2")])
+    for i, (call_id, ts) in enumerate(
+        [
+            ("c_1", datetime(2026, 7, 3)),
+            ("c_2", datetime(2026, 7, 9)),
+            ("c_1", datetime(2026, 8, 1)),
+            ("c_1", datetime(2026, 9, 30)),
+            ("c_2", datetime(2026, 10, 2)),
+            ("c_1", datetime(2026, 10, 16)),
+        ],
+        start=1,
+    ):
+        session.add(
+            Event(
+                event_id=i,
+                call_id=call_id,
+                type="user_turn",
+                payload_json={"n": i},
+                created_at=ts,
+            )
+        )
+    session.commit()
+
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_partition_helpers():
+    """Partition keys and bounds line up for months and days."""
+
+    assert partition_key(NOW, "month") == "2026-10"
+    assert partition_key(NOW, "day") == "2026-10-17"
+    assert partition_bounds("2026-12") == (datetime(2026, 12, 1), datetime(2027, 1, 1))
+    assert partition_bounds("2026-10-17") == (
+        datetime(2026, 10, 17),
+        datetime(2026, 10, 18),
+    )
+    assert hot_cutoff(NOW, "month", 2) == datetime(2026, 9, 1)
+
+
+def test_archiver_moves_cold_partitions(db_session, tmp_path):
+    """Partitions before the hot window leave the events table."""
+
+    archiver = LedgerArchiver(archive_dir=tmp_path, granularity="month", hot_partitions=2)
+    segments = archiver.run(db_session, now=NOW)
+
+    assert [s.partition for s in segments] == ["2026-07", "2026-08"]
+    assert [s.rows for s in segments] == [2, 1]
+    assert sorted(e.event_id for e in db_session.query(Event)) == [4, 5, 6]
+
+    # Nothing left to archive on a second run
+    assert archiver.run(db_session, now=NOW) == []
+
+
+def test_reader_spans_archive_and_hot_table(db_session, tmp_path):
+    """EventLedger returns archived and hot events in order."""
+
+    LedgerArchiver(archive_dir=tmp_path, hot_partitions=2).run(db_session, now=NOW)
+    ledger = EventLedger(tmp_path)
+
+    events = list(ledger.iter_call_events(db_session, "c_1"))
+    assert [e.event_id for e in events] == [1, 3, 4, 6]
+    assert events[0].payload_json == {"n": 1}
+    assert events[0].created_at == datetime(2026, 7, 3)
+
+    resumed = ledger.iter_call_events(db_session, "c_1", since_event_id=3)
+    assert [e.event_id for e in resumed] == [4, 6]
+
+
+def test_rerun_after_interrupted_delete(db_session, tmp_path):
+    """An existing segment is reused and its rows are not read twice."""
+
+    archiver = LedgerArchiver(archive_dir=tmp_path, hot_partitions=2)
+    archiver.run(db_session, now=NOW)
+
+    # Simulate a crash between writing the segment and deleting rows
+    db_session.add(
+        Event(
+            event_id=2,
+            call_id="c_2",
+            type="user_turn",
+            payload_json={"n": 2},
+            created_at=datetime(2026, 7, 9),
+        )
+    )
+    db_session.commit()
+
+    ledger = EventLedger(tmp_path)
+    assert [e.event_id for e in ledger.iter_call_events(db_session, "c_2")] == [2, 5]
+
+    archiver.run(db_session, now=NOW)
+    assert db_session.get(Event, 2) is None
+
+
+def test_late_rows_go_to_follow_up_segment(db_session, tmp_path):
+    """
+    Rows reaching an archived partition later (even with lower ids)
+    are appended as a follow-up segment instead of blocking the run.
+    """
+
+    archiver = LedgerArchiver(archive_dir=tmp_path, hot_partitions=2)
+    archiver.run(db_session, now=NOW)
+
+    db_session.add_all(
+        [
+            Event(event_id=0, call_id="c_1", type="user_turn", created_at=datetime(2026, 7, 5)),
+            Event(event_id=7, call_id="c_2", type="user_turn", created_at=datetime(2026, 8, 2)),
+        ]
+    )
+    db_session.commit()
+
+    segments = archiver.run(db_session, now=NOW)
+
+    assert [(s.partition, s.sequence, s.rows) for s in segments] == [
+        ("2026-07", 1, 1),
+        ("2026-08", 1, 1),
+    ]
+    assert sorted(e.event_id for e in db_session.query(Event)) == [4, 5, 6]
+
+    ledger = EventLedger(tmp_path)
+    assert [e.event_id for e in ledger.iter_call_events(db_session, "c_1")] == [0, 1, 3, 4, 6]
+    assert [e.event_id for e in ledger.iter_call_events(db_session, "c_2")] == [2, 5, 7]
+
+
+def test_archiver_reads_only_members_covering_hot_ids(db_session, tmp_path, monkeypatch):
+    """Existing segments are consulted through the index, not decompressed."""
+
+    archiver = LedgerArchiver(archive_dir=tmp_path, hot_partitions=2)
+    archiver.run(db_session, now=NOW)
+
+    read = []
+    real_iter_call = Segment.iter_call
+
+    def recording_iter_call(self, call_id):
+        read.append((self.partition, call_id))
+        return real_iter_call(self, call_id)
+
+    monkeypatch.setattr(Segment, "iter_events", None)
+    monkeypatch.setattr(Segment, "iter_call", recording_iter_call)
+    db_session.add_all(
+        [
+            # Below c_1's archived range: new without reading the segment
+            Event(event_id=0, call_id="c_1", type="user_turn", created_at=datetime(2026, 7, 5)),
+            # Archived but left behind by an interrupted delete
+            Event(event_id=2, call_id="c_2", type="user_turn", created_at=datetime(2026, 7, 9)),
+        ]
+    )
+    db_session.commit()
+
+    [segment] = archiver.run(db_session, now=NOW)
+
+    assert (segment.sequence, segment.rows) == (1, 1)
+    assert read == [("2026-07", "c_2")]
+    assert db_session.get(Event, 2) is None
+
+
+def test_rows_committed_after_scan_are_not_deleted(db_session, tmp_path, monkeypatch):
+    """Only ids written to the segment are deleted, never a later lower id."""
+
+    # pylint: disable=import-outside-toplevel
+    from mn_ai_voice.app.workers import ledger_archiver
+
+    real_write = ledger_archiver.write_segment
+
+    def write_then_commit_late_row(*args, **kwargs):
+        segment = real_write(*args, **kwargs)
+        late = sessionmaker(bind=db_session.get_bind())()
+        late.add(
+            Event(event_id=0, call_id="c_1", type="user_turn", created_at=datetime(2026, 7, 4))
+        )
+        late.commit()
+        late.close()
+        return segment
+
+    monkeypatch.setattr(ledger_archiver, "write_segment", write_then_commit_late_row)
+    archiver = LedgerArchiver(archive_dir=tmp_path, hot_partitions=2)
+    archiver.archive_partition(db_session, "2026-07")
+
+    assert db_session.get(Event, 0) is not None
+    assert [e.event_id for e in EventLedger(tmp_path).iter_call_events(db_session, "c_1")][:2] == [0, 1]
+
+
+def test_reader_keeps_rows_archived_during_the_read(db_session, db_path, tmp_path, monkeypatch):
+    """An archiver run between the hot read and the segment listing loses nothing."""
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    ledger = EventLedger(tmp_path)
+    real_segments = ledger.catalog.segments
+
+    def list_then_archive():
+        segments = real_segments()
+        with sessionmaker(bind=engine)() as other:
+            LedgerArchiver(archive_dir=tmp_path, hot_partitions=2).run(other, now=NOW)
+        return segments
+
+    monkeypatch.setattr(ledger.catalog, "segments", list_then_archive)
+    with sessionmaker(bind=engine)() as reader:
+        events = [e.event_id for e in ledger.iter_call_events(reader, "c_1")]
+
+    assert events == [1, 3, 4, 6]
+    assert db_session.get(Event, 1) is None
+
+
+def test_async_reader_matches_sync_reader(db_session, db_path, tmp_path):
+    """aiter_call_events merges archive and hot rows like iter_call_events."""
+
+    LedgerArchiver(archive_dir=tmp_path, hot_partitions=2).run(db_session, now=NOW)
+    # A hot row that is also archived (interrupted delete) is read once.
+    db_session.add(
+        Event(event_id=1, call_id="c_1", type="user_turn", created_at=datetime(2026, 7, 3))
+    )
+    db_session.commit()
+    ledger = EventLedger(tmp_path)
+
+    async def read(since=None):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        async with AsyncSession(engine) as db:
+            events = [e async for e in ledger.aiter_call_events(db, "c_1", since, batch_size=1)]
+        await engine.dispose()
+        return events
+
+    assert asyncio.run(read()) == list(ledger.iter_call_events(db_session, "c_1"))
+    assert [e.event_id for e in asyncio.run(read())] == [1, 3, 4, 6]
+    assert [e.event_id for e in asyncio.run(read(since=3))] == [4, 6]
@@ -0,0 +1,91 @@
+"""
+Tests for structured logging and the turn timer.
+"""
+
+import io
+import json
+import logging
+import queue
+
+from mn_ai_voice.app.core.logging import (
+    ContextFilter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+    configure_logging,
+    log_context,
+    shutdown_logging,
+)
+from mn_ai_voice.app.core.metrics import LOG_RECORDS_DROPPED
+from mn_ai_voice.app.core.timing import TurnTimer
+
+
+def test_records_are_json_with_context_and_extras():
+    """Records carry the call/turn context and extra fields as JSON keys."""
+
+    stream = io.StringIO()
+    configure_logging(level="INFO", sample_rate=1.0, stream=stream)
+    try:
+        log = logging.getLogger("mn_ai_voice.test")
+        with log_context(call_id="c_1", turn_id="t_1"):
+            log.info("turn %s", "handled", extra={"stages_ms": {"commit": 1.5}})
+        log.info("outside")
+    finally:
+        shutdown_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    first, second = lines
+    assert first["message"] == "turn handled"
+    assert first["level"] == "INFO"
+    assert first["logger"] == "mn_ai_voice.test"
+    assert (first["call_id"], first["turn_id"]) == ("c_1", "t_1")
+    assert first["stages_ms"] == {"commit": 1.5}
+    assert second["call_id"] is None and second["message"] == "outside"
+
+
+def test_sampling_keeps_whole_turns_and_all_warnings():
+    """Sampling is decided per turn; WARNING and above are always kept."""
+
+    sampler = SamplingFilter(0.5)
+    stamp = ContextFilter()
+
+    def kept(level, turn_id, msg="x"):
+        record = logging.makeLogRecord({"levelno": level, "msg": msg})
+        with log_context(call_id="c_1", turn_id=turn_id):
+            stamp.filter(record)
+        return sampler.filter(record)
+
+    decisions = [kept(logging.INFO, f"t_{i}") for i in range(200)]
+    assert 50 < sum(decisions) < 150
+    assert all(kept(logging.DEBUG, f"t_{i}", "other") == d for i, d in enumerate(decisions))
+    assert all(kept(logging.WARNING, f"t_{i}") for i in range(200))
+
+    assert not SamplingFilter(0.0).filter(logging.makeLogRecord({"levelno": logging.INFO}))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    """A full logging queue drops (and counts) records."""
+
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    before = LOG_RECORDS_DROPPED._value.get()  # pylint: disable=protected-access
+
+    for i in range(3):
+        handler.handle(logging.makeLogRecord({"msg": "n=%d", "args": (i,)}))
+
+    assert handler.queue.get_nowait().msg == "n=0"
+    assert LOG_RECORDS_DROPPED._value.get() - before == 2  # pylint: disable=protected-access
+
+
+def test_turn_timer_accumulates_stages():
+    """Repeated stages add up; as_ms reports milliseconds."""
+
+    timer = TurnTimer()
+    with timer.stage("db_load"):
+        pass
+    timer.add("db_load", 0.002)
+    timer.add("commit", 0.0005)
+
+    ms = timer.as_ms()
+    assert set(ms) == {"db_load", "commit"}
+    assert ms["db_load"] >= 2.0
+    assert ms["commit"] == 0.5
+    assert timer.elapsed() >= 0
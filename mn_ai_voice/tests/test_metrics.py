@@ -0,0 +1,40 @@
+"""
+Tests for metric exposition.
+"""
+
+import os
+import subprocess
+import sys
+
+from prometheus_client.core import GaugeMetricFamily
+
+from mn_ai_voice.app.core.metrics import render
+
+
+def test_render_appends_scrape_time_families():
+    """Families computed at scrape time follow the registered metrics."""
+
+    text = render([GaugeMetricFamily("test_backlog", "Backlog.", 7)]).decode()
+
+    assert "# TYPE call_turns_total counter" in text
+    assert text.rstrip().endswith("test_backlog 7.0")
+
+
+def test_multiprocess_mode_merges_worker_processes(tmp_path):
+    """With PROMETHEUS_MULTIPROC_DIR set, render() sums every process's samples."""
+
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    def run(code):
+        return subprocess.run(
+            [sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True
+        ).stdout
+
+    for _ in range(2):
+        run(
+            "from mn_ai_voice.app.core.metrics import TURNS_HANDLED\n"
+            "TURNS_HANDLED.labels('faq').inc(2)"
+        )
+    text = run("from mn_ai_voice.app.core.metrics import render\nprint(render().decode())")
+
+    assert 'call_turns_total{path="faq"} 4.0' in text
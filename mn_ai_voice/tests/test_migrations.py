@@ -0,0 +1,111 @@
+"""
+Tests for the Alembic migration set.
+
+Ensures migrations apply cleanly and stay in sync with the ORM models.
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from mn_ai_voice.app.db.models import Base
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _alembic_config(url: str) -> Config:
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def test_upgrade_head_matches_models(tmp_path):
+    """Upgrading to head produces exactly the schema the models declare."""
+
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    command.upgrade(_alembic_config(url), "head")
+
+    engine = create_engine(url)
+    with engine.connect() as connection:
+        diff = compare_metadata(
+            MigrationContext.configure(connection),
+            Base.metadata,
+        )
+
+    assert diff == []
+
+
+def test_event_indexes_created(tmp_path):
+    """The events ledger has composite indexes for its access paths."""
+
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    command.upgrade(_alembic_config(url), "head")
+
+    indexes = {
+        ix["name"]: ix["column_names"]
+        for ix in inspect(create_engine(url)).get_indexes("events")
+    }
+
+    assert indexes["ix_events_call_id_event_id"] == ["call_id", "event_id"]
+    assert indexes["ix_events_call_id_type_event_id"] == [
+        "call_id", "type", "event_id",
+    ]
+    assert indexes["ix_events_type_created_at"] == ["type", "created_at"]
+
+
+def test_downgrade_to_base(tmp_path):
+    """Every migration can be reverted."""
+
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    config = _alembic_config(url)
+    command.upgrade(config, "head")
+    command.downgrade(config, "base")
+
+    assert inspect(create_engine(url)).get_table_names() == ["alembic_version"]
+
+
+def test_lead_phones_are_normalized_and_merged(tmp_path):
+    """Leads stored under other formats of one number become one E.164 lead."""
+
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    config = _alembic_config(url)
+    command.upgrade(config, "0009")
+
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        for statement in [
+            "INSERT INTO leads (lead_id, primary_phone, created_at) VALUES "
+            "('l_old', '+91 98765 43210', '2026-01-01'), "
+            "('l_new', '098765-43210', '2026-02-01'), "
+            "('l_raw', '9000000001', '2026-01-01'), "
+            "('l_bad', 'n/a', '2026-01-01')",
+            "INSERT INTO lead_snapshot (lead_id, budget_band, qualification_reasons, updated_at) "
+            "VALUES ('l_old', 'unknown', '[]', '2026-01-01'), "
+            "('l_new', 'above_9L', '[]', '2026-02-01')",
+            "INSERT INTO calls (call_id, lead_id, direction) VALUES "
+            "('c_old', 'l_old', 'inbound'), ('c_new', 'l_new', 'inbound')",
+            "INSERT INTO qualification_stats VALUES "
+            "('unknown', 'unknown', 'unknown', 1), ('unknown', 'unknown', 'above_9L', 1)",
+        ]:
+            connection.execute(text(statement))
+
+    command.upgrade(config, "head")
+
+    with engine.connect() as connection:
+        leads = dict(connection.execute(text("SELECT lead_id, primary_phone FROM leads")).all())
+        snapshots = connection.execute(
+            text("SELECT lead_id, budget_band FROM lead_snapshot")
+        ).all()
+        calls = connection.execute(text("SELECT DISTINCT lead_id FROM calls")).all()
+        stats = dict(
+            connection.execute(text("SELECT budget_band, leads FROM qualification_stats")).all()
+        )
+
+    assert leads == {"l_old": "+919876543210", "l_raw": "+919000000001", "l_bad": "n/a"}
+    assert snapshots == [("l_old", "above_9L")]
+    assert calls == [("l_old",)]
+    assert stats == {"unknown": 0, "above_9L": 1}
@@ -0,0 +1,438 @@
+"""
+Tests for the CRM outbox dispatcher.
+
+Runs workers against a temporary SQLite database and a local fake
+CRM HTTP server.
+"""
+
+# pylint: disable=redefined-outer-name,invalid-name
+
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from mn_ai_voice.app.db.models import Base, Call, CRMOutbox, Lead
+from mn_ai_voice.app.tools.crm_tool import HTTPCRMClient
+from mn_ai_voice.app.tools.rate_limiter import RateLimiter
+from mn_ai_voice.app.workers.outbox_worker import (
+    OutboxItem,
+    OutboxWorker,
+    backoff_seconds,
+    coalesce,
+    utcnow,
+)
+
+
+class FakeCRM(ThreadingHTTPServer):
+    """
+    Records every request; /<action> paths listed in `status` fail,
+    with a Retry-After header if listed in `retry_after`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeCRMHandler)
+        self.requests = []
+        self.status = {}
+        self.retry_after = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        """Base URL of the server."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FakeCRMHandler(BaseHTTPRequestHandler):
+    """Handles one fake CRM request."""
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Record the request and answer with the configured status."""
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.requests.append(
+                (self.path, self.headers["Idempotency-Key"], json.loads(body))
+            )
+        status = self.server.status.get(self.path, 200)
+        self.send_response(status)
+        if self.path in self.server.retry_after:
+            self.send_header("Retry-After", str(self.server.retry_after[self.path]))
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep test output quiet."""
+
+
+@pytest.fixture()
+def crm():
+    """Fake CRM server running in a background thread."""
+    server = FakeCRM()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def db_url(tmp_path):
+    """SQLite database with the schema, two leads and one call."""
+    url = f"sqlite:///{tmp_path / 'outbox.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([Lead(lead_id="l_1", primary_phone="1"), Lead(lead_id="l_2", primary_phone="2")])
+        db.add(Call(call_id="c_1", current_state="CLOSE"))
+        db.commit()
+    return url
+
+
+def Session(url):
+    """Session factory with its own engine, as a separate process would have."""
+    return sessionmaker(bind=create_engine(url, connect_args={"timeout": 30}))
+
+
+def enqueue(url, n, action="append_note", lead_id=None):
+    """Insert n pending outbox rows."""
+    with Session(url)() as db:
+        db.add_all(
+            CRMOutbox(
+                call_id="c_1",
+                lead_id=lead_id,
+                action=action,
+                payload_json={"n": i},
+                idempotency_key=f"{action}:{lead_id}:{i}" if lead_id else f"{action}:{i}",
+            )
+            for i in range(n)
+        )
+        db.commit()
+
+
+def rows(url):
+    """All outbox rows, by id."""
+    with Session(url)() as db:
+        return db.query(CRMOutbox).order_by(CRMOutbox.outbox_id).all()
+
+
+def make_worker(url, crm, **kwargs):
+    """Worker wired to the fake CRM, unthrottled unless given a limiter."""
+    kwargs.setdefault("rate_limiter", RateLimiter({}))
+    return OutboxWorker(Session(url), HTTPCRMClient(base_url=crm.url), **kwargs)
+
+
+def test_pending_rows_are_delivered(db_url, crm):
+    """A batch is delivered with its idempotency keys and marked success."""
+
+    enqueue(db_url, 3)
+    worker = make_worker(db_url, crm, batch_size=10)
+
+    result = worker.run_once()
+    worker.close()
+
+    assert (result.leased, result.delivered) == (3, 3)
+    assert sorted(key for _, key, _ in crm.requests) == [
+        "append_note:0", "append_note:1", "append_note:2",
+    ]
+    assert crm.requests[0][0] == "/append_note"
+    for row in rows(db_url):
+        assert (row.status, row.attempts, row.locked_by) == ("success", 1, None)
+
+
+def lag_observations():
+    """Samples recorded so far in the delivery lag histogram."""
+    return REGISTRY.get_sample_value("crm_outbox_delivery_lag_seconds_count") or 0
+
+
+def test_delivery_lag_is_observed(db_url, crm):
+    """Delivered rows record their enqueue-to-delivery lag; failures do not."""
+
+    enqueue(db_url, 3)
+    crm.status["/append_note"] = 503
+    before = lag_observations()
+
+    worker = make_worker(db_url, crm, batch_size=10)
+    worker.run_once()
+    assert lag_observations() == before
+
+    crm.status.clear()
+    with Session(db_url)() as db:
+        db.query(CRMOutbox).update({"next_attempt_at": utcnow()})
+        db.commit()
+    worker.run_once()
+    worker.close()
+
+    assert lag_observations() - before == 3
+
+
+def test_failures_are_recorded(db_url, crm):
+    """Retryable errors are rescheduled; permanent errors are dead-lettered."""
+
+    enqueue(db_url, 1, action="set_stage")
+    enqueue(db_url, 1, action="upsert_lead")
+    crm.status = {"/set_stage": 503, "/upsert_lead": 422}
+    worker = make_worker(db_url, crm)
+
+    before = utcnow()
+    result = worker.run_once()
+    worker.close()
+
+    assert (result.retrying, result.dead) == (1, 1)
+    retry, dead = rows(db_url)
+    assert (retry.status, retry.attempts) == ("pending", 1)
+    assert retry.last_error.startswith("HTTP 503")
+    assert retry.next_attempt_at >= before + timedelta(seconds=2.5)
+    assert (dead.status, dead.attempts) == ("dead", 1)
+    assert retry.locked_until is None and dead.locked_until is None
+
+
+def test_backoff_is_exponential_with_jitter():
+    """Delays double per attempt, stay within [d/2, d] and are capped."""
+
+    assert backoff_seconds(1, 5, 3600, rng=lambda: 1.0) == 5
+    assert backoff_seconds(3, 5, 3600, rng=lambda: 1.0) == 20
+    assert backoff_seconds(3, 5, 3600, rng=lambda: 0.0) == 10
+    assert backoff_seconds(20, 5, 3600, rng=lambda: 1.0) == 3600
+
+
+def test_retry_waits_for_backoff_then_dead_letters(db_url, crm):
+    """A row is retried only once due, and dies after max_attempts."""
+
+    enqueue(db_url, 1)
+    crm.status = {"/append_note": 500}
+    now = [utcnow()]
+    worker = make_worker(db_url, crm, max_attempts=3, clock=lambda: now[0])
+
+    assert worker.run_once().retrying == 1
+    assert worker.run_once().leased == 0  # backing off
+
+    now[0] += timedelta(hours=2)
+    assert worker.run_once().retrying == 1
+
+    now[0] += timedelta(hours=2)
+    assert worker.run_once().dead == 1
+
+    now[0] += timedelta(days=1)
+    assert worker.run_once().leased == 0
+    worker.close()
+
+    (row,) = rows(db_url)
+    assert (row.status, row.attempts) == ("dead", 3)
+    assert len(crm.requests) == 3
+
+
+def test_retry_after_extends_backoff(db_url, crm):
+    """A Retry-After longer than the backoff delay is honoured."""
+
+    enqueue(db_url, 1)
+    crm.status = {"/append_note": 429}
+    crm.retry_after = {"/append_note": 600}
+    worker = make_worker(db_url, crm)
+
+    before = utcnow()
+    assert worker.run_once().retrying == 1
+    worker.close()
+
+    (row,) = rows(db_url)
+    assert row.next_attempt_at >= before + timedelta(seconds=600)
+
+
+def test_leased_rows_are_invisible_until_lease_expires(db_url, crm):
+    """Another worker skips leased rows until the lease runs out."""
+
+    enqueue(db_url, 2)
+    first = make_worker(db_url, crm, lease_seconds=30)
+    with Session(db_url)() as db:
+        assert len(first.lease_batch(db)) == 2
+
+    second = make_worker(db_url, crm)
+    with Session(db_url)() as db:
+        assert second.lease_batch(db) == []
+
+    later = make_worker(db_url, crm, clock=lambda: utcnow() + timedelta(seconds=31))
+    with Session(db_url)() as db:
+        assert len(later.lease_batch(db)) == 2
+
+    for worker in (first, second, later):
+        worker.close()
+
+
+def test_stale_lease_holder_cannot_record(db_url, crm):
+    """Results from a worker whose lease was taken over are discarded."""
+
+    enqueue(db_url, 1)
+    stale = make_worker(db_url, crm, lease_seconds=1)
+    with Session(db_url)() as db:
+        items = stale.lease_batch(db)
+
+    thief = make_worker(db_url, crm, clock=lambda: utcnow() + timedelta(seconds=5))
+    assert thief.run_once().delivered == 1
+
+    with Session(db_url)() as db:
+        stale.record(db, stale.deliver(items))
+
+    (row,) = rows(db_url)
+    assert (row.status, row.attempts) == ("success", 1)
+    for worker in (stale, thief):
+        worker.close()
+
+
+def test_parallel_workers_deliver_each_row_once(db_url, crm):
+    """Several workers drain the queue together without double delivery."""
+
+    enqueue(db_url, 300)
+    workers = [make_worker(db_url, crm, batch_size=7, concurrency=4) for _ in range(4)]
+
+    def drain(worker):
+        while worker.run_once().leased:
+            pass
+
+    threads = [threading.Thread(target=drain, args=(w,)) for w in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for worker in workers:
+        worker.close()
+
+    keys = [key for _, key, _ in crm.requests]
+    assert len(keys) == 300
+    assert len(set(keys)) == 300
+    assert {row.status for row in rows(db_url)} == {"success"}
+
+
+def test_run_survives_database_errors(db_url, crm):
+    """A failed batch is logged and retried instead of ending the loop."""
+
+    enqueue(db_url, 2)
+    worker = make_worker(db_url, crm)
+    stop = threading.Event()
+    real_lease = worker.lease_batch
+    calls = []
+
+    def flaky_lease(db):
+        calls.append(1)
+        if len(calls) == 1:
+            raise OperationalError("SELECT", {}, Exception("database is locked"))
+        if len(calls) == 3:
+            stop.set()
+        return real_lease(db)
+
+    worker.lease_batch = flaky_lease
+    worker.run(stop, poll_interval=0)
+    worker.close()
+
+    assert {row.status for row in rows(db_url)} == {"success"}
+
+
+def _item(outbox_id, action, lead_id, **payload):
+    return OutboxItem(outbox_id, action, payload, f"{action}:{outbox_id}", lead_id=lead_id)
+
+
+def test_coalesce_merges_per_lead():
+    """Upserts merge newest-last, notes are batched, other rows pass through."""
+
+    items = [
+        _item(1, "upsert_lead", "l_1", stage="new", email="a@x.com"),
+        _item(2, "append_note", "l_1", text="one"),
+        _item(3, "set_stage", "l_1", stage="qualified"),
+        _item(4, "upsert_lead", "l_1", stage="qualified"),
+        _item(5, "append_note", "l_1", text="two"),
+        _item(6, "append_note", "l_1", text="three"),
+        _item(7, "append_note", "l_2", text="other lead"),
+        _item(8, "append_note", None, text="no lead"),
+    ]
+
+    requests = coalesce(items, max_notes=2)
+
+    assert [(r.action, [i.outbox_id for i in r.items]) for r in requests] == [
+        ("upsert_lead", [1, 4]),
+        ("append_notes", [2, 5]),
+        ("set_stage", [3]),
+        ("append_note", [6]),
+        ("append_note", [7]),
+        ("append_note", [8]),
+    ]
+    upsert, notes = requests[0], requests[1]
+    assert upsert.payload == {"stage": "qualified", "email": "a@x.com"}
+    assert notes.payload == {
+        "lead_id": "l_1",
+        "notes": [
+            {"idempotency_key": "append_note:2", "text": "one"},
+            {"idempotency_key": "append_note:5", "text": "two"},
+        ],
+    }
+    assert requests[3].idempotency_key == "append_note:6"
+
+
+def test_coalesced_keys_are_stable():
+    """The same rows always produce the same request key."""
+
+    items = [_item(i, "append_note", "l_1") for i in range(3)]
+
+    first = coalesce(items, max_notes=10)[0].idempotency_key
+    again = coalesce(list(reversed(items)), max_notes=10)[0].idempotency_key
+    more = coalesce(items + [_item(9, "append_note", "l_1")], max_notes=10)[0].idempotency_key
+
+    assert first == again
+    assert first.startswith("append_notes:")
+    assert more != first
+
+
+def test_chatty_lead_is_delivered_in_few_requests(db_url, crm):
+    """A lead's backlog goes out as one upsert and one bulk note request."""
+
+    enqueue(db_url, 10, action="upsert_lead", lead_id="l_1")
+    enqueue(db_url, 10, action="append_note", lead_id="l_1")
+    worker = make_worker(db_url, crm, batch_size=10)
+
+    result = worker.run_once()
+    worker.close()
+
+    # The lease pulled in the lead's other due rows.
+    assert (result.leased, result.requests, result.delivered) == (20, 2, 20)
+    paths = sorted(path for path, _, _ in crm.requests)
+    assert paths == ["/append_notes", "/upsert_lead"]
+    body = next(b for path, _, b in crm.requests if path == "/append_notes")
+    assert [note["idempotency_key"] for note in body["notes"]] == [
+        f"append_note:l_1:{i}" for i in range(10)
+    ]
+    assert {row.status for row in rows(db_url)} == {"success"}
+
+
+def test_failed_bulk_request_reschedules_every_row(db_url, crm):
+    """All rows covered by a failed request share its outcome."""
+
+    enqueue(db_url, 3, lead_id="l_1")
+    crm.status = {"/append_notes": 503}
+    worker = make_worker(db_url, crm)
+
+    result = worker.run_once()
+    worker.close()
+
+    assert (result.requests, result.retrying) == (1, 3)
+    assert {(row.status, row.attempts) for row in rows(db_url)} == {("pending", 1)}
+
+
+def test_coalescing_can_be_disabled(db_url, crm):
+    """Without coalescing every row is its own request."""
+
+    enqueue(db_url, 3, lead_id="l_1")
+    worker = make_worker(db_url, crm, coalesce=False)
+
+    result = worker.run_once()
+    worker.close()
+
+    assert (result.leased, result.requests) == (3, 3)
+    assert {path for path, _, _ in crm.requests} == {"/append_note"}
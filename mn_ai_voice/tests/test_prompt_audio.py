@@ -0,0 +1,106 @@
+"""
+Tests for the pre-synthesized prompt audio cache.
+"""
+
+from mn_ai_voice.app.engine.prompt_audio import PromptAudioCache, audio_key
+from mn_ai_voice.app.engine.prompt_templates import PromptRenderer
+from mn_ai_voice.app.tools.tts_tool import StubTTSBackend, TTSError
+
+
+class FailingBackend:  # pylint: disable=too-few-public-methods
+    """TTS backend that always fails."""
+
+    def synthesize(self, text, language, voice):
+        """Raise like an unavailable service."""
+        raise TTSError("down")
+
+
+def _cache(directory, backend=None, voice="default", languages=None):
+    return PromptAudioCache(
+        directory, backend or StubTTSBackend(), "en-IN", voice, languages=languages
+    )
+
+
+def test_warm_synthesizes_each_static_prompt_once(tmp_path):
+    """Every prompt is cached after warm(); a second warm() synthesizes nothing."""
+
+    backend = StubTTSBackend()
+    cache = _cache(tmp_path, backend)
+    prompts = PromptRenderer.static_prompts()
+
+    assert cache.warm(prompts) == len(prompts)
+    assert cache.warm(prompts) == len(prompts)
+    assert backend.calls == len(prompts)
+    assert all(cache.lookup(text) for text in prompts)
+
+
+def test_keys_address_text_language_and_voice(tmp_path):
+    """The key changes with any of text, language or voice."""
+
+    keys = {
+        audio_key("Hello", "en-IN", "a"),
+        audio_key("Hello", "hi-IN", "a"),
+        audio_key("Hello", "en-IN", "b"),
+        audio_key("Hello!", "en-IN", "a"),
+    }
+    assert len(keys) == 4
+
+    cache = _cache(tmp_path, voice="a")
+    key = cache.ensure("Hello")
+    assert key == audio_key("Hello", "en-IN", "a")
+    assert cache.path(key).is_file()
+
+
+def test_restart_maps_existing_files_without_synthesis(tmp_path):
+    """Files written by an earlier process are reused as they are."""
+
+    key = _cache(tmp_path).ensure("Which city are you in?")
+
+    backend = StubTTSBackend()
+    cache = _cache(tmp_path, backend)
+    cache.warm(["Which city are you in?"])
+
+    assert backend.calls == 0
+    view = cache.view(key)
+    assert view is not None
+    assert bytes(view[:4]) == b"RIFF"
+    assert view.nbytes == cache.path(key).stat().st_size
+    view.release()
+    cache.close()
+
+
+def test_uncached_text_has_no_key_and_failures_are_skipped(tmp_path):
+    """Lookups never synthesize; a failing backend leaves prompts uncached."""
+
+    cache = _cache(tmp_path, FailingBackend())
+
+    assert cache.warm(["Hello"]) == 0
+    assert cache.lookup("Hello") is None
+    assert cache.view(audio_key("Hello", "en-IN", "default")) is None
+
+
+def test_warm_and_lookup_per_call_language(tmp_path):
+    """Prompts are cached in every mapped language and described in the call's."""
+
+    backend = StubTTSBackend()
+    cache = _cache(tmp_path, backend, languages={"hindi": "hi-IN", "hinglish": "hi-IN"})
+
+    assert cache.warm(["Hello"]) == 2
+    assert backend.calls == 2
+    assert cache.describe("Hello", "hindi")["audio_key"] == audio_key("Hello", "hi-IN", "default")
+    assert cache.describe("Hello", "unknown")["audio_key"] == audio_key("Hello", "en-IN", "default")
+    assert cache.describe("Hello")["audio_key"] == audio_key("Hello", "en-IN", "default")
+
+
+def test_view_maps_files_written_by_another_process(tmp_path):
+    """A key synthesized elsewhere is mapped on first view; unknown keys are not."""
+
+    key = _cache(tmp_path).ensure("Hello")
+    cache = _cache(tmp_path)
+
+    view = cache.view(key)
+    assert view is not None and bytes(view[:4]) == b"RIFF"
+    view.release()
+    assert cache.view("0" * 32) is None
+    assert cache.view("../../etc/passwd") is None
+    cache.close()
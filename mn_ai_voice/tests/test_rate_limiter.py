@@ -0,0 +1,83 @@
+"""
+Tests for the token-bucket rate limiter.
+"""
+
+import threading
+
+import pytest
+
+from mn_ai_voice.app.tools.rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleep()."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """Advance the clock."""
+        self.now += seconds
+
+
+def test_token_bucket_limits_rate():
+    """After the burst, tokens are granted at the configured rate."""
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+    for _ in range(12):
+        bucket.acquire()
+
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_acquire_terminates_despite_float_rounding():
+    """
+    Long runs at a fractional rate accumulate rounding error
+    (tokens like 0.9999999999999998); acquire must still return.
+    """
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+
+    done = threading.Event()
+
+    def run():
+        for _ in range(2_000):
+            bucket.acquire()
+        done.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=5)
+
+    assert done.is_set()
+    assert clock.now == pytest.approx(199.8)
+
+
+def test_try_acquire_treats_rounded_token_as_full():
+    """A bucket a rounding error short of one token grants it."""
+
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+    bucket.try_acquire()
+    bucket.try_acquire()
+
+    clock.now = 0.1 - 1e-17  # refills to ~0.9999999999999998 tokens
+    assert bucket.try_acquire() == 0
+
+
+def test_rate_limiter_is_per_action():
+    """Each action has its own bucket; unlisted actions are unlimited."""
+
+    limiter = RateLimiter({"upsert_lead": 1, "append_note": 1})
+    upsert = limiter.buckets["upsert_lead"]
+    note = limiter.buckets["append_note"]
+
+    assert upsert.try_acquire() == 0
+    assert upsert.try_acquire() > 0
+    assert note.try_acquire() == 0
+    limiter.acquire("set_stage")
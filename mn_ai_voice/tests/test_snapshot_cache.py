@@ -0,0 +1,223 @@
+"""
+Tests for the in-process LeadSnapshot cache.
+"""
+
+# pylint: disable=redefined-outer-name
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from mn_ai_voice.app.db.models import Base, Lead, LeadSnapshot
+from mn_ai_voice.app.db.snapshot_cache import SnapshotCache
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _snapshot(lead_id: str, **values) -> LeadSnapshot:
+    return LeadSnapshot(lead_id=lead_id, qualification_reasons=[], **values)
+
+
+def test_lru_eviction():
+    """The least recently used entry is evicted past max_size."""
+
+    cache = SnapshotCache(max_size=2, ttl_seconds=60)
+    cache.put(_snapshot("l_1"))
+    cache.put(_snapshot("l_2"))
+    assert cache.get("l_1") is not None  # l_2 is now least recent
+
+    cache.put(_snapshot("l_3"))
+
+    assert cache.get("l_2") is None
+    assert cache.get("l_1") is not None
+    assert cache.get("l_3") is not None
+
+
+def test_ttl_expiry_and_invalidate():
+    """Entries expire after the TTL and can be invalidated explicitly."""
+
+    clock = FakeClock()
+    cache = SnapshotCache(max_size=10, ttl_seconds=5, clock=clock)
+    cache.put(_snapshot("l_1"))
+    cache.put(_snapshot("l_2"))
+
+    clock.now = 6
+    assert cache.get("l_1") is None
+
+    cache.put(_snapshot("l_2"))
+    cache.invalidate("l_2")
+    assert cache.get("l_2") is None
+
+
+def test_cached_values_are_copies():
+    """Mutating a returned value never changes the cached entry."""
+
+    cache = SnapshotCache(max_size=10, ttl_seconds=60)
+    cache.put(_snapshot("l_1", qualification_status="nurture"))
+
+    cache.get("l_1")["qualification_reasons"].append("budget_below_min")
+
+    assert cache.get("l_1")["qualification_reasons"] == []
+
+
+def test_lock_serializes_same_lead():
+    """Turns for the same lead run one at a time; others run freely."""
+
+    cache = SnapshotCache(max_size=10, ttl_seconds=60)
+    order = []
+
+    async def turn(lead_id: str, name: str) -> bool:
+        async with cache.locked(lead_id) as contended:
+            order.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name}:end")
+            return contended
+
+    async def main():
+        return await asyncio.gather(
+            turn("l_1", "a"), turn("l_1", "b"), turn("l_2", "c")
+        )
+
+    contended = asyncio.run(main())
+
+    assert contended == [False, True, False]
+    assert order.index("a:end") < order.index("b:start")
+    assert order.index("c:start") < order.index("a:end")
+    assert not cache._locks  # pylint: disable=protected-access
+
+
+def test_generation_changes_on_commit_and_invalidate():
+    """Commits and invalidations move a lead's generation forward."""
+
+    cache = SnapshotCache(max_size=10, ttl_seconds=60)
+    assert cache.generation("l_1") is None
+
+    cache.committed(_snapshot("l_1"))
+    first = cache.generation("l_1")
+    cache.put(_snapshot("l_1"))  # a plain load is not a change
+    assert cache.generation("l_1") == first
+
+    cache.committed(_snapshot("l_1"))
+    second = cache.generation("l_1")
+    cache.invalidate("l_1")
+
+    assert first < second < cache.generation("l_1")
+
+
+def test_evicted_generation_is_untracked():
+    """A generation pushed out by newer leads reads as None, never reused."""
+
+    cache = SnapshotCache(max_size=1, ttl_seconds=60)
+    cache.committed(_snapshot("l_1"))
+    cache.committed(_snapshot("l_2"))
+
+    assert cache.generation("l_1") is None
+
+
+def test_track_starts_a_generation_once():
+    """Tracking an untracked lead gives it a generation; tracking again keeps it."""
+
+    cache = SnapshotCache(max_size=2, ttl_seconds=60)
+    first = cache.track("l_1")
+
+    assert cache.generation("l_1") == first
+    assert cache.track("l_1") == first
+    cache.invalidate("l_1")
+    assert cache.track("l_1") > first
+
+
+def test_seed_only_untracked_leads_without_drops():
+    """seed gives a first generation unless the lead is tracked or one was dropped."""
+
+    cache = SnapshotCache(max_size=1, ttl_seconds=60)
+    since = cache.counter()
+    seeded = cache.seed("l_1", since)
+
+    assert seeded is not None and cache.generation("l_1") == seeded
+    assert cache.seed("l_1", since) is None
+
+    since = cache.counter()
+    cache.committed(_snapshot("l_2"))  # pushes l_1 out after since
+    assert cache.seed("l_1", since) is None
+    assert cache.seed("l_1", cache.counter()) is not None
+
+
+def test_fill_keeps_values_committed_during_the_read():
+    """A snapshot read before a concurrent commit does not replace it."""
+
+    cache = SnapshotCache(max_size=10, ttl_seconds=60)
+    cache.committed(_snapshot("l_1"))
+    before = cache.generation("l_1")
+
+    # A turn commits while the read is in flight
+    cache.committed(_snapshot("l_1", budget_band="6_to_9L"))
+    cache.fill(_snapshot("l_1"), before)
+
+    assert cache.get("l_1")["budget_band"] == "6_to_9L"
+
+    cache.fill(_snapshot("l_2"), None)  # untracked: nothing to compare with
+    assert cache.get("l_2") is None
+
+
+@pytest.fixture()
+def db_url(tmp_path):
+    """SQLite file with one lead and its snapshot."""
+    path = tmp_path / "cache.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Lead.__table__.insert(), {"lead_id": "l_1", "primary_phone": "+91"})
+        conn.execute(
+            LeadSnapshot.__table__.insert(),
+            {"lead_id": "l_1", "qualification_reasons": []},
+        )
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def test_cache_hit_skips_select_and_writes_through(db_url):
+    """A hit attaches the snapshot without a SELECT; edits still persist."""
+
+    cache = SnapshotCache(max_size=10, ttl_seconds=60)
+    engine = create_async_engine(db_url)
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+    statements = []
+
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, *args: statements.append(stmt.split()[0]),
+    )
+
+    async def main():
+        async with Session() as db:
+            snapshot = await cache.load(db, "l_1")  # miss: SELECT
+            snapshot.budget_band = "6_to_9L"
+            await db.commit()
+            cache.put(snapshot)
+
+        statements.clear()
+        async with Session() as db:
+            snapshot = await cache.load(db, "l_1")  # hit: no SELECT
+            assert snapshot.budget_band == "6_to_9L"
+            snapshot.email = "a@b.com"
+            await db.commit()
+            hit_statements = list(statements)
+
+        async with Session() as db:
+            return hit_statements, await db.get(LeadSnapshot, "l_1")
+
+    hit_statements, stored = asyncio.run(main())
+
+    assert hit_statements == ["UPDATE"]
+    assert stored.email == "a@b.com"
+    assert stored.budget_band == "6_to_9L"
@@ -0,0 +1,209 @@
+"""
+Tests for the call summarizer, single-call and batch modes.
+"""
+
+# pylint: disable=redefined-outer-name
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from mn_ai_voice.app.core.config import settings
+from mn_ai_voice.app.db.models import (
+    Artifact,
+    Base,
+    Call,
+    CRMOutbox,
+    Lead,
+    LeadSnapshot,
+    TurnStat,
+)
+from mn_ai_voice.app.workers.summarizer import CallSummarizer
+from mn_ai_voice.app.workers.summary_trigger import SummaryTrigger
+
+
+@pytest.fixture()
+def url(tmp_path):
+    """SQLite database with the schema created."""
+    url = f"sqlite:///{tmp_path / 'summarizer.db'}"
+    Base.metadata.create_all(create_engine(url))
+    return url
+
+
+@pytest.fixture()
+def db(url):
+    """Session on the test database."""
+    with sessionmaker(bind=create_engine(url))() as session:
+        yield session
+
+
+def add_call(db, n, ended=True, snapshot=True):
+    """A lead (with snapshot) and one call for it."""
+    lead_id = f"l_{n:03d}"
+    db.add(Lead(lead_id=lead_id, primary_phone=f"+9199{n:08d}"))
+    if snapshot:
+        db.add(LeadSnapshot(lead_id=lead_id, region_value="NCR", budget_band="5-10L"))
+    db.add(
+        Call(
+            call_id=f"c_{n:03d}",
+            lead_id=lead_id,
+            ended_at=datetime.now(timezone.utc) if ended else None,
+        )
+    )
+    db.commit()
+
+
+def summaries(db):
+    """call_id -> summary text."""
+    return {
+        a.call_id: a.content_text
+        for a in db.query(Artifact).filter(Artifact.type == "summary")
+    }
+
+
+def test_run_batch_summarizes_ended_calls_across_pages(db):
+    """Every ended call with a snapshot is summarized once, page by page."""
+
+    for n in range(7):
+        add_call(db, n)
+    add_call(db, 7, ended=False)
+    add_call(db, 8, snapshot=False)
+
+    assert CallSummarizer().run_batch(db, page_size=3) == 7
+
+    assert sorted(summaries(db)) == [f"c_{n:03d}" for n in range(7)]
+    notes = db.query(CRMOutbox).order_by(CRMOutbox.call_id).all()
+    assert [o.idempotency_key for o in notes] == [f"crm_note:c_{n:03d}" for n in range(7)]
+    assert (notes[0].action, notes[0].status, notes[0].lead_id) == (
+        "append_note", "pending", "l_000",
+    )
+    assert notes[0].next_attempt_at is not None
+
+
+def test_run_batch_matches_single_call_mode(db):
+    """Batch and single-call modes produce the same artifact and note."""
+
+    add_call(db, 1)
+    add_call(db, 2)
+
+    summarizer = CallSummarizer()
+    summarizer.run(db, "c_001")
+    summarizer.run_batch(db)
+
+    texts = summaries(db)
+    # Identical apart from the phone line
+    assert texts["c_002"].splitlines()[1:] == texts["c_001"].splitlines()[1:]
+    one, two = db.query(CRMOutbox).order_by(CRMOutbox.call_id).all()
+    assert one.payload_json["summary"] == two.payload_json["summary"]
+
+
+def test_run_batch_is_idempotent(db):
+    """Summarized calls are skipped; an already queued note is not re-added."""
+
+    add_call(db, 1)
+    add_call(db, 2)
+    db.add(CRMOutbox(call_id="c_002", action="append_note", idempotency_key="crm_note:c_002"))
+    db.commit()
+
+    summarizer = CallSummarizer()
+    assert summarizer.run_batch(db) == 2
+    assert summarizer.run_batch(db) == 0
+
+    assert len(summaries(db)) == 2
+    assert db.query(CRMOutbox).count() == 2
+
+
+def test_trigger_catches_up_then_follows_ended_calls(url, db):
+    """On start the trigger summarizes missed calls, then queued ones."""
+
+    add_call(db, 1)
+    add_call(db, 2, ended=False)
+    trigger = SummaryTrigger(sessionmaker(bind=create_engine(url)), url)
+    trigger.committed("c_002")  # not started: dropped, catch-up covers it
+
+    async def main():
+        await trigger.start()
+        await asyncio.sleep(0)
+        db.get(Call, "c_002").ended_at = datetime.now(timezone.utc)
+        db.commit()
+        trigger.committed("c_002")
+        await trigger.join()
+        await trigger.stop()
+
+    asyncio.run(main())
+
+    db.expire_all()
+    assert sorted(summaries(db)) == ["c_001", "c_002"]
+
+
+def test_run_batch_skips_calls_summarized_concurrently(db, monkeypatch):
+    """A page another summarizer already wrote is skipped, not duplicated."""
+
+    add_call(db, 1)
+    add_call(db, 2)
+    summarizer = CallSummarizer()
+    summarizer.run(db, "c_001")
+
+    # As if the page was read before the other summarizer committed.
+    page = CallSummarizer._unsummarized_page  # pylint: disable=protected-access
+    monkeypatch.setattr(
+        CallSummarizer,
+        "_unsummarized_page",
+        lambda self, db, after, size: [db.get(Call, "c_001"), db.get(Call, "c_002")]
+        if after is None
+        else page(self, db, after, size),
+    )
+
+    assert summarizer.run_batch(db) == 1
+    assert sorted(summaries(db)) == ["c_001", "c_002"]
+    assert db.query(Artifact).count() == 2
+    assert db.query(CRMOutbox).count() == 2
+    assert db.get(TurnStat, 0).calls == 2
+
+
+class FakeListener:
+    """Stands in for the asyncpg LISTEN connection."""
+
+    def __init__(self, on_terminated):
+        self.on_terminated = on_terminated
+
+    async def close(self):
+        self.on_terminated(self)
+
+
+def test_trigger_reconnects_and_catches_up(url, db, monkeypatch):
+    """After the LISTEN connection drops, it is reopened and missed calls summarized."""
+
+    monkeypatch.setattr(settings, "SUMMARY_LISTEN_RETRY_SECONDS", 0.0)
+    trigger = SummaryTrigger(
+        sessionmaker(bind=create_engine(url)), "postgresql://db/mn_ai_voice"
+    )
+    attempts = []
+
+    async def listen():
+        attempts.append(len(attempts))
+        if len(attempts) == 2:
+            raise OSError("connection refused")  # database still restarting
+        # pylint: disable=protected-access
+        trigger._listener = FakeListener(trigger._on_terminated)
+
+    monkeypatch.setattr(trigger, "_listen", listen)
+
+    async def main():
+        await trigger.start()
+        await trigger.join()
+        add_call(db, 1)  # ends while the connection is down: never announced
+        trigger._on_terminated(trigger._listener)  # pylint: disable=protected-access
+        while len(attempts) < 3:
+            await asyncio.sleep(0.01)
+        await trigger.join()
+        await trigger.stop()
+
+    asyncio.run(main())
+
+    assert len(attempts) == 3
+    db.expire_all()
+    assert sorted(summaries(db)) == ["c_001"]
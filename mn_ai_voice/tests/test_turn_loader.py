@@ -0,0 +1,174 @@
+"""
+Tests for single-statement turn loading.
+
+Checks that load_turn matches the previous per-object lookups
+(replay, 404 and 500 paths) while issuing one statement.
+"""
+
+# pylint: disable=redefined-outer-name
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from mn_ai_voice.app.db.models import Base, Call, Lead, LeadSnapshot, TurnRecord
+from mn_ai_voice.app.db.snapshot_cache import SnapshotCache
+from mn_ai_voice.app.db.turn_loader import load_turn
+
+
+@pytest.fixture()
+def db_url(tmp_path):
+    """
+    SQLite file with:
+    - c_ok: call whose lead has a snapshot and one processed turn
+    - c_nosnap: call whose lead has no snapshot
+    """
+    path = tmp_path / "loader.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            Lead.__table__.insert(),
+            [
+                {"lead_id": "l_ok", "primary_phone": "+911"},
+                {"lead_id": "l_nosnap", "primary_phone": "+912"},
+            ],
+        )
+        conn.execute(
+            LeadSnapshot.__table__.insert(),
+            {"lead_id": "l_ok", "qualification_reasons": [], "budget_band": "6_to_9L"},
+        )
+        conn.execute(
+            Call.__table__.insert(),
+            [
+                {"call_id": "c_ok", "lead_id": "l_ok", "direction": "inbound",
+                 "current_state": "ASK_BUDGET"},
+                {"call_id": "c_nosnap", "lead_id": "l_nosnap", "direction": "inbound",
+                 "current_state": "ASK_LANGUAGE"},
+            ],
+        )
+        conn.execute(
+            TurnRecord.__table__.insert(),
+            {"call_id": "c_ok", "turn_id": "t_done", "reply_text": "hi",
+             "state": "ASK_TIMELINE"},
+        )
+    return f"sqlite+aiosqlite:///{path}"
+
+
+def _load(db_url, cache, *calls):
+    """Run load_turn for each (call_id, turn_id); return contexts and SQL."""
+    engine = create_async_engine(db_url)
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, *args: statements.append(stmt),
+    )
+
+    async def main():
+        results = []
+        for call_id, turn_id in calls:
+            async with Session() as db:
+                statements.clear()
+                ctx = await load_turn(db, call_id, turn_id, cache)
+                results.append((ctx, list(statements)))
+        await engine.dispose()
+        return results
+
+    return asyncio.run(main())
+
+
+def test_new_turn_loads_call_and_snapshot(db_url):
+    """A new turn gets its call and snapshot from one statement."""
+
+    [(ctx, statements)] = _load(db_url, SnapshotCache(10, 60), ("c_ok", "t_new"))
+
+    assert ctx.call.call_id == "c_ok"
+    assert ctx.snapshot.budget_band == "6_to_9L"
+    assert ctx.record is None
+    assert len(statements) == 1
+
+
+def test_replayed_turn_returns_record(db_url):
+    """A processed turn_id comes back with its TurnRecord."""
+
+    [(ctx, statements)] = _load(db_url, SnapshotCache(10, 60), ("c_ok", "t_done"))
+
+    assert ctx.record.reply_text == "hi"
+    assert ctx.record.state == "ASK_TIMELINE"
+    assert len(statements) == 1
+
+
+def test_unknown_call_is_empty(db_url):
+    """An unknown call yields no objects (the API's 404 path)."""
+
+    [(ctx, _)] = _load(db_url, SnapshotCache(10, 60), ("c_missing", "t1"))
+
+    assert ctx.call is None
+    assert ctx.snapshot is None
+    assert ctx.record is None
+
+
+def test_missing_snapshot_is_none(db_url):
+    """A call whose lead lacks a snapshot (the API's 500 path)."""
+
+    [(ctx, _)] = _load(db_url, SnapshotCache(10, 60), ("c_nosnap", "t1"))
+
+    assert ctx.call.call_id == "c_nosnap"
+    assert ctx.snapshot is None
+
+
+def test_cached_snapshot_drops_the_join(db_url):
+    """With the snapshot cached, the statement no longer joins it."""
+
+    cache = SnapshotCache(10, 60)
+    (_, first), (ctx, second) = _load(
+        db_url, cache, ("c_ok", "t1"), ("c_ok", "t2")
+    )
+
+    assert "lead_snapshot" in first[0]
+    assert len(second) == 1
+    assert "lead_snapshot" not in second[0]
+    assert ctx.snapshot.budget_band == "6_to_9L"
+
+
+def test_first_load_seeds_the_generation(db_url):
+    """A lead this process never saw gets a generation from its first load."""
+
+    cache = SnapshotCache(10, 60)
+    (first, _), (second, _) = _load(db_url, cache, ("c_ok", "t1"), ("c_ok", "t2"))
+
+    assert first.generation is not None
+    assert first.generation == second.generation == cache.generation("l_ok")
+
+
+def test_snapshot_committed_during_the_load_is_not_overwritten(db_url):
+    """A load racing a turn's commit leaves the committed values cached."""
+
+    cache = SnapshotCache(10, 60)
+    [(first, _)] = _load(db_url, cache, ("c_ok", "t1"))
+    cache.invalidate("l_ok")  # next load misses the cache
+
+    engine = create_async_engine(db_url)
+    Session = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    def commit_newer(*args):
+        cache.committed(LeadSnapshot(lead_id="l_ok", budget_band="9_to_12L"))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", commit_newer, once=True)
+
+    async def main():
+        async with Session() as db:
+            ctx = await load_turn(db, "c_ok", "t2", cache)
+        await engine.dispose()
+        return ctx
+
+    ctx = asyncio.run(main())
+
+    assert first.generation is not None
+    assert ctx.snapshot.budget_band == "6_to_9L"  # the stale read
+    assert ctx.generation != cache.generation("l_ok")  # so the turn refreshes
+    assert cache.get("l_ok")["budget_band"] == "9_to_12L"